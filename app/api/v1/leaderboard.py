@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+from app.db.base import get_db
+from app.services.leaderboard import leaderboard, BOARDS
+
+router = APIRouter()
+
+def _check_board(board: str) -> str:
+    if board not in BOARDS:
+        raise HTTPException(status_code=400, detail=f"Unknown board '{board}'. Choose from: {', '.join(BOARDS)}")
+    return board
+
+@router.get("", response_model=dict)
+async def get_leaderboard(
+    board: str = "total_ap",
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
+    """One page of a board: total_ap, win_rate or fastest_victory."""
+    return await leaderboard.page(db, _check_board(board), offset, limit)
+
+@router.get("/rank/{player_id}", response_model=dict)
+async def get_rank(player_id: UUID, board: str = "total_ap", db: AsyncSession = Depends(get_db)):
+    entry = await leaderboard.rank(db, _check_board(board), player_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Player is not ranked on this board")
+    return entry
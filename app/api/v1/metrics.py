@@ -0,0 +1,62 @@
+from fastapi import APIRouter
+from app.services.jobs import job_queue
+from app.services.identity import identity_cache
+from app.services.idempotency import command_calls
+from app.services.ai import AIOrchestrator
+from app.services.ai.key_pool import key_pool
+from app.db.base import query_profiler
+from app.core.loop_watchdog import loop_watchdog
+from app.engine.executor import turn_executor
+from app.services.admission import admission
+
+router = APIRouter()
+
+@router.get("/jobs")
+async def job_metrics():
+    """Deferred-work queue depth, throughput and failure counters."""
+    return await job_queue.metrics()
+
+@router.get("/identity")
+async def identity_metrics():
+    """Identity cache size, hit rate and seen-tracking writes vs skips."""
+    return identity_cache.metrics()
+
+@router.get("/idempotency")
+async def idempotency_metrics():
+    """Command idempotency store: in-flight calls, joins, replays, conflicts."""
+    return command_calls.metrics()
+
+@router.get("/admission")
+async def admission_metrics():
+    """Commands in flight, shed count, judgment tier mix and rolling turn / LLM latency."""
+    return admission.metrics()
+
+@router.get("/judgment")
+async def judgment_metrics():
+    """Which path answered each Cixus judgment: Gemini, budget/error fallback, local model, offline."""
+    return AIOrchestrator.judgment_metrics()
+
+@router.get("/keys")
+async def key_metrics():
+    """Gemini key pool: per-key utilization, last-minute requests/tokens, cooldowns."""
+    return key_pool.metrics()
+
+@router.get("/tokens")
+async def token_metrics():
+    """Gemini judgment tokens: totals and estimated savings per command from prompt compaction."""
+    return AIOrchestrator.token_metrics()
+
+@router.get("/sql")
+async def sql_metrics(top: int = 20):
+    """Statements and DB time per route, heaviest statements, N+1 suspects and recent slow queries."""
+    return query_profiler.metrics(top)
+
+@router.get("/loop")
+async def loop_metrics(stacks: bool = True):
+    """Event-loop lag histogram and recent stalls with the stack that blocked."""
+    return loop_watchdog.metrics(with_stacks=stacks)
+
+@router.get("/simulation")
+async def simulation_metrics():
+    """Turns simulated inline vs in the worker pool, offload latency, timeouts."""
+    return turn_executor.metrics()
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
@@ -6,8 +6,13 @@ from uuid import UUID
 from typing import Optional
 from pydantic import BaseModel
 from app.db.base import get_db
+from app.core.http_cache import make_etag, etag_matches, not_modified, set_validators
 from app.models.player import Player
+from app.models.war import WarSession
 from app.services.ai.narrator import narrator
+from app.services.identity import identity_cache, CachedIdentity
+from app.services.aggregates import TurnAggregates
+from datetime import datetime, timezone
 import random
 import logging
 
@@ -94,34 +99,36 @@ async def identify_player(request: Request, body: IdentifyRequest = IdentifyRequ
     """
     try:
         ip = get_client_ip(request)
-        logger.info(f"[identify] request from ip={ip!r}  stored_player_id={body.player_id!r}")
+        logger.info("[identify] request from ip=%r stored_player_id=%r", ip, body.player_id, extra={"event": "identify.request"})
 
         # ── 1. Lookup by stored player_id (primary — survives IP changes) ─────
+        # Cached identities skip the read; IP tracking writes are throttled.
         if body.player_id:
             try:
                 uid = UUID(body.player_id)
-                existing = await db.get(Player, uid)
+                existing = identity_cache.get(uid)
+                if existing is None:
+                    player = await db.get(Player, uid)
+                    existing = identity_cache.put(player) if player else None
                 if existing:
-                    # Update IP tracking
-                    existing.last_seen_ip = ip
-                    if not existing.ip_address:
-                        # First time we have an IP for this player — store it
-                        existing.ip_address = ip
-                    await db.commit()
-                    logger.info(f"[identify] Found by player_id → {existing.username}")
+                    await identity_cache.touch(db, existing, ip)
+                    logger.info("[identify] Found by player_id → %s", existing.username, extra={"event": "identify.found"})
                     return _player_response(existing, returning=True)
             except (ValueError, Exception) as e:
-                logger.warning(f"[identify] player_id lookup failed: {e}")
+                await db.rollback()
+                logger.warning("[identify] player_id lookup failed: %s", e)
                 # Fall through to IP lookup
 
         # ── 2. Lookup by IP address ───────────────────────────────────────────
         if ip and ip != "unknown":
-            result = await db.execute(select(Player).where(Player.ip_address == ip))
-            existing = result.scalars().first()
+            existing = identity_cache.get_by_ip(ip)
+            if existing is None:
+                result = await db.execute(select(Player).where(Player.ip_address == ip))
+                player = result.scalars().first()
+                existing = identity_cache.put(player) if player else None
             if existing:
-                existing.last_seen_ip = ip
-                await db.commit()
-                logger.info(f"[identify] Found by IP → {existing.username}")
+                await identity_cache.touch(db, existing, ip)
+                logger.info("[identify] Found by IP → %s", existing.username, extra={"event": "identify.found"})
                 return _player_response(existing, returning=True)
 
         # ── 3. New player — generate callsign with retry-on-collision ─────────
@@ -134,6 +141,7 @@ async def identify_player(request: Request, body: IdentifyRequest = IdentifyRequ
                     username=username,
                     ip_address=ip if ip != "unknown" else None,
                     last_seen_ip=ip if ip != "unknown" else None,
+                    last_seen_at=datetime.now(timezone.utc),
                     prelude_seen=True,
                 )
                 db.add(new_player)
@@ -142,28 +150,29 @@ async def identify_player(request: Request, body: IdentifyRequest = IdentifyRequ
             except IntegrityError:
                 await db.rollback()
                 if attempt == 9:
-                    logger.error(f"[identify] Failed to generate unique username after {attempt + 1} attempts")
+                    logger.error("[identify] Failed to generate unique username after %d attempts", attempt + 1)
                     raise HTTPException(status_code=500, detail="Failed to create player identity")
-                logger.debug(f"[identify] Username collision for {username}, retry {attempt + 1}/10")
+                logger.debug("[identify] Username collision for %s, retry %d/10", username, attempt + 1)
         
         if not new_player:
             logger.error("[identify] Failed to create player after all retry attempts")
             raise HTTPException(status_code=500, detail="Failed to create player identity")
         
         await db.refresh(new_player)
-        logger.info(f"[identify] Created new player → {new_player.username} (ip={ip})")
+        identity_cache.put(new_player)
+        logger.info("[identify] Created new player → %s (ip=%s)", new_player.username, ip)
 
         prelude_content = await narrator.generate_prelude(new_player.username)
 
         return _player_response(new_player, returning=False, prelude=prelude_content)
 
     except Exception as e:
-        logger.exception(f"[identify] Unexpected error: {e}")
+        logger.exception("[identify] Unexpected error: %s", e)
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Identity resolution failed: {str(e)}")
 
 
-def _player_response(player: Player, returning: bool, prelude=None) -> dict:
+def _player_response(player: Player | CachedIdentity, returning: bool, prelude=None) -> dict:
     """Shared response schema for both returning and new players."""
     return {
         "id": str(player.id),
@@ -204,10 +213,23 @@ async def create_player(request: Request, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/{player_id}", response_model=dict)
-async def get_player(player_id: UUID, db: AsyncSession = Depends(get_db)):
-    player = await db.get(Player, player_id)
+async def get_player(player_id: UUID, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    # Only the profile columns — the ETag comes from the same row, so a 304 costs one narrow read
+    player = (await db.execute(
+        select(
+            Player.id, Player.username, Player.authority_level,
+            Player.authority_points, Player.reputation, Player.ip_address,
+        ).where(Player.id == player_id)
+    )).first()
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
+    etag = make_etag(
+        "player", player.username, player.authority_level, player.authority_points,
+        sorted((player.reputation or {}).items()), player.ip_address,
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_validators(response, etag)
     return {
         "id": str(player.id),
         "username": player.username,
@@ -216,3 +238,24 @@ async def get_player(player_id: UUID, db: AsyncSession = Depends(get_db)):
         "reputation": player.reputation,
         "ip_address": player.ip_address,
     }
+
+
+@router.get("/{player_id}/stats", response_model=dict)
+async def get_player_stats(player_id: UUID, db: AsyncSession = Depends(get_db)):
+    """Maintained aggregates only — no log-table scans."""
+    player = await db.get(Player, player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+    wars = (await db.execute(
+        select(WarSession)
+        .where(WarSession.player_id == player_id)
+        .order_by(WarSession.started_at.desc())
+        .limit(10)
+    )).scalars().all()
+    return {
+        "id": str(player.id),
+        "authority_points": player.authority_points,
+        "total_ap_earned": player.total_ap_earned,
+        **TurnAggregates.player_stats(player),
+        "recent_wars": [TurnAggregates.war_stats(w) for w in wars],
+    }
@@ -1,29 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException
-from app.core.security import check_rate_limit
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from app.core.security import check_rate_limit, claim_idempotency_key
+from app.core.http_cache import make_etag, etag_matches, not_modified, set_validators
+from app.core.log_pipeline import bind_war_id
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from uuid import UUID
 import uuid
 from datetime import datetime, timezone
+from typing import Awaitable, Callable
+import asyncio
+import json
 import logging
 
 from app.db.base import get_db
 from app.models.war import WarSession
 from app.models.player import Player
-from app.models.action import ActionLog
-from app.models.sitrep import SitRepLog
-from app.models.authority import AuthorityLog
 from app.services.friction import AuthorityFrictionService
+from app.services.authority import AuthorityLedger
+from app.services.war_store import WarEventStore, WarReplay
+from app.services.jobs import job_queue
+from app.services.identity import identity_cache
+from app.services.idempotency import command_calls
+from app.services.progression import progression_after, reputation_after
+from app.services.war_summary import WarSummarizer
+from app.services.aggregates import TurnAggregates
+from app.services.leaderboard import leaderboard
+from app.services.war_context import WarContextRepository
+from app.services.admission import admission, admit_command
 from app.models.general import General
 from app.engine.types import GameState, UnitState
 from app.engine.simulation import SimulationEngine
+from app.engine.executor import turn_executor, SimulationTimeout
+from app.engine.state import World
 from app.services.ai import AIOrchestrator
+from app.services.ai.key_pool import key_pool
 from app.services.ai.context_builder import ContextBuilder
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(bind_war_id)])
 
 class CreateWarRequest(BaseModel):
     player_id: UUID
@@ -83,6 +102,8 @@ async def list_war_history(player_id: UUID, db: AsyncSession = Depends(get_db)):
             "ended_at": w.ended_at.isoformat() if w.ended_at else None,
             "duration_minutes": duration,
             "status": w.status,
+            "authority_delta_sum": w.authority_delta_sum or 0,
+            "judged_turns": w.judged_turns or 0,
         })
     return history
 
@@ -147,12 +168,13 @@ async def start_war(req: CreateWarRequest, db: AsyncSession = Depends(get_db)):
     )
 
     war = WarSession(
+        id=uuid.uuid4(),  # client-side, so the event and general can reference it without a flush
         player_id=player.id,
         current_state_snapshot=initial_state.model_dump(),
         status="ACTIVE"
     )
     db.add(war)
-    await db.flush() # Get ID
+    WarEventStore.record_start(db, war.id, war.current_state_snapshot)
     
     # Create Enemy General
     general = General(
@@ -166,228 +188,396 @@ async def start_war(req: CreateWarRequest, db: AsyncSession = Depends(get_db)):
     
     return {"war_id": war.id, "initial_state": initial_state.model_dump()}
 
-@router.post("/{war_id}/command", response_model=dict, dependencies=[Depends(check_rate_limit)])
-async def submit_command(war_id: UUID, cmd: CommandRequest, db: AsyncSession = Depends(get_db)):
+@router.post("/{war_id}/command", response_model=dict, dependencies=[Depends(claim_idempotency_key), Depends(admit_command), Depends(check_rate_limit)])
+async def submit_command(war_id: UUID, cmd: CommandRequest, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    """
+    Runs one turn. With an ``Idempotency-Key`` header, retries of the same
+    command join the in-flight turn or replay its stored response instead
+    of running (and billing) a second one. claim_idempotency_key claims it.
+    admit_command sheds the request when saturated and sets its deadline.
+    """
+    result, replayed = await _run_command(war_id, cmd, request, db)
+    if replayed:
+        response.headers["Idempotency-Replayed"] = "true"
+    return result
+
+@router.post("/{war_id}/command/stream", dependencies=[Depends(claim_idempotency_key), Depends(admit_command), Depends(check_rate_limit)])
+async def stream_command(war_id: UUID, cmd: CommandRequest, request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Same turn as ``/command``, as Server-Sent Events, so the player sees
+    the battle before Cixus has finished judging it:
+
+      event: turn        engine result, straight after the simulation
+      event: commentary  {"text": ...} pieces of Cixus's commentary as Gemini writes them
+      event: result      the full ``/command`` response, after the commit
+      event: error       {"status": ..., "detail": ...} instead of result
+
+    ``result.cixus_judgment.commentary`` is authoritative. If Gemini loses
+    its budget mid-stream, the fallback's commentary replaces the pieces.
+    Offline judgments send their commentary as one piece. A retry with a
+    claimed Idempotency-Key gets just the result.
+    """
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def emit(event: str, data: dict) -> None:
+        await events.put((event, data))
+
+    async def run() -> None:
+        try:
+            result, _ = await _run_command(war_id, cmd, request, db, emit)
+            await emit("result", result)
+        except HTTPException as e:
+            await emit("error", {"status": e.status_code, "detail": e.detail})
+        except Exception:
+            logger.exception("Streamed command failed for war %s", war_id)
+            await emit("error", {"status": 500, "detail": "Command processing failed"})
+        finally:
+            await events.put(None)
+
+    async def sse():
+        task = asyncio.create_task(run())
+        try:
+            while (item := await events.get()) is not None:
+                event, data = item
+                yield f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+        finally:
+            # A client that hangs up doesn't abort the turn; the session must outlive it
+            await task
+
+    return StreamingResponse(
+        sse(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def _run_command(
+    war_id: UUID, cmd: CommandRequest, request: Request, db: AsyncSession,
+    emit: Callable[[str, dict], Awaitable[None]] | None = None,
+) -> tuple[dict, bool]:
+    """(response, replayed) — runs the turn, or joins/replays it under a claimed Idempotency-Key."""
+    # Quota row this request was counted against — LLM tokens are billed to it
+    quota_id = getattr(request.state, "quota_id", None)
+    deadline = getattr(request.state, "deadline", None)
+    claimed = getattr(request.state, "idempotent_call", None)
+    if claimed is None:
+        return await _execute_command(war_id, cmd, db, quota_id, deadline, emit), False
+
+    key, call, owner = claimed  # a different command under the key was refused at claim time
+    if not owner:
+        return await command_calls.wait(call), True
+
     try:
-        war = await db.get(WarSession, war_id)
-        if not war:
+        result = await _execute_command(war_id, cmd, db, quota_id, deadline, emit)
+    except BaseException as e:
+        command_calls.fail(key, call, e)
+        raise
+    command_calls.resolve(key, call, result)
+    return result, False
+
+async def _execute_command(
+    war_id: UUID, cmd: CommandRequest, db: AsyncSession,
+    quota_id: UUID | None = None, deadline: float | None = None,
+    emit: Callable[[str, dict], Awaitable[None]] | None = None,
+) -> dict:
+    """One turn. With ``emit`` (streaming mode) the engine result and the
+    commentary are sent as they become available."""
+    try:
+        ctx = await WarContextRepository.load(db, war_id, "command")
+        if not ctx:
             raise HTTPException(status_code=404, detail="War not found")
-            
-        player = await db.get(Player, war.player_id)
+        war, player = ctx.war, ctx.player
         if not player:
             raise HTTPException(status_code=404, detail="Player not found")
+
+        # Settle idle decay first so the command sees the same authority /state shows
+        now = datetime.now(timezone.utc)
+        authority = AuthorityLedger.materialize(player, now)
         
         # 1. AI Parse Intent & Context
-        game_command = await AIOrchestrator.parse_command_intent(cmd.content, {"player_authority": player.authority_points})
+        game_command = await AIOrchestrator.parse_command_intent(cmd.content, {"player_authority": authority})
         
         # 2. Friction Layer (The Limiter)
         # Apply Authority-based Friction (Latency, Refusal, Drift)
-        friction = AuthorityFrictionService.calculate_friction(player.authority_points or 100)
+        friction = AuthorityFrictionService.calculate_friction(authority)
         game_command.friction = friction
+
+        # Speculative pre-judgment: persona/intent prompt and the offline
+        # fallback only need the parsed intent, so settle them before simulating,
+        # and have the Gemini channel connect while the simulation runs
+        judgment_draft = AIOrchestrator.prepare_judgment(
+            game_command.model_dump(), dict(player.reputation or {})
+        )
+        AIOrchestrator.warm_judgment(judgment_draft, admission.current_tier())
         
         # 3. Simulation Execution (with Friction and Validation)
-        current_game_state = GameState.model_validate(war.current_state_snapshot)
+        # Decoded straight into the lean engine representation — no pydantic pass
+        world = World.from_snapshot(war.current_state_snapshot)
         
         # Validate & Clamp (Friction is verified here)
-        instructions = SimulationEngine.validate_and_clamp(game_command, player, current_game_state)
+        instructions = SimulationEngine.validate_and_clamp(game_command, player, world)
         
-        turn_result = SimulationEngine.process_turn(
-            current_game_state, instructions,
-            player_authority=player.authority_points or 70
-        )
+        # One tick per command; latency-delayed orders wait in the world's
+        # scheduler and execute on the turn they fall due. The seed is logged
+        # so the event store can replay this turn exactly.
+        # Big battles run in the simulation process pool; the rest inline.
+        rng_seed, _ = WarEventStore.new_rng()
+        try:
+            turn_result = await turn_executor.advance(
+                world, war.current_state_snapshot, 1, instructions, authority, rng_seed,
+            )
+        except SimulationTimeout as e:
+            logger.error("Simulation timed out for war %s: %s", war_id, e)
+            raise HTTPException(status_code=503, detail="Battle simulation timed out — retry", headers={"Retry-After": "5"})
 
         
         # 4. Update DB with transaction safety
         try:
-            war.current_state_snapshot = turn_result.new_snapshot.model_dump()
+            new_snapshot = turn_result.world.to_snapshot()
+            war.current_state_snapshot = new_snapshot
             war.turn_count = turn_result.turn_id
+            war.last_command_at = now
             
-            # 5. Log Action & Outcome (SitRep)
+            # 5. Outcome summary (the SitRep row itself is written by the job queue)
             formatted_sitrep = f"Events: {', '.join(turn_result.events)}."
             if turn_result.state_delta:
                  formatted_sitrep += f" Visuals: {turn_result.state_delta}"
             
-            # Save SitRep Log
-            sitrep_log = SitRepLog(
-                war_id=war.id,
-                turn_id=war.turn_count,
-                text_content=formatted_sitrep,
-                structured_data={"events": turn_result.events, "delta": turn_result.state_delta},
-                visual_context=turn_result.state_delta
-            )
-            db.add(sitrep_log)
-            
+            war_summary = war.last_judgment_context or {}
             judgment_context = ContextBuilder.build_judgment_context(
                 war, 
-                turn_result.new_snapshot, 
-                turn_result.events
+                turn_result.world, 
+                turn_result.events,
+                player_pkg={"authority": authority, "trend": TurnAggregates.player_trend(player)},
             )
             
-            # 6. Cixus Judgment (The Judge)
-            judgment = await AIOrchestrator.get_cixus_judgment(
-                action_intent=game_command.model_dump(), 
-                sitrep=judgment_context,
-                reputation=dict(player.reputation or {})
-            )
+            # 6. Cixus Judgment (The Judge) — admission control picks the tier
+            # (full / lite model / offline) from load and what's left of the
+            # deadline; Gemini races that budget, the pre-computed fallback
+            # answers if it loses
+            tier, budget_ms = admission.judgment_tier(deadline)
+            streamed = False
+            on_text = None
+            if emit is not None:
+                await emit("turn", {
+                    "turn_id": turn_result.turn_id,
+                    "events": turn_result.events,
+                    "sitrep": formatted_sitrep,
+                    "game_over": turn_result.game_over,
+                    "new_state": new_snapshot,
+                    "instructions": [i.to_dict() for i in turn_result.instructions],
+                    "intent": game_command.intent.model_dump() if game_command.intent else None,
+                    "friction": friction.model_dump(),
+                })
+
+                async def on_text(piece: str) -> None:
+                    nonlocal streamed
+                    streamed = True
+                    await emit("commentary", {"text": piece})
+
+            judgment = await AIOrchestrator.finish_judgment(judgment_draft, judgment_context, budget_ms, tier, on_text)
+            if emit is not None and not streamed:
+                await emit("commentary", {"text": judgment.get("commentary", "")})
             
             # 7. Apply Judgment
             delta = judgment.get("authority_change", 0)
             reason = judgment.get("commentary", "No comment.")
             
-            # Update Player Authority
-            current_ap = player.authority_points or 100
-            player.authority_points = max(0, min(100, current_ap + delta))
-
-            # ── 9. Authority level progression ────────────────────────────────────
-            LEVEL_THRESHOLDS = {2: 200, 3: 600, 4: 1200, 5: 2500}
-            leveled_up = False
-            new_level = player.authority_level or 1
-            if delta > 0:
-                player.total_ap_earned = (player.total_ap_earned or 0) + delta
-                for lvl, threshold in sorted(LEVEL_THRESHOLDS.items()):
-                    if player.total_ap_earned >= threshold and new_level < lvl:
-                        new_level = lvl
-                        leveled_up = True
-                if leveled_up:
-                    player.authority_level = new_level
-
-            # ── 8. Derive reputation signals from this command ────────────────────
-            rep = dict(player.reputation or {})
+            # Update Player Authority — stays inline, the next command reads it
+            AuthorityLedger.apply_delta(player, delta, now)
+
+            # Fold this turn into the war's rolling summary (O(1), fixed size)
+            war.last_judgment_context = WarSummarizer.fold(
+                war_summary, turn_result.turn_id, turn_result.events, delta, judgment_context["casualties"]
+            )
+            war.history_summary = WarSummarizer.render(war.last_judgment_context)
+
+            # ── 8/9. Reputation & level progression ───────────────────────────────
+            # Computed here for the response; persisted by the "player_progress"
+            # job against the row as it stands when the job runs.
             intent = game_command.intent
             ethical  = intent.ethical_weight if intent else "standard"
             risk     = intent.risk_profile    if intent else "medium"
-            pattern  = (intent.primary_pattern or "").lower() if intent else ""
-
-            def _inc(trait, amount):
-                rep[trait] = round(min(1.0, rep.get(trait, 0.0) + amount), 3)
-
-            # Ethical stance
-            if ethical == "brutal":    _inc("Ruthless",  0.05)
-            elif ethical == "merciful": _inc("Merciful",  0.04)
-
-            # Risk appetite
-            if risk == "high":   _inc("Reckless",   0.03)
-            elif risk == "low":  _inc("Calculated", 0.03)
-
-            # Command pattern
-            if any(w in pattern for w in ("attack", "assault", "flank", "charge")):
-                _inc("Aggressive", 0.03)
-            if any(w in pattern for w in ("defend", "fortif", "hold", "retreat")):
-                _inc("Defensive",  0.03)
-            if any(w in pattern for w in ("ambush", "feint", "diversion", "encircle")):
-                _inc("Cunning",    0.04)
-
-            # Authority outcome
-            if delta > 0:  _inc("Decisive",  0.03)
-            elif delta < 0: _inc("Hesitant",  0.03)
-
-            # General battlefield experience (every command)
-            _inc("Veteran", 0.01)
-
-            player.reputation = rep
-
-            # Log Authority Change
-            auth_log = AuthorityLog(
-                war_id=war.id,
-                turn_id=war.turn_count,
-                delta=delta,
-                reason=reason,
-                context_snapshot=judgment_context
+            pattern  = intent.primary_pattern if intent else ""
+            new_level, total_ap_earned, leveled_up = progression_after(
+                player.authority_level, player.total_ap_earned, delta
             )
-            db.add(auth_log)
-
-            # Log Action
-            action_log = ActionLog(
-                war_id=war.id,
-                player_command_raw=cmd.content,
-                parsed_action=game_command.model_dump(),
-                outcome="SUCCESS",
-                state_delta=turn_result.state_delta,
-                cixus_evaluation=judgment
+            reputation = reputation_after(player.reputation, pattern, risk, ethical, delta)
+
+            # Trend / pattern / per-war aggregates — same write as the turn
+            TurnAggregates.apply(player, war, pattern, delta)
+
+            # Append-only event for replay / time-travel debugging
+            WarEventStore.record_turn(
+                db, war.id, instructions, 1, authority, rng_seed, turn_result, new_snapshot,
+                friction=friction.model_dump(),
+                judgment=judgment,
+                authority_delta=delta,
             )
-            db.add(action_log)
+
+            # ── 10. Deferred writes (history logs, progression) ─────────────────
+            job_queue.stage(db, "turn_logs", {
+                "war_id": str(war.id),
+                "turn_id": war.turn_count,
+                "sitrep": formatted_sitrep,
+                "events": turn_result.events,
+                "state_delta": turn_result.state_delta,
+                "delta": delta,
+                "reason": reason,
+                # "judged" is what the local judge trains on (app.services.ai.distill)
+                "judgment_context": {**judgment_context, "judged": {
+                    "tier": judgment_draft.tier,
+                    "intent": game_command.intent.model_dump(mode="json"),
+                }},
+                "command": cmd.content,
+                "parsed_action": game_command.model_dump(mode="json"),
+                "judgment": judgment,
+            })
+            if judgment_draft.usage and quota_id:
+                job_queue.stage(db, "llm_usage", {
+                    "quota_id": str(quota_id),
+                    "tokens": judgment_draft.usage["total_tokens"],
+                })
+            job_queue.stage(db, "player_progress", {
+                "war_id": str(war.id),
+                "turn_id": war.turn_count,
+                "player_id": str(player.id),
+                "delta": delta,
+                "pattern": pattern,
+                "risk": risk,
+                "ethical": ethical,
+            })
             
-            # Commit all changes atomically
+            # Commit authoritative state atomically, then release the jobs
             await db.commit()
-            logger.info(f"Command processed successfully for war {war_id}, turn {war.turn_count}")
+            identity_cache.invalidate(player.id)
+            await job_queue.publish(db)
+            logger.info("Command processed for war %s, turn %s", war_id, war.turn_count, extra={"event": "command.processed"})
+
+            return {
+                "turn_id": turn_result.turn_id,
+                "events": turn_result.events,
+                "sitrep": formatted_sitrep,
+                "game_over": turn_result.game_over,
+                "new_state": new_snapshot,
+                "instructions": [i.to_dict() for i in turn_result.instructions],
+                "intent": game_command.intent.model_dump() if game_command.intent else None,
+                "friction": friction.model_dump(),
+                "cixus_judgment": judgment,
+                "judgment_tier": judgment_draft.tier,
+                "authority_points": player.authority_points,
+                "authority_level": new_level,
+                "total_ap_earned": total_ap_earned,
+                "leveled_up": leveled_up,
+                "reputation": reputation,
+            }
             
         except SQLAlchemyError as e:
             await db.rollback()
-            logger.error(f"Database error during command processing for war {war_id}: {e}", exc_info=True)
+            job_queue.discard(db)
+            logger.error("Database error during command processing for war %s: %s", war_id, e, exc_info=True)
             raise HTTPException(status_code=500, detail="Command processing failed due to database error")
         except Exception as e:
             await db.rollback()
-            logger.error(f"Unexpected error during command processing for war {war_id}: {e}", exc_info=True)
+            job_queue.discard(db)
+            logger.error("Unexpected error during command processing for war %s: %s", war_id, e, exc_info=True)
             raise HTTPException(status_code=500, detail="Command processing failed")
     except HTTPException:
         raise
     except Exception as e:
-        logger.exception(f"Outer exception in submit_command for war {war_id}: {e}")
+        logger.exception("Outer exception in submit_command for war %s: %s", war_id, e)
         raise HTTPException(status_code=500, detail="Command processing failed")
 
+@router.get("/{war_id}/replay/{turn}")
+async def replay_turn(war_id: UUID, turn: int, db: AsyncSession = Depends(get_db)):
+    """Time-travel debug: rebuild the battlefield as it stood after ``turn``."""
+    world = await WarReplay.state_at(db, war_id, turn)
+    if world is None:
+        raise HTTPException(status_code=404, detail="No history for that war/turn")
+    return world.to_snapshot()
+
+def _state_etag(turn_count: int | None, status: str | None, decayed_ap: float, tier: str) -> str:
+    """The state body only changes when a command commits (turn_count), the
+    war ends (status), idle decay crosses a whole AP or the judgment tier
+    moves — so those are the version."""
+    return make_etag("state", turn_count, status, round(decayed_ap), tier)
+
+
 @router.get("/{war_id}/state")
-async def get_state(war_id: UUID, db: AsyncSession = Depends(get_db)):
-    war = await db.get(WarSession, war_id)
-    if not war:
+async def get_state(war_id: UUID, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    ai_active = key_pool.configured
+    # What a command sent now would be judged by — moves with load and key health, not just config
+    tier = admission.current_tier() if key_pool.has_capacity() else "offline"
+
+    # One read serves both the ETag check and the body; a 304 still skips serialising the snapshot
+    ctx = await WarContextRepository.load(db, war_id, "state")
+    if not ctx:
         raise HTTPException(status_code=404, detail="War not found")
 
-    # ── Authority decay: -5 AP per idle minute, floor 20 ──────────────────
+    # ── Authority decay: -5 AP per idle minute, floor 20 (read-only, O(1)) ──
     try:
-        player = await db.get(Player, war.player_id)
-        base_ap = (player.authority_points if player and player.authority_points is not None else 100)
-
-        decayed_ap = base_ap
-        if war.last_command_at:
-            now = datetime.now(timezone.utc)
-            lca = war.last_command_at
-            # SQLite returns naive datetimes — attach UTC so subtraction works
-            if lca.tzinfo is None:
-                lca = lca.replace(tzinfo=timezone.utc)
-            idle_minutes = max(0, (now - lca).total_seconds() / 60)
-            # 2-minute grace period, then -5 AP/min
-            decayed_ap = max(20, base_ap - max(0, (idle_minutes - 2) * 5))
+        decayed_ap = AuthorityLedger.current(ctx.player) if ctx.player else 100
     except Exception as e:
-        print(f"[get_state] authority decay error (non-fatal): {e}")
+        logger.warning("[get_state] authority decay error (non-fatal): %s", e)
         decayed_ap = 100  # safe fallback
 
-    snapshot = dict(war.current_state_snapshot or {})
-    snapshot["player_authority"] = round(decayed_ap)
+    war, player = ctx.war, ctx.player
+    stored = war.current_state_snapshot or {}
 
     # ── War-end detection ───────────────────────────────────────────────
+    # Runs before the ETag check so a poll can't 304 its way past the flip, and
+    # reports the outcome on every poll of a finished war (not just the one that
+    # flipped it), so a given (turn, status) always has the same body
     war_ended = False
     war_outcome = None
-    if war.status == "ACTIVE":
-        player_units = snapshot.get("player_units", [])
-        enemy_units  = snapshot.get("enemy_units",  [])
-        commander = next(
-            (u for u in player_units
-             if "COMMANDER" in (u.get("tags") or []) or u.get("type") == "COMMANDER"),
-            None
-        )
-        warlord = next(
-            (u for u in enemy_units
-             if "BOSS" in (u.get("tags") or []) or u.get("type") == "WARLORD"),
-            None
-        )
-        commander_dead = not commander or (commander.get("health") or 0) <= 0
-        warlord_dead   = warlord is not None and (warlord.get("health") or 0) <= 0
-
-        if commander_dead or warlord_dead:
-            war_outcome = "SURVIVED" if warlord_dead else "FELL"
-            war.status  = "ENDED"
-            war.ended_at = datetime.now(timezone.utc)
-            war_ended = True
+    war_status, turn_count = war.status, war.turn_count  # war is expired if the end rolls back
+    player_units = stored.get("player_units", [])
+    enemy_units  = stored.get("enemy_units",  [])
+    commander = next(
+        (u for u in player_units
+         if "COMMANDER" in (u.get("tags") or []) or u.get("type") == "COMMANDER"),
+        None
+    )
+    warlord = next(
+        (u for u in enemy_units
+         if "BOSS" in (u.get("tags") or []) or u.get("type") == "WARLORD"),
+        None
+    )
+    commander_dead = not commander or (commander.get("health") or 0) <= 0
+    warlord_dead   = warlord is not None and (warlord.get("health") or 0) <= 0
+
+    if commander_dead or warlord_dead:
+        war_outcome = "SURVIVED" if warlord_dead else "FELL"
+        war_ended = True
+        if war_status == "ACTIVE":
             try:
+                # Concurrent polls can all see ACTIVE; only the one whose flip lands records the end
+                flipped = await db.execute(
+                    update(WarSession)
+                    .where(WarSession.id == war.id, WarSession.status == "ACTIVE")
+                    .values(status="ENDED", ended_at=datetime.now(timezone.utc))
+                    .execution_options(synchronize_session=False)
+                )
+                standing = None
+                if flipped.rowcount == 1 and player:
+                    standing = await leaderboard.record_war_end(db, war, player, warlord_dead)
                 await db.commit()
-            except Exception:
-                pass
-
-    # AI model active?
-    from app.core.config import settings as _cfg
-    ai_active = bool(_cfg.GEMINI_API_KEY)
-
+                war_status = "ENDED"
+                if standing:
+                    leaderboard.apply(standing)
+            except Exception as e:
+                await db.rollback()
+                logger.error("[get_state] recording the end of war %s failed: %s", war_id, e)
+
+    # From the values this response actually carries, after any war-end write
+    etag = _state_etag(turn_count, war_status, decayed_ap, tier)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    snapshot = dict(stored)
+    snapshot["player_authority"] = round(decayed_ap)
     snapshot["war_ended"]       = war_ended
     snapshot["war_outcome"]     = war_outcome
-    snapshot["war_status"]      = war.status
+    snapshot["war_status"]      = war_status
     snapshot["ai_model_active"] = ai_active
+    snapshot["judgment_tier"]   = tier
+    set_validators(response, etag)
     return snapshot
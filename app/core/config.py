@@ -15,6 +15,94 @@ class Settings(BaseSettings):
     DATABASE_URL: str | None = None
 
     GEMINI_API_KEY: str | None = None
+    # Gemini key pool — extra keys (comma-separated), leased least-loaded per call under per-key limits
+    GEMINI_API_KEYS: str | None = None
+    GEMINI_KEY_RPM_LIMIT: int = 15
+    GEMINI_KEY_TPM_LIMIT: int = 1000000
+    GEMINI_KEY_COOLDOWN_SECONDS: float = 30.0  # after a 429; doubles per consecutive 429, up to 8x
+
+    # Authority ledger — how often idle decay is materialised for active wars
+    AUTHORITY_SWEEP_INTERVAL_SECONDS: int = 60
+
+    # Event store — full battlefield snapshot every N turns (replay starts there)
+    WAR_SNAPSHOT_INTERVAL: int = 20
+
+    # Deferred per-turn work (logs, reputation, levels)
+    # "memory": in-process asyncio queue | "database": job_queue table + `python -m app.worker`
+    JOB_QUEUE_BACKEND: str = "memory"
+    JOB_QUEUE_MAXSIZE: int = 10000
+    JOB_BATCH_SIZE: int = 200
+    JOB_FLUSH_INTERVAL_MS: int = 50
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_DRAIN_TIMEOUT_SECONDS: int = 10
+
+    # /players/identify cache; last_seen_* is rewritten only on IP change or after N minutes
+    IDENTITY_CACHE_TTL_SECONDS: int = 300
+    IDENTITY_CACHE_MAXSIZE: int = 10000
+    IDENTITY_SEEN_WRITE_MINUTES: int = 15
+
+    # Idempotency-Key on /war/{id}/command — how long a finished response is replayed
+    IDEMPOTENCY_TTL_SECONDS: int = 600
+    IDEMPOTENCY_CACHE_MAXSIZE: int = 5000
+
+    # Cixus judgment — past this, the offline fallback answers instead (0 = always wait for Gemini)
+    JUDGMENT_LATENCY_BUDGET_MS: int = 8000
+    # Cap on the per-turn judgment prompt (est. tokens); oldest recent_events are dropped first
+    JUDGMENT_PROMPT_TOKEN_BUDGET: int = 600
+    # Judgment tiers — full model, then the cheaper/faster one, then offline
+    JUDGMENT_MODEL: str = "gemini-2.0-flash"
+    JUDGMENT_LITE_MODEL: str = "gemini-2.0-flash-lite"
+    # Distilled local judge (`python -m app.services.ai.distill`) — answers in place of the tactic tables
+    # for patterns with enough training samples, and takes LOCAL_JUDGMENT_SHARE of turns before Gemini
+    LOCAL_JUDGMENT_MODEL_PATH: str = "cixus_local_judge.json"
+    LOCAL_JUDGMENT_MIN_SAMPLES: int = 30
+    LOCAL_JUDGMENT_SHARE: float = 0.0
+
+    # Admission control on /war/{id}/command — in-flight cap (503 past it), per-command deadline,
+    # and the queue-depth fractions at which judgment drops to the lite model / offline
+    COMMAND_MAX_IN_FLIGHT: int = 64
+    COMMAND_DEADLINE_MS: int = 10000
+    ADMISSION_LITE_DEPTH: float = 0.5
+    ADMISSION_OFFLINE_DEPTH: float = 0.8
+    ADMISSION_LATENCY_WINDOW_SECONDS: int = 60
+
+    # Leaderboards — in-memory rank index, refreshed from player_standings changes every N s; hot top pages cached
+    LEADERBOARD_INDEX_TTL_SECONDS: int = 30
+    LEADERBOARD_TOP_TTL_SECONDS: int = 10
+    LEADERBOARD_TOP_N: int = 100
+
+    # Response compression — brotli if installed and accepted, else gzip; smaller bodies go out as-is
+    COMPRESSION_MIN_BYTES: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # SQL profiler — per-request statement counts, slow-query log, N+1 flags (GET /api/v1/metrics/sql)
+    SQL_PROFILER_ENABLED: bool = True
+    SQL_SLOW_QUERY_MS: int = 100
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+    SQL_EXPLAIN_SLOW: bool = False  # debug only: re-runs slow SELECTs under EXPLAIN (ANALYZE on Postgres)
+    SQL_PROFILER_MAX_TEMPLATES: int = 500
+
+    # Logging — JSON lines written by a background thread; LOG_SAMPLE_RATES keeps that fraction of each high-volume event
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # or "text"
+    LOG_SAMPLE_RATES: dict[str, float] = {
+        "identify.request": 0.1,
+        "identify.found": 0.1,
+        "command.processed": 0.1,
+        "judgment.offline": 0.01,
+        "judgment.shed": 0.01,
+    }
+
+    # Simulation offload — turns over SIM_OFFLOAD_MIN_WORK unit-ticks run in a process pool (0 workers = always inline)
+    SIM_POOL_WORKERS: int = 2
+    SIM_OFFLOAD_MIN_WORK: int = 10000
+    SIM_TIMEOUT_SECONDS: float = 10.0
+
+    # Event-loop watchdog — heartbeat lag histogram; stacks captured for blocks past the threshold
+    LOOP_WATCHDOG_ENABLED: bool = True
+    LOOP_LAG_INTERVAL_MS: int = 100
+    LOOP_STALL_THRESHOLD_MS: int = 250
     
     # Security
     SECRET_KEY: str = "CHANGE_ME_IN_PRODUCTION" # Overridden by env var SECRET_KEY
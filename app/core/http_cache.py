@@ -0,0 +1,43 @@
+"""
+Conditional GET helpers.
+
+Polled endpoints derive a weak ETag from a few cheap version columns
+(turn_count, status, decayed authority, ...) instead of hashing the body.
+When the client's If-None-Match still matches, the handler answers 304
+before loading or serialising anything heavy.
+
+ETags are weak (``W/``) because the same representation may be sent gzip-
+or brotli-encoded.
+"""
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+
+# Polling clients must revalidate every time; the 304 makes that cheap
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: W/"x" and "x" are the same validator
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def set_validators(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,181 @@
+"""
+Queue-based structured logging.
+
+Before this, logging on the event loop did two slow things: it formatted
+the message and it wrote synchronously to stdout. Now a caller only does:
+* a sampling check;
+* a read of the correlation contextvars;
+* a put on a SimpleQueue.
+
+A QueueListener thread does the formatting (one JSON object per line) and
+the writing.
+
+Correlation: ``RequestContextMiddleware`` gives every HTTP request a
+``request_id``, taken from an incoming ``X-Request-ID`` or generated, and
+echoes it back. War routes also bind the ``war_id``. Both are stamped on
+every record logged while handling that request.
+
+Sampling: records logged with ``extra={"event": name}`` are kept with
+probability ``LOG_SAMPLE_RATES[name]``, default 1. Kept records carry their
+``sample_rate`` so counts can be re-weighted downstream.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+war_id_var: ContextVar[Optional[str]] = ContextVar("war_id", default=None)
+
+# LogRecord attributes that are not user-supplied ``extra`` fields
+_RESERVED = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; ``extra`` fields are included as keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Runs on the logging thread of the caller (usually the event loop).
+    It keeps that side cheap: sample, stamp the correlation ids, and
+    enqueue. The %-interpolation of msg/args happens here, because the args
+    may be mutable objects the caller changes after the call returns. The
+    JSON encoding and the write are left to the listener thread.
+    """
+
+    def __init__(self, q: queue.SimpleQueue, sample_rates: Dict[str, float]):
+        super().__init__(q)
+        self.sample_rates = sample_rates
+
+    def emit(self, record: logging.LogRecord) -> None:
+        event = getattr(record, "event", None)
+        if event is not None:
+            rate = self.sample_rates.get(event, 1.0)
+            if rate < 1.0:
+                if random.random() >= rate:
+                    return
+                record.sample_rate = rate
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        if getattr(record, "war_id", None) is None:
+            record.war_id = war_id_var.get()
+        try:
+            record.msg = record.getMessage()
+            record.args = None
+            self.enqueue(record)
+        except Exception:
+            self.handleError(record)
+
+
+def setup_logging(level: str = "INFO", fmt: str = "json", sample_rates: Optional[Dict[str, float]] = None) -> None:
+    """Route the root logger through the queue. Idempotent."""
+    global _listener
+    if _listener is not None:
+        return
+    q: queue.SimpleQueue = queue.SimpleQueue()
+    sink = logging.StreamHandler(sys.stdout)
+    sink.setFormatter(
+        JsonFormatter() if fmt == "json"
+        else logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s %(war_id)s] %(message)s")
+    )
+    _listener = logging.handlers.QueueListener(q, sink, respect_handler_level=False)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_ContextQueueHandler(q, dict(sample_rates or {})))
+    root.setLevel(level.upper())
+    # Uvicorn's own handlers would write synchronously; send its records through the queue too
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers.clear()
+        logging.getLogger(name).propagate = True
+
+
+def shutdown_logging() -> None:
+    """Flush everything queued and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+async def bind_war_id(request: Request) -> AsyncIterator[None]:
+    """
+    Router dependency: tag every log record in this request with its war (if
+    the route has one), and unbind it when the request is done so it cannot
+    leak into whatever runs next in the same context.
+    """
+    war_id = request.path_params.get("war_id")
+    if war_id is None:
+        yield
+        return
+    token = war_id_var.set(str(war_id))
+    try:
+        yield
+    finally:
+        war_id_var.reset(token)
+
+
+class RequestContextMiddleware:
+    """Assigns/propagates ``X-Request-ID`` and binds it for log correlation."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        incoming = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                incoming = value.decode("latin-1")[:64]
+                break
+        request_id = incoming or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(raw=message["headers"])[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
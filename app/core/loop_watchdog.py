@@ -0,0 +1,161 @@
+"""
+Event-loop lag monitor and stall watchdog.
+
+A heartbeat coroutine sleeps LOOP_LAG_INTERVAL_MS at a time. How late it
+wakes up is the loop lag every other coroutine saw at that moment, and it
+goes into a histogram.
+
+A daemon thread watches the heartbeat. Once it is more than
+LOOP_STALL_THRESHOLD_MS overdue, the loop thread is stuck in synchronous
+code. The thread then snapshots that thread's stack with
+``sys._current_frames``, so the stall record names the exact blocking frame
+and the coroutine it ran in. When the loop recovers, the record gets its
+total duration.
+
+Exported at GET /api/v1/metrics/loop.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the lag histogram buckets; the last bucket is open
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+STACK_LIMIT = 25
+
+
+class LoopWatchdog:
+
+    def __init__(self, interval_ms: int, stall_ms: int, keep: int = 20):
+        self.interval = interval_ms / 1000
+        self.stall = stall_ms / 1000
+        self._buckets = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self._count = 0
+        self._sum_ms = 0.0
+        self._max_ms = 0.0
+        self._stalls: deque = deque(maxlen=keep)
+        self._stall_total = 0
+        self._open_stall: Optional[Dict[str, Any]] = None
+        self._beat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ── Lifecycle ────────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        """Call from the running loop (app lifespan)."""
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._thread = None
+
+    # ── Loop side ────────────────────────────────────────────────────────────
+
+    async def _heartbeat(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+            self._observe(max(0.0, (now - start - self.interval) * 1000))
+
+    def _observe(self, lag_ms: float) -> None:
+        i = 0
+        while i < len(LAG_BUCKETS_MS) and lag_ms > LAG_BUCKETS_MS[i]:
+            i += 1
+        self._buckets[i] += 1
+        self._count += 1
+        self._sum_ms += lag_ms
+        self._max_ms = max(self._max_ms, lag_ms)
+
+        stall = self._open_stall
+        if stall is not None:
+            # The watchdog caught this one mid-block; now we know how long it lasted
+            self._open_stall = None
+            stall["duration_ms"] = round(lag_ms + self.interval * 1000, 1)
+            logger.warning(
+                "[loop] stalled %.0fms; blocked in:\n%s", stall["duration_ms"], "".join(stall["stack"][-6:])
+            )
+
+    # ── Watchdog thread ──────────────────────────────────────────────────────
+
+    def _watch(self) -> None:
+        poll = max(0.01, min(self.interval, self.stall / 2))
+        while not self._stop.wait(poll):
+            beat = self._beat
+            overdue = time.monotonic() - beat - self.interval
+            if overdue < self.stall or self._open_stall is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stall = {
+                "at": time.time(),
+                "overdue_ms_at_capture": round(overdue * 1000, 1),
+                "duration_ms": None,  # filled in when the loop wakes
+                "stack": traceback.format_stack(frame, limit=STACK_LIMIT),
+            }
+            self._stall_total += 1
+            self._stalls.append(stall)
+            self._open_stall = stall
+
+    # ── Reporting ────────────────────────────────────────────────────────────
+
+    def _percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th observation."""
+        if not self._count:
+            return None
+        target = q * self._count
+        seen = 0
+        for bound, n in zip(LAG_BUCKETS_MS, self._buckets):
+            seen += n
+            if seen >= target:
+                return bound
+        return round(self._max_ms, 1)  # open bucket: the max bounds it
+
+    def metrics(self, with_stacks: bool = True) -> Dict[str, Any]:
+        histogram = {f"le_{b}ms": n for b, n in zip(LAG_BUCKETS_MS, self._buckets)}
+        histogram["gt_{}ms".format(LAG_BUCKETS_MS[-1])] = self._buckets[-1]
+        return {
+            "running": self._task is not None,
+            "interval_ms": self.interval * 1000,
+            "stall_threshold_ms": self.stall * 1000,
+            "samples": self._count,
+            "lag_avg_ms": round(self._sum_ms / self._count, 3) if self._count else 0.0,
+            "lag_max_ms": round(self._max_ms, 1),
+            "lag_p50_ms": self._percentile(0.5),
+            "lag_p99_ms": self._percentile(0.99),
+            "histogram": histogram,
+            "stalls": self._stall_total,
+            "recent_stalls": [
+                {**s, "stack": s["stack"] if with_stacks else s["stack"][-1:]} for s in reversed(self._stalls)
+            ],
+        }
+
+
+loop_watchdog = LoopWatchdog(settings.LOOP_LAG_INTERVAL_MS, settings.LOOP_STALL_THRESHOLD_MS)
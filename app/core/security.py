@@ -5,6 +5,8 @@ from datetime import date
 from app.db.base import get_db
 from app.models.quota import UsageQuota
 from app.api.v1.player import get_client_ip
+from app.services.idempotency import command_calls, IdempotencyConflict, IDEMPOTENCY_HEADER
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,11 +14,53 @@ logger = logging.getLogger(__name__)
 # Config
 DAILY_REQUEST_LIMIT = 50 # Strict limit for MVP to save API keys
 
+async def _command_fingerprint(request: Request) -> str:
+    """What a retry must repeat to share an Idempotency-Key: the command's type and content."""
+    body = await request.body()  # already read and cached by FastAPI
+    try:
+        data = json.loads(body)
+        return command_calls.fingerprint(str(data.get("type")), str(data.get("content")))
+    except (ValueError, AttributeError):
+        return command_calls.fingerprint(body.decode("utf-8", "replace"))
+
+async def claim_idempotency_key(request: Request):
+    """
+    Dependency: claims the request's Idempotency-Key (scoped to the war) so
+    duplicates join or replay the original instead of re-running it. Must be
+    listed before check_rate_limit. If the owning request ends without the
+    command resolving the key (validation error, quota, crash), the key is
+    released so a retry runs again.
+    """
+    key = command_calls.scope(request.path_params.get("war_id"), request.headers.get(IDEMPOTENCY_HEADER))
+    if not key:
+        yield None
+        return
+    try:
+        call, owner = command_calls.claim(key, await _command_fingerprint(request))
+    except IdempotencyConflict:
+        raise HTTPException(status_code=422, detail=f"{IDEMPOTENCY_HEADER} was already used for a different command")
+    request.state.idempotent_call = (key, call, owner)
+    try:
+        yield call
+    except BaseException as e:
+        if owner and not call.future.done():
+            command_calls.fail(key, call, e)
+        raise
+    finally:
+        if owner and not call.future.done():
+            command_calls.fail(key, call, HTTPException(status_code=409, detail="Original request did not complete — retry"))
+
 async def check_rate_limit(request: Request, db: AsyncSession = Depends(get_db)):
     """
     Dependency to enforce daily quotas based on Client IP.
     Uses get_client_ip() for consistent IP extraction across proxies and proxies.
     """
+    # A retry with a claimed Idempotency-Key joins or replays the original
+    # command, which was already counted — don't bill it twice.
+    claimed = getattr(request.state, "idempotent_call", None)
+    if claimed is not None and not claimed[2]:
+        return True
+
     client_ip = get_client_ip(request)
     today = date.today()
     
@@ -34,6 +78,7 @@ async def check_rate_limit(request: Request, db: AsyncSession = Depends(get_db))
         quota = UsageQuota(identifier=client_ip, date=today, request_count=1)
         db.add(quota)
         await db.commit()
+        request.state.quota_id = quota.id
         return True
     
     if quota.request_count >= DAILY_REQUEST_LIMIT:
@@ -45,4 +90,5 @@ async def check_rate_limit(request: Request, db: AsyncSession = Depends(get_db))
     # Increment
     quota.request_count += 1
     await db.commit()
+    request.state.quota_id = quota.id
     return True
@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from app.core.config import settings
+from app.db.profiler import QueryProfiler
 
 # SQLite compatibility: CheckForSameThread=False
 connect_args = {}
@@ -24,6 +25,16 @@ engine = create_async_engine(
     connect_args=connect_args
 )
 
+# Statement timing for every router, worker and sweep that uses this engine
+query_profiler = QueryProfiler(
+    settings.SQL_SLOW_QUERY_MS,
+    settings.SQL_N_PLUS_ONE_THRESHOLD,
+    settings.SQL_EXPLAIN_SLOW,
+    settings.SQL_PROFILER_MAX_TEMPLATES,
+)
+if settings.SQL_PROFILER_ENABLED:
+    query_profiler.install(engine.sync_engine)
+
 # Session Factory
 SessionLocal = async_sessionmaker(
     bind=engine,
@@ -0,0 +1,219 @@
+"""
+SQL statement profiler.
+
+Cursor events on the engine time every statement. ``QueryProfilerMiddleware``
+opens a per-request scope (a contextvar, which SQLAlchemy's async greenlets
+inherit), so each request gets:
+* statement count and DB time, also sent back as ``Server-Timing: db``;
+* N+1 detection: the same SELECT run SQL_N_PLUS_ONE_THRESHOLD+ times in one
+  request is flagged once per (route, statement).
+
+Process-wide aggregates are kept per route and per statement template
+(whitespace collapsed, IN-lists folded). Statements slower than
+SQL_SLOW_QUERY_MS are logged. With SQL_EXPLAIN_SLOW, slow SELECTs are
+re-run under EXPLAIN QUERY PLAN (SQLite) or EXPLAIN ANALYZE (Postgres).
+This is a debug aid — ANALYZE executes the query a second time.
+
+Work outside a request (job worker, sweeps) is aggregated under "(background)".
+"""
+import logging
+import re
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND = "(background)"
+
+_WS = re.compile(r"\s+")
+# (?, ?, ?) / ($1, $2) / (%(p_1)s, %(p_2)s) -> (?…) so expanding IN lists share a template
+_PARAM_LIST = re.compile(r"\(\s*(?:\?|\$\d+|%\(\w+\)s)(?:\s*,\s*(?:\?|\$\d+|%\(\w+\)s))+\s*\)")
+
+
+def template_of(statement: str) -> str:
+    return _PARAM_LIST.sub("(?…)", _WS.sub(" ", statement).strip())
+
+
+def route_label(scope: Scope) -> Optional[str]:
+    """
+    "GET /api/v1/war/{war_id}/state" for a matched request. Routers are
+    mounted, so route.path is relative to the prefix: the raw path's leading
+    segments supply the prefix.
+    """
+    path = getattr(scope.get("route"), "path", None)
+    if path is None:
+        return None
+    depth = path.count("/")
+    prefix = scope["path"].rsplit("/", depth)[0] if depth else scope["path"]
+    return f"{scope['method']} {prefix}{path}"
+
+
+@dataclass(slots=True)
+class RequestQueries:
+    route: str  # aggregation key; the raw path until routing has matched
+    statements: int = 0
+    db_ms: float = 0.0
+    templates: Counter = field(default_factory=Counter)
+
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("sql_request_queries", default=None)
+
+
+class QueryProfiler:
+
+    def __init__(self, slow_ms: float, n_plus_one: int, explain_slow: bool, max_templates: int, slow_keep: int = 50):
+        self.slow_ms = slow_ms
+        self.n_plus_one = n_plus_one
+        self.explain_slow = explain_slow
+        self.max_templates = max_templates
+        self._routes: Dict[str, Dict[str, float]] = {}
+        self._templates: Dict[str, Dict[str, float]] = {}
+        self._slow: deque = deque(maxlen=slow_keep)
+        self._n_plus_one: Dict[tuple, int] = {}
+
+    # ── Engine hooks ─────────────────────────────────────────────────────────
+
+    def install(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+        if conn.info.get("explaining"):
+            return
+        template = template_of(statement)
+
+        scope = _current.get()
+        if scope is not None:
+            scope.statements += 1
+            scope.db_ms += elapsed_ms
+            scope.templates[template] += 1
+
+        stats = self._templates.get(template)
+        if stats is None:
+            if len(self._templates) >= self.max_templates:
+                template = "(other)"
+                stats = self._templates.setdefault(template, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            else:
+                stats = self._templates[template] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+        if elapsed_ms >= self.slow_ms:
+            plan = self._explain(conn, statement, parameters) if self.explain_slow else None
+            route = scope.route if scope else BACKGROUND
+            self._slow.append({
+                "route": route, "ms": round(elapsed_ms, 2), "statement": template[:500], "plan": plan,
+                "at": time.time(),
+            })
+            logger.warning("[sql] slow query %.1fms on %s: %s%s", elapsed_ms, route, template[:500],
+                           f"\n  plan: {plan}" if plan else "")
+
+    def _explain(self, conn, statement: str, parameters: Any) -> Optional[list]:
+        if not statement.lstrip().upper().startswith("SELECT"):
+            return None  # EXPLAIN ANALYZE would run the write again
+        prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN ANALYZE "
+        conn.info["explaining"] = True
+        try:
+            cursor = conn.connection.cursor()
+            try:
+                cursor.execute(prefix + statement, parameters)
+                return [" ".join(str(c) for c in row) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        except Exception as e:
+            return [f"EXPLAIN failed: {e}"]
+        finally:
+            conn.info["explaining"] = False
+
+    # ── Request scope ────────────────────────────────────────────────────────
+
+    def begin(self, route: str) -> tuple:
+        scope = RequestQueries(route)
+        return scope, _current.set(scope)
+
+    def end(self, scope: RequestQueries, token) -> None:
+        _current.reset(token)
+        stats = self._routes.setdefault(scope.route, {
+            "requests": 0, "statements": 0, "db_ms": 0.0, "max_statements": 0, "n_plus_one": 0,
+        })
+        stats["requests"] += 1
+        stats["statements"] += scope.statements
+        stats["db_ms"] += scope.db_ms
+        stats["max_statements"] = max(stats["max_statements"], scope.statements)
+        for template, count in scope.templates.items():
+            if count >= self.n_plus_one and template.startswith("SELECT"):
+                stats["n_plus_one"] += 1
+                key = (scope.route, template)
+                if key not in self._n_plus_one:
+                    logger.warning("[sql] possible N+1 on %s: %d× %s", scope.route, count, template[:300])
+                self._n_plus_one[key] = max(self._n_plus_one.get(key, 0), count)
+
+    # ── Reporting ────────────────────────────────────────────────────────────
+
+    def metrics(self, top: int = 20) -> Dict[str, Any]:
+        routes = {
+            route: {
+                **s,
+                "db_ms": round(s["db_ms"], 2),
+                "avg_statements": round(s["statements"] / s["requests"], 2),
+                "avg_db_ms": round(s["db_ms"] / s["requests"], 3),
+            }
+            for route, s in sorted(self._routes.items())
+        }
+        heaviest = sorted(self._templates.items(), key=lambda kv: kv[1]["total_ms"], reverse=True)[:top]
+        return {
+            "slow_query_ms": self.slow_ms,
+            "explain_slow": self.explain_slow,
+            "routes": routes,
+            "top_statements": [
+                {"statement": t[:500], "count": s["count"], "total_ms": round(s["total_ms"], 2),
+                 "avg_ms": round(s["total_ms"] / s["count"], 3), "max_ms": round(s["max_ms"], 2)}
+                for t, s in heaviest
+            ],
+            "n_plus_one": [
+                {"route": route, "statement": t[:300], "max_per_request": n}
+                for (route, t), n in self._n_plus_one.items()
+            ],
+            "slow": list(self._slow),
+        }
+
+
+class QueryProfilerMiddleware:
+    """Scopes SQL stats to each HTTP request and reports them in Server-Timing."""
+
+    def __init__(self, app: ASGIApp, profiler: QueryProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        queries, token = self.profiler.begin(f"{scope['method']} {scope['path']}")
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(raw=message["headers"]).append(
+                    "Server-Timing", f'db;dur={queries.db_ms:.1f};desc="{queries.statements} queries"'
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Aggregate by route template (/war/{war_id}/state), never by raw path
+            queries.route = route_label(scope) or f"{scope['method']} (unmatched)"
+            self.profiler.end(queries, token)
@@ -0,0 +1,191 @@
+"""
+Where a turn's simulation runs: inline or in a worker process.
+
+``SimulationEngine.advance`` is pure CPU. For the usual few units it takes
+well under a millisecond, so it stays on the event loop. Above
+SIM_OFFLOAD_MIN_WORK (units × ticks) it would hold every other request
+hostage. Those turns go to a ProcessPoolExecutor instead:
+* in: the stored snapshot dict, which is already decoded and cheap to
+  pickle;
+* out: ``World.to_compact`` tuples, pickled by the worker itself.
+
+The result is ~10^4 fresh tuples. Unpickled by the pool's reader thread,
+it set off cyclic GC passes over the whole parent heap, which hold the GIL
+and stalled the loop for 70ms+. So the worker returns bytes, and the
+parent decodes them on the loop with collection paused: ~5ms.
+
+Workers are spawned (not forked — the parent has threads and a running
+loop) and pre-warmed at startup, so the first heavy turn doesn't pay for
+interpreter start-up and imports. A turn that overruns SIM_TIMEOUT_SECONDS
+raises ``SimulationTimeout``. The worker finishes the turn in the
+background, but its result is discarded.
+
+The seed goes with the turn, so the result is the same whichever side ran
+it and replays stay exact.
+"""
+import asyncio
+import gc
+import logging
+import multiprocessing
+import pickle
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.engine.simulation import SimulationEngine
+from app.engine.state import Instruction, TurnOutcome, World
+
+logger = logging.getLogger(__name__)
+
+
+class SimulationTimeout(Exception):
+    pass
+
+
+# ── Worker side (module-level so it pickles by reference) ────────────────────
+
+def _advance_in_worker(snapshot: dict, instructions: list, n_ticks: int, authority: int, seed: int) -> bytes:
+    world = World.from_snapshot(snapshot)
+    outcome = SimulationEngine.advance(
+        world, n_ticks, [Instruction(*i) for i in instructions], authority, random.Random(seed),
+    )
+    return pickle.dumps((
+        world.to_compact(),
+        [(i.instruction_id, i.unit_id, i.action, i.parameters, i.cost_deducted) for i in outcome.instructions],
+        outcome.state_delta,
+        outcome.events,
+        outcome.game_over,
+        outcome.turn_id,
+    ), pickle.HIGHEST_PROTOCOL)
+
+
+def _loads_without_gc(blob: bytes) -> tuple:
+    # Acyclic tuples; a collection mid-decode would only re-walk the heap
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return pickle.loads(blob)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _warm() -> int:
+    """Runs once per worker at start-up: imports done, code paths touched."""
+    world = World.from_snapshot({
+        "player_units": [{"unit_id": "c", "type": "COMMANDER", "health": 1e9, "position": {}, "status": "ACTIVE"}],
+        "enemy_units": [{"unit_id": "w", "type": "WARLORD", "health": 1e9, "position": {}, "status": "ACTIVE"}],
+    })
+    SimulationEngine.advance(world, 1, (), 70, random.Random(0))
+    return multiprocessing.current_process().pid
+
+
+class TurnExecutor:
+
+    def __init__(self, workers: int, min_work: int, timeout: float):
+        self.workers = workers
+        self.min_work = min_work
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._stats = {"inline": 0, "offloaded": 0, "timeouts": 0, "pool_restarts": 0, "offload_ms_total": 0.0}
+
+    # ── Lifecycle ────────────────────────────────────────────────────────────
+
+    async def start(self) -> None:
+        """Spawn and pre-warm the pool (no-op with SIM_POOL_WORKERS=0)."""
+        if self.workers <= 0 or self._pool is not None:
+            return
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        loop = asyncio.get_running_loop()
+        try:
+            pids = await asyncio.gather(*(loop.run_in_executor(self._pool, _warm) for _ in range(self.workers)))
+        except Exception as e:
+            # e.g. a launcher script without a __main__ guard; serve inline rather than not at all
+            logger.error("[sim] simulation workers failed to start (%s) — running every turn inline", e)
+            broken, self._pool = self._pool, None
+            broken.shutdown(wait=False, cancel_futures=True)
+            return
+        logger.info("[sim] %d simulation workers ready (pids %s)", len(set(pids)), sorted(set(pids)))
+
+    async def shutdown(self) -> None:
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+    # ── Execution ────────────────────────────────────────────────────────────
+
+    async def advance(
+        self,
+        world: World,
+        snapshot: dict,
+        n_ticks: int,
+        instructions: List[Instruction],
+        authority: int,
+        seed: int,
+    ) -> TurnOutcome:
+        """
+        ``SimulationEngine.advance`` with a seeded rng, inline or pooled.
+        ``world`` must be the decode of ``snapshot``. The inline path
+        mutates it; the pooled path works from ``snapshot`` and returns a
+        new world.
+        """
+        work = (len(world.player_units) + len(world.enemy_units)) * max(1, n_ticks)
+        if self._pool is None or work < self.min_work:
+            self._stats["inline"] += 1
+            return SimulationEngine.advance(world, n_ticks, instructions, authority, random.Random(seed))
+
+        args = (
+            snapshot,
+            [(i.instruction_id, i.unit_id, i.action, i.parameters, i.cost_deducted) for i in instructions],
+            n_ticks, authority, seed,
+        )
+        t0 = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            blob = await asyncio.wait_for(
+                loop.run_in_executor(self._pool, _advance_in_worker, *args), self.timeout,
+            )
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            raise SimulationTimeout(f"simulation exceeded {self.timeout}s ({work} unit-ticks)")
+        except BrokenProcessPool:
+            # A worker died (OOM, kill). Replace the pool; this turn runs inline.
+            logger.error("[sim] worker pool broken — restarting it, running this turn inline")
+            self._stats["pool_restarts"] += 1
+            broken, self._pool = self._pool, None
+            broken.shutdown(wait=False, cancel_futures=True)
+            await self.start()
+            self._stats["inline"] += 1
+            return SimulationEngine.advance(world, n_ticks, instructions, authority, random.Random(seed))
+
+        compact, executed, state_delta, events, game_over, turn_id = _loads_without_gc(blob)
+        self._stats["offloaded"] += 1
+        self._stats["offload_ms_total"] += (time.perf_counter() - t0) * 1000
+        return TurnOutcome(
+            turn_id=turn_id,
+            instructions=[Instruction(*i) for i in executed],
+            state_delta=state_delta,
+            events=events,
+            game_over=game_over,
+            world=World.from_compact(compact),
+        )
+
+    def metrics(self) -> Dict[str, Any]:
+        offloaded = self._stats["offloaded"]
+        return {
+            "workers": self.workers if self._pool is not None else 0,
+            "min_work": self.min_work,
+            "timeout_seconds": self.timeout,
+            **{k: v for k, v in self._stats.items() if k != "offload_ms_total"},
+            "offload_avg_ms": round(self._stats["offload_ms_total"] / offloaded, 2) if offloaded else 0.0,
+        }
+
+
+turn_executor = TurnExecutor(
+    settings.SIM_POOL_WORKERS,
+    settings.SIM_OFFLOAD_MIN_WORK,
+    settings.SIM_TIMEOUT_SECONDS,
+)
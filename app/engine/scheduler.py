@@ -0,0 +1,45 @@
+"""
+Priority queue of pending engine work keyed by the tick it becomes due.
+
+Latency friction (``CommandFriction.latency_ticks``) turns into an
+``execution_delay`` on each instruction; the scheduler holds those
+instructions until the simulation reaches their due tick.
+"""
+import heapq
+from typing import Any, Iterator
+
+
+class TickScheduler:
+    """
+    Min-heap of (due_tick, seq, item). ``seq`` keeps FIFO order for items due
+    on the same tick and avoids ever comparing the items themselves.
+    """
+
+    __slots__ = ("_heap", "_seq")
+
+    def __init__(self):
+        self._heap: list[tuple[int, int, Any]] = []
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __iter__(self) -> Iterator[tuple[int, Any]]:
+        """(due_tick, item) pairs in execution order."""
+        for due, _, item in sorted(self._heap):
+            yield due, item
+
+    def push(self, due_tick: int, item: Any) -> None:
+        heapq.heappush(self._heap, (due_tick, self._seq, item))
+        self._seq += 1
+
+    def next_due(self) -> int | None:
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, tick: int) -> list[Any]:
+        """Remove and return everything due at or before ``tick``."""
+        heap = self._heap
+        due = []
+        while heap and heap[0][0] <= tick:
+            due.append(heapq.heappop(heap)[2])
+        return due
@@ -1,7 +1,8 @@
-import uuid
 import random
 from typing import List
 from app.engine.types import GameState, GameCommand, EngineInstruction, TurnResult
+from app.engine.state import World, Unit, Instruction, TurnOutcome, next_instruction_id
+from app.engine.spatial import BattlefieldIndex, SpatialGrid
 from app.models.player import Player
 
 
@@ -27,12 +28,25 @@ _ENEMY_BASE_DAMAGE = {
 }
 _ENEMY_DEFAULT_DAMAGE = (15, 35)
 
+# ── Ranges (world units; the battlefield is 100 × 100) ───────────────────────
+# Strike reach per unit type, measured from each living unit. From the start
+# line (z 80-90) the commander and armour reach the Warlord's line (z 10-25),
+# infantry does not; a force with nothing in reach gets no strike that tick.
+STRIKE_RANGE = {"COMMANDER": 85.0, "TANK": 75.0, "MECH": 60.0, "INFANTRY": 45.0}
+DEFAULT_STRIKE_RANGE = 50.0
+SIGHT_RADIUS = 30.0    # sectors within this distance of a living unit are unfogged
 
-def _pattern(instructions: List[EngineInstruction]) -> str:
+
+def _pattern(instructions: List[Instruction]) -> str:
     """Return the first instruction's action normalised to lowercase."""
     return instructions[0].action.lower() if instructions else "movement"
 
 
+def _centroid(units: List[Unit]) -> tuple[float, float]:
+    n = len(units)
+    return sum(u.x for u in units) / n, sum(u.z for u in units) / n
+
+
 def _closest_damage_key(pattern: str) -> str:
     """Map a raw pattern string to the nearest damage table key."""
     for key in _PLAYER_DAMAGE:
@@ -47,12 +61,39 @@ def _closest_damage_key(pattern: str) -> str:
     return "movement"
 
 
+def _strike_target(index: BattlefieldIndex, living_players: List[Unit], living_enemies: List[Unit]) -> Unit | None:
+    """
+    The Warlord / boss when some unit can reach it, otherwise the hostile
+    nearest the force's centre of mass that some unit reaches.
+
+    Living players are bucketed into one grid per strike range, so "can
+    anyone reach this enemy" is a few sector-local ``any_within`` lookups
+    instead of a scan over every player.
+    """
+    by_range: dict[float, SpatialGrid] = {}
+    for u in living_players:
+        reach = STRIKE_RANGE.get(u.type, DEFAULT_STRIKE_RANGE)
+        grid = by_range.get(reach)
+        if grid is None:
+            grid = by_range[reach] = SpatialGrid(index.players.grid_size)
+        grid.insert(u)
+
+    def in_reach(enemy: Unit) -> bool:
+        return any(grid.any_within(enemy.x, enemy.z, reach) for reach, grid in by_range.items())
+
+    boss = next((u for u in living_enemies if u.is_boss), None)
+    if boss and in_reach(boss):
+        return boss
+    ax, az = _centroid(living_players)
+    return index.enemies.nearest(ax, az, where=in_reach)
+
+
 class SimulationEngine:
 
     @staticmethod
     def validate_and_clamp(
-        command: GameCommand, player: Player, state: GameState
-    ) -> List[EngineInstruction]:
+        command: GameCommand, player: Player, state: GameState | World
+    ) -> List[Instruction]:
         """
         Safety valve / friction layer.
         Returns instructions with optional refusal or latency applied.
@@ -62,15 +103,15 @@ class SimulationEngine:
         if command.friction and command.friction.refusal_chance > 0:
             if random.random() < command.friction.refusal_chance:
                 for uid in command.target_unit_ids:
-                    instructions.append(EngineInstruction(
-                        instruction_id=str(uuid.uuid4()),
-                        unit_id=uid,
-                        action="HOLD",
-                        parameters={"reason": command.friction.message or "SIGNAL_LOST"},
-                        cost_deducted=0
+                    instructions.append(Instruction(
+                        next_instruction_id(),
+                        uid,
+                        "HOLD",
+                        {"reason": command.friction.message or "SIGNAL_LOST"},
                     ))
                 return instructions
 
+        action_str = command.intent.primary_pattern.upper()
         for uid in command.target_unit_ids:
             params: dict = {}
             if command.destination:
@@ -79,68 +120,145 @@ class SimulationEngine:
             if command.friction and command.friction.latency_ticks > 0:
                 params["execution_delay"] = command.friction.latency_ticks
 
-            action_str = command.intent.primary_pattern.upper()
-            instructions.append(EngineInstruction(
-                instruction_id=str(uuid.uuid4()),
-                unit_id=uid,
-                action=action_str,
-                parameters=params,
-                cost_deducted=0
-            ))
+            instructions.append(Instruction(next_instruction_id(), uid, action_str, params))
 
         return instructions
 
     @staticmethod
     def process_turn(
         current_state: GameState,
-        instructions: List[EngineInstruction],
+        instructions: List[EngineInstruction | Instruction],
         player_authority: int = 70,
     ) -> TurnResult:
         """
-        Advances the simulation by ONE TICK.
+        Pydantic boundary wrapper around ``step``: copies the state into the
+        lean representation, advances one tick and converts the result back.
+        """
+        world = World.from_model(current_state)
+        lean = [i if isinstance(i, Instruction) else Instruction.from_model(i) for i in instructions]
+        return SimulationEngine.step(world, lean, player_authority).to_model()
+
+    @staticmethod
+    def schedule(world: World, instructions: List[Instruction]) -> List[str]:
+        """
+        Queue instructions for the tick they become due. An ``execution_delay``
+        of N pushes the order N ticks past the next one. Returns event lines
+        for orders that did not go out immediately.
+        """
+        events = []
+        next_tick = world.turn_count + 1
+        for instr in instructions:
+            delay = int(instr.parameters.get("execution_delay", 0) or 0)
+            world.pending.push(next_tick + delay, instr)
+            if delay > 0:
+                events.append(f"Order to {instr.unit_id[-6:]} delayed — executes in {delay} tick(s).")
+        return events
+
+    @staticmethod
+    def advance(
+        world: World,
+        n_ticks: int = 1,
+        instructions: List[Instruction] = (),
+        player_authority: int = 70,
+        rng: random.Random | None = None,
+    ) -> TurnOutcome:
+        """
+        Schedules ``instructions`` and runs up to ``n_ticks`` ticks in one call,
+        executing pending orders as they fall due. Works on the lean World
+        throughout (no per-tick snapshots) and returns one aggregated outcome:
+        every executed instruction, all events, merged visual deltas and the
+        final world. Stops early if the war ends. A seeded ``rng`` makes the
+        whole call reproducible.
+        """
+        events = SimulationEngine.schedule(world, list(instructions))
+        executed: list[Instruction] = []
+        visual_updates: dict = {}
+        game_over = False
+
+        for _ in range(n_ticks):
+            due = world.pending.pop_due(world.turn_count + 1)
+            outcome = SimulationEngine.step(world, due, player_authority, rng)
+            executed.extend(due)
+            events.extend(outcome.events)
+            visual_updates.update(outcome.state_delta)
+            if outcome.game_over:
+                game_over = True
+                break
+
+        if world.pending and not game_over:
+            events.append(f"{len(world.pending)} order(s) in transit.")
+
+        return TurnOutcome(
+            turn_id=world.turn_count,
+            instructions=executed,
+            state_delta=visual_updates,
+            events=events,
+            game_over=game_over,
+            world=world,
+        )
+
+    @staticmethod
+    def step(
+        world: World,
+        instructions: List[Instruction],
+        player_authority: int = 70,
+        rng: random.Random | None = None,
+    ) -> TurnOutcome:
+        """
+        Advances the simulation by ONE TICK, mutating ``world`` in place.
+        ``instructions`` are executed now regardless of delay — use ``advance``
+        to honour ``execution_delay``.
 
-        Changes from previous version
-        ─────────────────────────────
-        • Player units AND enemy units are deep-copied and mutated.
         • Damage is calculated each turn based on command pattern + authority.
         • Enemy counterattacks every turn (pressure scales with turn number).
         • Win  → warlord health ≤ 0  (general_status set to DEAD)
         • Loss → commander health ≤ 0
+
+        Callers that need the previous state must keep their own copy
+        (e.g. the snapshot dict the world was decoded from).
+
+        Pass a seeded ``rng`` to make the tick reproducible (replay);
+        by default the module-level generator is used.
         """
-        new_turn = current_state.turn_count + 1
+        rng = rng or random  # module functions share the Random API
+        new_turn = world.turn_count + 1
         events: list[str] = []
         visual_updates: dict = {}
 
-        # Deep-copy both sides ────────────────────────────────────────────────
-        new_player_units = [u.model_copy() for u in current_state.player_units]
-        new_enemy_units  = [u.model_copy() for u in current_state.enemy_units]
+        player_units = world.player_units
+        enemy_units  = world.enemy_units
 
-        # ── 1. Movement (unchanged) ───────────────────────────────────────────
+        # Built once per world, then kept in sync as units move or die
+        if world.index is None:
+            world.index = BattlefieldIndex.build(world)
+        index: BattlefieldIndex = world.index
+
+        # ── 1. Movement ───────────────────────────────────────────────────────
+        by_id = {u.unit_id: u for u in player_units} if instructions else {}
         for instr in instructions:
-            unit = next((u for u in new_player_units if u.unit_id == instr.unit_id), None)
+            unit = by_id.get(instr.unit_id)
             if not unit:
                 continue
             if instr.action == "HOLD":
                 events.append(f"Unit {unit.unit_id[-4:]} holding position.")
                 continue
-            if "target_pos" in instr.parameters:
-                target = instr.parameters["target_pos"]
-                speed  = instr.parameters.get("speed", 5.0)
-                dx = target["x"] - unit.position["x"]
-                dz = target["z"] - unit.position["z"]
+            target = instr.parameters.get("target_pos")
+            if target:
+                speed = instr.parameters.get("speed", 5.0)
+                dx = target["x"] - unit.x
+                dz = target["z"] - unit.z
                 dist = (dx ** 2 + dz ** 2) ** 0.5
                 if dist <= speed:
-                    unit.position = target
+                    unit.x, unit.z = target["x"], target["z"]
                 else:
                     ratio = speed / dist
-                    unit.position = {
-                        "x": unit.position["x"] + dx * ratio,
-                        "z": unit.position["z"] + dz * ratio,
-                    }
+                    unit.x += dx * ratio
+                    unit.z += dz * ratio
+                index.players.move(unit)
 
         # ── 2. Combat setup ───────────────────────────────────────────────────
-        living_enemies = [u for u in new_enemy_units  if u.status != "DEAD"]
-        living_players = [u for u in new_player_units if u.status != "DEAD"]
+        living_enemies = [u for u in enemy_units  if u.status != "DEAD"]
+        living_players = [u for u in player_units if u.status != "DEAD"]
 
         pattern    = _pattern(instructions)
         dmg_key    = _closest_damage_key(pattern)
@@ -151,32 +269,28 @@ class SimulationEngine:
         auth_mod = 0.6 + (max(0, min(100, player_authority) - 20) / 200)
 
         # ── 3. Player strikes enemy ───────────────────────────────────────────
-        if living_enemies and not is_retreat:
+        if living_enemies and living_players and not is_retreat:
             base_min, base_max = _PLAYER_DAMAGE.get(dmg_key, _PLAYER_DAMAGE["movement"])
-            raw_dmg  = random.randint(base_min, base_max)
-            final_dmg = int(raw_dmg * auth_mod * (0.7 + random.random() * 0.6))
-
-            # Prefer warlord / boss as primary target
-            target_enemy = next(
-                (u for u in living_enemies
-                 if "BOSS" in (u.tags or []) or u.type == "WARLORD"),
-                None,
-            )
-            if not target_enemy:
-                # Otherwise hit the closest (lowest z = closest to player lines)
-                target_enemy = min(living_enemies, key=lambda u: u.position.get("z", 0))
+            raw_dmg  = rng.randint(base_min, base_max)
+            final_dmg = int(raw_dmg * auth_mod * (0.7 + rng.random() * 0.6))
 
-            target_enemy.health = max(0.0, target_enemy.health - final_dmg)
-            if target_enemy.health <= 0:
-                target_enemy.status = "DEAD"
-                events.append(
-                    f"⚡ {target_enemy.type} [{target_enemy.unit_id[-6:]}] ELIMINATED — {final_dmg} dmg"
-                )
+            target_enemy = _strike_target(index, living_players, living_enemies)
+
+            if target_enemy is None:
+                events.append("No hostile within strike range.")
             else:
-                events.append(
-                    f"Strike on {target_enemy.type}: -{final_dmg} HP "
-                    f"(remaining: {int(target_enemy.health)})"
-                )
+                target_enemy.health = max(0.0, target_enemy.health - final_dmg)
+                if target_enemy.health <= 0:
+                    target_enemy.status = "DEAD"
+                    index.enemies.remove(target_enemy)
+                    events.append(
+                        f"⚡ {target_enemy.type} [{target_enemy.unit_id[-6:]}] ELIMINATED — {final_dmg} dmg"
+                    )
+                else:
+                    events.append(
+                        f"Strike on {target_enemy.type}: -{final_dmg} HP "
+                        f"(remaining: {int(target_enemy.health)})"
+                    )
 
         # ── 4. Enemy counterattack ────────────────────────────────────────────
         if living_players:
@@ -187,19 +301,20 @@ class SimulationEngine:
                 dmg_key, _ENEMY_DEFAULT_DAMAGE
             )
             enemy_dmg = int(
-                random.randint(e_min, e_max) * turn_pressure * (0.7 + random.random() * 0.6)
+                rng.randint(e_min, e_max) * turn_pressure * (0.7 + rng.random() * 0.6)
             )
 
-            # Never target the commander until everyone else is gone
-            non_commander = [
-                u for u in living_players
-                if "COMMANDER" not in (u.tags or []) and u.type != "COMMANDER"
-            ]
-            target_player = non_commander[0] if non_commander else living_players[0]
+            # Hit the exposed unit nearest the enemy line; never target the
+            # commander until everyone else is gone
+            target_player = living_players[0]
+            if living_enemies:
+                ex, ez = _centroid(living_enemies)
+                target_player = index.players.nearest(ex, ez, where=lambda u: not u.is_commander) or target_player
 
             target_player.health = max(0.0, target_player.health - enemy_dmg)
             if target_player.health <= 0:
                 target_player.status = "DEAD"
+                index.players.remove(target_player)
                 events.append(
                     f"💀 {target_player.type} [{target_player.unit_id[-6:]}] DESTROYED — {enemy_dmg} dmg"
                 )
@@ -212,55 +327,46 @@ class SimulationEngine:
         # ── 5. Sacrificial charge — player also bleeds ────────────────────────
         if is_sacrificial:
             living_non_cmd = [
-                u for u in new_player_units
+                u for u in player_units
                 if u.status != "DEAD" and u.type != "COMMANDER"
             ]
             if living_non_cmd:
-                sacrifice_target = random.choice(living_non_cmd)
-                s_dmg = random.randint(50, 130)
+                sacrifice_target = rng.choice(living_non_cmd)
+                s_dmg = rng.randint(50, 130)
                 sacrifice_target.health = max(0.0, sacrifice_target.health - s_dmg)
                 if sacrifice_target.health <= 0:
                     sacrifice_target.status = "DEAD"
+                    index.players.remove(sacrifice_target)
                 events.append(
                     f"SACRIFICE: {sacrifice_target.unit_id[-6:]} takes {s_dmg} to hold the line."
                 )
 
         # ── 6. Occasional random flavour ─────────────────────────────────────
-        if random.random() < 0.08:
+        if rng.random() < 0.08:
             events.append("Signal intercept: Enemy flanking movement detected.")
             visual_updates["highlight_sectors"] = [7]
 
         # ── 7. Win / Loss check ───────────────────────────────────────────────
-        warlord_dead = any(
-            u.status == "DEAD"
-            and ("BOSS" in (u.tags or []) or u.type == "WARLORD")
-            for u in new_enemy_units
-        )
-        commander_dead = any(
-            u.status == "DEAD"
-            and ("COMMANDER" in (u.tags or []) or u.type == "COMMANDER")
-            for u in new_player_units
-        )
-        game_over    = warlord_dead or commander_dead
-        new_gen_stat = "DEAD" if warlord_dead else current_state.general_status
+        warlord_dead   = any(u.status == "DEAD" and u.is_boss for u in enemy_units)
+        commander_dead = any(u.status == "DEAD" and u.is_commander for u in player_units)
+        game_over = warlord_dead or commander_dead
 
         if warlord_dead:
+            world.general_status = "DEAD"
             events.append("★ WARLORD ELIMINATED — Engagement over.")
         if commander_dead:
             events.append("✖ COMMANDER LOST — Operation failed.")
 
-        new_state = current_state.model_copy(update={
-            "turn_count":    new_turn,
-            "player_units":  new_player_units,
-            "enemy_units":   new_enemy_units,
-            "general_status": new_gen_stat,
-        })
+        # ── 8. Fog of war — sectors within sight of a living unit ─────────────
+        world.fog_mask = index.players.visible_sectors(SIGHT_RADIUS)
+
+        world.turn_count = new_turn
 
-        return TurnResult(
+        return TurnOutcome(
             turn_id=new_turn,
             instructions=instructions,
             state_delta=visual_updates,
             events=events,
             game_over=game_over,
-            new_snapshot=new_state,
+            world=world,
         )
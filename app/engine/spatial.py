@@ -0,0 +1,208 @@
+"""
+Uniform-grid spatial index over the battlefield's abstract sector grid.
+
+The battlefield is a WORLD_SIZE × WORLD_SIZE square split into
+``grid_size × grid_size`` sectors (10 × 10 by default, matching
+``GameState.grid_size``). Sector ids are row-major: ``cz * grid_size + cx``.
+
+Units are bucketed by sector, so nearest / radius / occupancy queries only
+visit the sectors around the query point instead of every unit, and a move
+only touches the index when a unit crosses a sector boundary.
+"""
+import math
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+from app.engine.state import Unit, World
+
+WORLD_SIZE = 100.0
+
+
+class SpatialGrid:
+    """
+    Sector buckets for one side's units.
+
+    Positions outside the world square are clamped into the edge sectors.
+    """
+
+    __slots__ = ("grid_size", "cell_size", "_cells", "_where")
+
+    def __init__(self, grid_size: int = 10, world_size: float = WORLD_SIZE):
+        self.grid_size = grid_size
+        self.cell_size = world_size / grid_size
+        self._cells: dict[tuple[int, int], dict[str, Unit]] = {}
+        self._where: dict[str, tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, unit: Unit) -> bool:
+        return unit.unit_id in self._where
+
+    # ── Maintenance ──────────────────────────────────────────────────────────
+
+    def _cell(self, x: float, z: float) -> tuple[int, int]:
+        # Called on every move — plain comparisons beat min()/max() here
+        last = self.grid_size - 1
+        cx = int(x // self.cell_size)
+        cz = int(z // self.cell_size)
+        if cx < 0: cx = 0
+        elif cx > last: cx = last
+        if cz < 0: cz = 0
+        elif cz > last: cz = last
+        return cx, cz
+
+    def insert(self, unit: Unit) -> None:
+        cell = self._cell(unit.x, unit.z)
+        self._cells.setdefault(cell, {})[unit.unit_id] = unit
+        self._where[unit.unit_id] = cell
+
+    def remove(self, unit: Unit) -> None:
+        cell = self._where.pop(unit.unit_id, None)
+        if cell is None:
+            return
+        bucket = self._cells[cell]
+        del bucket[unit.unit_id]
+        if not bucket:
+            del self._cells[cell]
+
+    def move(self, unit: Unit) -> None:
+        """Re-bucket ``unit`` after its position changed. O(1); untracked units are ignored."""
+        old = self._where.get(unit.unit_id)
+        if old is None:
+            return
+        new = self._cell(unit.x, unit.z)
+        if old == new:
+            return
+        bucket = self._cells[old]
+        del bucket[unit.unit_id]
+        if not bucket:
+            del self._cells[old]
+        self._cells.setdefault(new, {})[unit.unit_id] = unit
+        self._where[unit.unit_id] = new
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def sector_id(self, x: float, z: float) -> int:
+        cx, cz = self._cell(x, z)
+        return cz * self.grid_size + cx
+
+    def occupancy(self) -> dict[int, int]:
+        """Unit count per occupied sector id."""
+        return {cz * self.grid_size + cx: len(bucket) for (cx, cz), bucket in self._cells.items()}
+
+    def _ring(self, cx: int, cz: int, r: int) -> Iterator[dict[str, Unit]]:
+        """Buckets at Chebyshev distance exactly ``r`` from (cx, cz)."""
+        cells = self._cells
+        if r == 0:
+            bucket = cells.get((cx, cz))
+            if bucket:
+                yield bucket
+            return
+        for dx in range(-r, r + 1):
+            for dz in (-r, r):
+                bucket = cells.get((cx + dx, cz + dz))
+                if bucket:
+                    yield bucket
+        for dz in range(-r + 1, r):
+            for dx in (-r, r):
+                bucket = cells.get((cx + dx, cz + dz))
+                if bucket:
+                    yield bucket
+
+    def nearest(
+        self,
+        x: float,
+        z: float,
+        max_radius: float = math.inf,
+        where: Callable[[Unit], bool] | None = None,
+    ) -> Unit | None:
+        """
+        Closest unit to (x, z) within ``max_radius`` (optionally matching
+        ``where``). Searches outward ring by ring and stops as soon as no
+        unsearched sector can hold anything closer.
+        """
+        if not self._where:
+            return None
+        cx, cz = self._cell(x, z)
+        best, best_d2 = None, max_radius * max_radius
+        for r in range(self.grid_size):
+            # Anything in ring r is at least (r - 1) sectors away
+            bound = max(0.0, (r - 1) * self.cell_size)
+            if bound * bound > best_d2:
+                break
+            for bucket in self._ring(cx, cz, r):
+                for unit in bucket.values():
+                    d2 = (unit.x - x) ** 2 + (unit.z - z) ** 2
+                    if d2 <= best_d2 and (where is None or where(unit)):
+                        if best is None or d2 < best_d2:
+                            best, best_d2 = unit, d2
+        return best
+
+    def within(self, x: float, z: float, radius: float) -> list[Unit]:
+        """All units within ``radius`` of (x, z)."""
+        span = int(math.ceil(radius / self.cell_size))
+        cx, cz = self._cell(x, z)
+        r2 = radius * radius
+        found = []
+        for gx in range(cx - span, cx + span + 1):
+            for gz in range(cz - span, cz + span + 1):
+                bucket = self._cells.get((gx, gz))
+                if not bucket:
+                    continue
+                for unit in bucket.values():
+                    if (unit.x - x) ** 2 + (unit.z - z) ** 2 <= r2:
+                        found.append(unit)
+        return found
+
+    def any_within(self, x: float, z: float, radius: float) -> bool:
+        """
+        Whether any unit lies within ``radius`` of (x, z). Searches the
+        nearest sectors first and stops at the first hit.
+        """
+        if not self._where:
+            return False
+        span = min(int(math.ceil(radius / self.cell_size)), self.grid_size - 1)
+        cx, cz = self._cell(x, z)
+        r2 = radius * radius
+        for r in range(span + 1):
+            for bucket in self._ring(cx, cz, r):
+                for unit in bucket.values():
+                    if (unit.x - x) ** 2 + (unit.z - z) ** 2 <= r2:
+                        return True
+        return False
+
+    def visible_sectors(self, radius: float) -> list[int]:
+        """
+        Sector ids within ``radius`` of any occupied sector's centre.
+        Cost scales with occupied sectors, not with unit count.
+        """
+        span = int(math.ceil(radius / self.cell_size))
+        reach2 = (radius / self.cell_size) ** 2
+        last = self.grid_size - 1
+        seen: set[int] = set()
+        for cx, cz in self._cells:
+            for gx in range(max(0, cx - span), min(last, cx + span) + 1):
+                for gz in range(max(0, cz - span), min(last, cz + span) + 1):
+                    if (gx - cx) ** 2 + (gz - cz) ** 2 <= reach2:
+                        seen.add(gz * self.grid_size + gx)
+        return sorted(seen)
+
+
+@dataclass(slots=True)
+class BattlefieldIndex:
+    """One grid per side, holding living units only."""
+    players: SpatialGrid
+    enemies: SpatialGrid
+
+    @classmethod
+    def build(cls, world: World) -> "BattlefieldIndex":
+        players = SpatialGrid(world.grid_size)
+        enemies = SpatialGrid(world.grid_size)
+        for u in world.player_units:
+            if u.status != "DEAD":
+                players.insert(u)
+        for u in world.enemy_units:
+            if u.status != "DEAD":
+                enemies.insert(u)
+        return cls(players, enemies)
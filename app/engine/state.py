@@ -0,0 +1,219 @@
+"""
+Lean engine-internal representations.
+
+The pydantic models in ``app.engine.types`` define the HTTP / DB contract.
+Inside the simulation we work on slotted dataclasses instead: no validation,
+no per-field descriptors, cheap attribute access and in-place mutation.
+Convert at the boundary with ``World.from_snapshot`` / ``World.to_snapshot``
+(DB JSON) or ``World.from_model`` / ``TurnOutcome.to_model`` (pydantic).
+"""
+import itertools
+import os
+import uuid
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.engine.types import GameState, EngineInstruction, TurnResult
+from app.engine.scheduler import TickScheduler
+
+# Instruction ids: a random prefix per process plus a counter. Orders can sit in
+# a war's snapshot across workers and restarts, so a bare counter would repeat
+# ids; the prefix keeps them apart while ids stay cheap and ordered in-process.
+_ID_PREFIX = uuid.uuid4().hex[:12]
+_ids = itertools.count(1)
+
+
+def _reseed_instruction_ids() -> None:
+    """Forked workers (the simulation pool) must not continue the parent's sequence."""
+    global _ID_PREFIX, _ids
+    _ID_PREFIX = uuid.uuid4().hex[:12]
+    _ids = itertools.count(1)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reseed_instruction_ids)
+
+
+def next_instruction_id() -> str:
+    """Unique across processes; increasing (also as a string) within one."""
+    return f"{_ID_PREFIX}{next(_ids):012x}"
+
+
+@dataclass(slots=True)
+class Unit:
+    unit_id: str
+    type: str
+    health: float
+    x: float
+    z: float
+    status: str
+    obedience: float = 1.0
+    hesitation: bool = False
+    morale: float = 100.0
+    tags: list[str] = field(default_factory=list)
+
+    @property
+    def is_boss(self) -> bool:
+        return "BOSS" in self.tags or self.type == "WARLORD"
+
+    @property
+    def is_commander(self) -> bool:
+        return "COMMANDER" in self.tags or self.type == "COMMANDER"
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Unit":
+        pos = d.get("position") or {}
+        return cls(
+            d["unit_id"], d["type"], float(d["health"]),
+            float(pos.get("x", 0.0)), float(pos.get("z", 0.0)),
+            d["status"],
+            d.get("obedience", 1.0), d.get("hesitation", False), d.get("morale", 100.0),
+            list(d.get("tags") or ()),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "unit_id": self.unit_id,
+            "type": self.type,
+            "health": self.health,
+            "position": {"x": self.x, "z": self.z},
+            "status": self.status,
+            "obedience": self.obedience,
+            "hesitation": self.hesitation,
+            "morale": self.morale,
+            "tags": list(self.tags),
+        }
+
+
+@dataclass(slots=True)
+class Instruction:
+    instruction_id: str
+    unit_id: str
+    action: str
+    parameters: dict[str, Any]
+    cost_deducted: int = 0
+
+    def to_dict(self) -> dict:
+        """Same shape as ``EngineInstruction.model_dump()``."""
+        return {
+            "instruction_id": self.instruction_id,
+            "unit_id": self.unit_id,
+            "action": self.action,
+            "parameters": self.parameters,
+            "cost_deducted": self.cost_deducted,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Instruction":
+        return cls(
+            str(d.get("instruction_id") or "") or next_instruction_id(),
+            d["unit_id"], d["action"], dict(d.get("parameters") or {}), d.get("cost_deducted", 0),
+        )
+
+    @classmethod
+    def from_model(cls, m: EngineInstruction) -> "Instruction":
+        return cls.from_dict(m.model_dump())
+
+
+@dataclass(slots=True)
+class World:
+    turn_count: int
+    player_units: list[Unit]
+    enemy_units: list[Unit]
+    general_status: str
+    terrain_modifiers: dict[str, Any] = field(default_factory=dict)
+    grid_size: int = 10
+    fog_mask: list[int] = field(default_factory=list)
+    # Latency-delayed orders waiting for their due tick
+    pending: TickScheduler = field(default_factory=TickScheduler)
+    # Transient spatial index (app.engine.spatial.BattlefieldIndex) — never serialised
+    index: Any = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> "World":
+        """Decode the JSON stored in ``WarSession.current_state_snapshot``."""
+        pending = TickScheduler()
+        for entry in snapshot.get("pending_instructions") or ():
+            pending.push(entry["due_tick"], Instruction.from_dict(entry))
+        return cls(
+            snapshot.get("turn_count", 0),
+            [Unit.from_dict(u) for u in snapshot.get("player_units", ())],
+            [Unit.from_dict(u) for u in snapshot.get("enemy_units", ())],
+            snapshot.get("general_status", "ALIVE"),
+            dict(snapshot.get("terrain_modifiers") or {}),
+            snapshot.get("grid_size", 10),
+            list(snapshot.get("fog_mask") or ()),
+            pending,
+        )
+
+    def to_snapshot(self) -> dict:
+        """Encode to the same JSON shape as ``GameState.model_dump()``."""
+        return {
+            "turn_count": self.turn_count,
+            "player_units": [u.to_dict() for u in self.player_units],
+            "enemy_units": [u.to_dict() for u in self.enemy_units],
+            "general_status": self.general_status,
+            "terrain_modifiers": self.terrain_modifiers,
+            "grid_size": self.grid_size,
+            "fog_mask": self.fog_mask,
+            "pending_instructions": [{"due_tick": due, **instr.to_dict()} for due, instr in self.pending],
+        }
+
+    def to_compact(self) -> tuple:
+        """
+        Positional tuples for shipping a world to a worker process — much
+        cheaper to pickle and rebuild than the snapshot dict. Not a storage
+        format: field order follows the dataclasses.
+        """
+        return (
+            self.turn_count,
+            [(u.unit_id, u.type, u.health, u.x, u.z, u.status, u.obedience, u.hesitation, u.morale, u.tags)
+             for u in self.player_units],
+            [(u.unit_id, u.type, u.health, u.x, u.z, u.status, u.obedience, u.hesitation, u.morale, u.tags)
+             for u in self.enemy_units],
+            self.general_status,
+            self.terrain_modifiers,
+            self.grid_size,
+            self.fog_mask,
+            [(due, i.instruction_id, i.unit_id, i.action, i.parameters, i.cost_deducted) for due, i in self.pending],
+        )
+
+    @classmethod
+    def from_compact(cls, data: tuple) -> "World":
+        turn_count, players, enemies, general_status, terrain, grid_size, fog_mask, pending_rows = data
+        pending = TickScheduler()
+        for due, *instr in pending_rows:
+            pending.push(due, Instruction(*instr))
+        return cls(
+            turn_count,
+            [Unit(*u) for u in players],
+            [Unit(*u) for u in enemies],
+            general_status, terrain, grid_size, fog_mask, pending,
+        )
+
+    @classmethod
+    def from_model(cls, state: GameState) -> "World":
+        return cls.from_snapshot(state.model_dump())
+
+    def to_model(self) -> GameState:
+        return GameState.model_validate(self.to_snapshot())
+
+
+@dataclass(slots=True)
+class TurnOutcome:
+    turn_id: int
+    instructions: list[Instruction]
+    state_delta: dict[str, Any]
+    events: list[str]
+    game_over: bool
+    world: World
+
+    def to_model(self) -> TurnResult:
+        return TurnResult(
+            turn_id=self.turn_id,
+            instructions=[EngineInstruction(**i.to_dict()) for i in self.instructions],
+            state_delta=self.state_delta,
+            events=self.events,
+            game_over=self.game_over,
+            new_snapshot=self.world.to_model(),
+        )
@@ -34,6 +34,9 @@ class GameState(BaseModel):
     # Visual Abstraction
     grid_size: int = 10 # 10x10 abstract grid
     fog_mask: List[int] = [] # List of visible sector IDs
+
+    # Latency-delayed orders: EngineInstruction fields + "due_tick"
+    pending_instructions: List[Dict[str, Any]] = []
     
     model_config = ConfigDict(from_attributes=True)
 
@@ -1,11 +1,18 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.loop_watchdog import loop_watchdog
 from app.core.config import settings
-from app.api.v1 import war, player
-from app.db.base import engine, Base
+from app.core.log_pipeline import setup_logging, shutdown_logging, RequestContextMiddleware
+setup_logging(settings.LOG_LEVEL, settings.LOG_FORMAT, settings.LOG_SAMPLE_RATES)
+from app.api.v1 import war, player, metrics, leaderboard
+from app.db.base import engine, Base, query_profiler
+from app.db.profiler import QueryProfilerMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
+import asyncio
+import logging
 import uuid
 
 # Import Models explicitly to register them with Base.metadata
@@ -16,6 +23,43 @@ from app.models import action as action_model
 from app.models import authority as authority_model
 from app.models import general as general_model
 from app.models import sitrep as sitrep_model
+from app.models import war_event as war_event_model
+from app.models import job as job_model
+from app.models import leaderboard as leaderboard_model
+from app.db.base import SessionLocal
+from app.services.authority import AuthorityLedger
+from app.services.jobs import job_queue
+from app.engine.executor import turn_executor
+from app.services import turn_jobs  # registers the deferred per-turn job handlers
+from app.services.leaderboard import Leaderboard, leaderboard as leaderboard_index
+from app.services.ai.local_model import local_judge
+
+logger = logging.getLogger(__name__)
+
+
+async def _authority_sweep_loop():
+    """Periodically materialise idle authority decay for all active wars."""
+    while True:
+        await asyncio.sleep(settings.AUTHORITY_SWEEP_INTERVAL_SECONDS)
+        try:
+            async with SessionLocal() as session:
+                changed = await AuthorityLedger.sweep(session)
+            if changed:
+                logger.info("[Authority] Sweep materialised decay for %d players", changed)
+        except Exception as e:
+            logger.warning("[Authority] Sweep failed (will retry): %s", e)
+
+async def _leaderboard_backfill():
+    """Seed player_standings from wars that ended before it existed, then warm the index."""
+    try:
+        async with SessionLocal() as session:
+            written = await Leaderboard.backfill_if_empty(session)
+            written += await Leaderboard.seed_total_ap(session)
+            if written:
+                logger.info("[Leaderboard] Backfilled standings for %d players", written)
+            await leaderboard_index.ensure_loaded(session)
+    except Exception as e:
+        logger.warning("[Leaderboard] Backfill skipped: %s", e)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -24,7 +68,7 @@ async def lifespan(app: FastAPI):
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
     except Exception as e:
-        print(f"Database initialization failed: {e}")
+        logger.error("Database initialization failed: %s", e)
 
     # Runtime column migrations — safely adds new columns to existing DB tables.
     # SQLite does NOT support UNIQUE in ALTER TABLE ADD COLUMN, so we add without it.
@@ -36,22 +80,56 @@ async def lifespan(app: FastAPI):
         "ALTER TABLE players ADD COLUMN last_seen_ip VARCHAR",
         "ALTER TABLE war_sessions ADD COLUMN last_command_at TIMESTAMP WITH TIME ZONE",
         "ALTER TABLE players ADD COLUMN total_ap_earned INTEGER DEFAULT 0",
+        "ALTER TABLE players ADD COLUMN authority_as_of TIMESTAMP WITH TIME ZONE",
+        "ALTER TABLE players ADD COLUMN last_seen_at TIMESTAMP WITH TIME ZONE",
+        "ALTER TABLE players ADD COLUMN authority_trend FLOAT DEFAULT 0",
+        "ALTER TABLE players ADD COLUMN pattern_counts JSON",
+        "ALTER TABLE war_sessions ADD COLUMN authority_delta_sum INTEGER DEFAULT 0",
+        "ALTER TABLE war_sessions ADD COLUMN judged_turns INTEGER DEFAULT 0",
+        "ALTER TABLE players ADD COLUMN last_command_at TIMESTAMP WITH TIME ZONE",
+        "ALTER TABLE player_standings ADD COLUMN version INTEGER DEFAULT 0",
+        "CREATE INDEX IF NOT EXISTS ix_player_standings_version ON player_standings (version)",
+        # Idle clock moved from the war to the player — seed it from the latest war
+        "UPDATE players SET last_command_at = (SELECT MAX(w.last_command_at) FROM war_sessions w"
+        " WHERE w.player_id = players.id) WHERE last_command_at IS NULL",
     ]
+    # One transaction per statement: on Postgres a failed statement aborts its
+    # whole transaction, so a shared one would lose every migration after the
+    # first "column already exists"
+    for sql in migrations:
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(text(sql))
+            logger.info("[Migration] Applied: %s", sql)
+        except Exception:
+            # Column already exists — safe to ignore
+            pass
+
+    sweep_task = asyncio.create_task(_authority_sweep_loop())
+    backfill_task = asyncio.create_task(_leaderboard_backfill())
+    job_queue.start()
+    await turn_executor.start()
     try:
-        async with engine.begin() as conn:
-            for sql in migrations:
-                try:
-                    await conn.execute(text(sql))
-                    print(f"[Migration] Applied: {sql}")
-                except Exception:
-                    # Column already exists — safe to ignore
-                    pass
+        local_judge.load(settings.LOCAL_JUDGMENT_MODEL_PATH, settings.LOCAL_JUDGMENT_MIN_SAMPLES)
     except Exception as e:
-        # Non-fatal: app can still start if migration fails on an unusual DB
-        print(f"[Migration] Warning: column migration skipped — {e}")
+        logger.warning("[local-judge] %s unreadable — tactic tables only: %s", settings.LOCAL_JUDGMENT_MODEL_PATH, e)
+    if settings.LOOP_WATCHDOG_ENABLED:
+        loop_watchdog.start()
 
     yield
 
+    await loop_watchdog.stop()
+    await turn_executor.shutdown()
+
+    for task in (sweep_task, backfill_task):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    # Flush deferred turn work before the process exits
+    await job_queue.drain(settings.JOB_DRAIN_TIMEOUT_SECONDS)
+    shutdown_logging()
 
 
 app = FastAPI(title=settings.PROJECT_NAME, version=settings.VERSION, lifespan=lifespan)
@@ -66,11 +144,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Request-ID"],
 )
 
+if settings.SQL_PROFILER_ENABLED:
+    app.add_middleware(QueryProfilerMiddleware, profiler=query_profiler)
+
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_BYTES,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+# Outermost, so every log line of the request (profiler, handlers) carries its id
+app.add_middleware(RequestContextMiddleware)
+
 # Include Routers
 app.include_router(player.router, prefix=f"{settings.API_V1_STR}/players", tags=["players"])
 app.include_router(war.router, prefix=f"{settings.API_V1_STR}/war", tags=["war"])
+app.include_router(leaderboard.router, prefix=f"{settings.API_V1_STR}/leaderboard", tags=["leaderboard"])
+app.include_router(metrics.router, prefix=f"{settings.API_V1_STR}/metrics", tags=["metrics"])
 
 @app.get("/")
 async def root():
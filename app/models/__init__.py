@@ -4,3 +4,6 @@ from app.models.war import WarSession
 from app.models.general import General
 from app.models.action import ActionLog
 from app.models.quota import UsageQuota
+from app.models.war_event import WarEvent, WarSnapshot
+from app.models.job import JobRecord
+from app.models.leaderboard import PlayerStanding
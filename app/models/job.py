@@ -0,0 +1,39 @@
+from sqlalchemy import String, Integer, JSON, DateTime, Uuid, Index, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+import uuid
+from datetime import datetime
+from app.db.base import Base
+
+class JobRecord(Base):
+    """
+    Durable deferred-work queue (outbox) used when JOB_QUEUE_BACKEND=database.
+    Rows are written in the same transaction as the turn that produced them
+    and consumed by ``python -m app.worker``.
+    """
+    __tablename__ = "job_queue"
+    __table_args__ = (Index("ix_job_queue_status_available", "status", "available_at"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind: Mapped[str] = mapped_column(String) # "turn_logs", "player_progress"
+    payload: Mapped[dict] = mapped_column(JSON, default=dict)
+
+    status: Mapped[str] = mapped_column(String, default="PENDING") # PENDING, CLAIMED, FAILED
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class AppliedProgress(Base):
+    """
+    One row per turn whose "player_progress" job has landed. Written in the
+    same transaction as the player update, so a re-delivered job (queues are
+    at-least-once) finds its turn here and is skipped instead of counted twice.
+    """
+    __tablename__ = "applied_progress"
+
+    war_id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), ForeignKey("war_sessions.id"), primary_key=True)
+    turn_id: Mapped[int] = mapped_column(Integer, primary_key=True)
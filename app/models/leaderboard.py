@@ -0,0 +1,40 @@
+from sqlalchemy import String, Integer, Float, DateTime, Uuid, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from typing import Optional
+import uuid
+from datetime import datetime
+from app.db.base import Base
+
+class PlayerStanding(Base):
+    """
+    Materialised leaderboard row, one per player who has earned AP.
+    Maintained incrementally when a war ends and when a turn's progress is
+    applied (services/leaderboard.py) — never derived from war snapshots at
+    read time.
+    """
+    __tablename__ = "player_standings"
+
+    player_id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), ForeignKey("players.id"), primary_key=True)
+    username: Mapped[str] = mapped_column(String)
+
+    total_ap: Mapped[int] = mapped_column(Integer, default=0, index=True)  # players.total_ap_earned as of the last applied turn
+    wars_ended: Mapped[int] = mapped_column(Integer, default=0)
+    wins: Mapped[int] = mapped_column(Integer, default=0)
+    win_rate: Mapped[float] = mapped_column(Float, default=0.0, index=True)
+    fastest_victory_turns: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
+
+    version: Mapped[int] = mapped_column(Integer, default=0, index=True)  # StandingsClock value of the last write
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
+
+
+class StandingsClock(Base):
+    """
+    Single-row counter stamped onto every player_standings write. Bumped
+    just before commit and row-locked until then, so versions commit in
+    order and rank indexes can refresh with ``version > last_seen``.
+    """
+    __tablename__ = "player_standings_clock"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=0)
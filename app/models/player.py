@@ -1,4 +1,4 @@
-from sqlalchemy import String, Integer, JSON, DateTime, Uuid, Boolean
+from sqlalchemy import String, Integer, Float, JSON, DateTime, Uuid, Boolean
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from typing import Optional
@@ -15,11 +15,18 @@ class Player(Base):
     # IP-based identity — primary auth mechanism
     ip_address: Mapped[Optional[str]] = mapped_column(String, unique=True, index=True, nullable=True)
     last_seen_ip: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # tracks if IP changed
+    last_seen_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)  # throttled; see services/identity.py
     
     # Authority System
     authority_level: Mapped[int] = mapped_column(Integer, default=1)
     authority_points: Mapped[int] = mapped_column(Integer, default=100)
+    authority_as_of: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)  # instant authority_points was valid (idle decay ledger)
+    last_command_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)  # last command in any war — the idle clock
     total_ap_earned: Mapped[int] = mapped_column(Integer, default=0)  # cumulative across all wars
+    authority_trend: Mapped[float] = mapped_column(Float, default=0.0)  # EWMA of per-turn authority delta
+    
+    # Maintained per turn — {primary_pattern: times used}
+    pattern_counts: Mapped[dict] = mapped_column(JSON, default=dict)
     
     # AI State
     prelude_seen: Mapped[bool] = mapped_column(Boolean, default=False)
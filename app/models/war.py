@@ -14,6 +14,10 @@ class WarSession(Base):
     status: Mapped[str] = mapped_column(String, default="ACTIVE") # ACTIVE, PAUSED, ENDED
     turn_count: Mapped[int] = mapped_column(Integer, default=0)
     
+    # Running judgment aggregates, updated with each turn
+    authority_delta_sum: Mapped[int] = mapped_column(Integer, default=0)
+    judged_turns: Mapped[int] = mapped_column(Integer, default=0)
+    
     # Game State Persistence
     # Stores the authoritative snapshot of the entire battlefield (units, positions, health)
     current_state_snapshot: Mapped[dict] = mapped_column(JSON, default=dict)
@@ -32,3 +36,5 @@ class WarSession(Base):
     actions = relationship("ActionLog", back_populates="war")
     authority_logs = relationship("AuthorityLog", back_populates="war", cascade="all, delete-orphan")
     sitreps = relationship("SitRepLog", back_populates="war", cascade="all, delete-orphan")
+    events = relationship("WarEvent", back_populates="war", cascade="all, delete-orphan")
+    snapshots = relationship("WarSnapshot", back_populates="war", cascade="all, delete-orphan")
@@ -0,0 +1,42 @@
+from sqlalchemy import String, Integer, JSON, Uuid, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import func
+import uuid
+from datetime import datetime
+from app.db.base import Base
+
+class WarEvent(Base):
+    """
+    Append-only record of one engine call: everything needed to re-run it
+    (inputs + RNG seed) and everything it produced (outputs + judgment).
+    """
+    __tablename__ = "war_events"
+    __table_args__ = (UniqueConstraint("war_id", "turn_id", name="uq_war_events_war_turn"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    war_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("war_sessions.id"), index=True)
+    turn_id: Mapped[int] = mapped_column(Integer) # turn_count AFTER this event was applied
+    kind: Mapped[str] = mapped_column(String, default="TURN")
+
+    # Inputs: {"instructions": [...], "n_ticks": 1, "player_authority": 85, "rng_seed": 123}
+    # Outputs: {"events": [...], "game_over": false, "friction": {...}, "judgment": {...}, "authority_delta": 4}
+    payload: Mapped[dict] = mapped_column(JSON, default=dict)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    war = relationship("WarSession", back_populates="events")
+
+
+class WarSnapshot(Base):
+    """Periodic full battlefield state — replay starts from the nearest one."""
+    __tablename__ = "war_snapshots"
+    __table_args__ = (UniqueConstraint("war_id", "turn_id", name="uq_war_snapshots_war_turn"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    war_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("war_sessions.id"), index=True)
+    turn_id: Mapped[int] = mapped_column(Integer)
+    state: Mapped[dict] = mapped_column(JSON) # World.to_snapshot()
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    war = relationship("WarSession", back_populates="snapshots")
@@ -0,0 +1,175 @@
+"""
+Admission control for ``POST /war/{war_id}/command``.
+
+Each command holds a DB session and usually waits on Gemini. When either
+was slow, commands piled up without bound. Now:
+
+* At most COMMAND_MAX_IN_FLIGHT commands run at once. Past that, a
+  request is shed with 503 + Retry-After before it touches the database.
+  Retry-After is estimated from recent turn times.
+* Every admitted command gets a deadline, COMMAND_DEADLINE_MS after
+  arrival. Its judgment tier is chosen from the time left, the queue depth
+  and each model's rolling p90 latency:
+
+    full     JUDGMENT_MODEL        depth < ADMISSION_LITE_DEPTH × cap, p90 fits
+    lite     JUDGMENT_LITE_MODEL   depth < ADMISSION_OFFLINE_DEPTH × cap, p90 fits
+    offline  the pre-rolled tactic fallback
+
+Latency samples older than ADMISSION_LATENCY_WINDOW_SECONDS are dropped.
+A tier that was skipped for being slow is tried again once its samples
+age out. The counters are per process, like the idempotency store.
+"""
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+from app.core.config import settings
+
+TIERS = ("full", "lite", "offline")
+
+# Left for the commit and response after the judgment returns
+_COMMIT_RESERVE_MS = 250
+
+
+class AdmissionController:
+
+    def __init__(self, max_in_flight: int, deadline_ms: int, lite_depth: float, offline_depth: float, window: float):
+        self.max_in_flight = max_in_flight
+        self.deadline_ms = deadline_ms
+        self.lite_depth = lite_depth
+        self.offline_depth = offline_depth
+        self.window = window
+        self.in_flight = 0
+        self._llm: Dict[str, Deque[Tuple[float, float]]] = {"full": deque(maxlen=256), "lite": deque(maxlen=256)}
+        self._turns: Deque[Tuple[float, float]] = deque(maxlen=256)
+        self._stats = {"admitted": 0, "shed": 0, **{f"tier_{t}": 0 for t in TIERS}}
+
+    # ── Admission ────────────────────────────────────────────────────────────
+
+    def try_admit(self) -> Optional[float]:
+        """Deadline (monotonic seconds) for a new command, or None when saturated."""
+        if self.max_in_flight > 0 and self.in_flight >= self.max_in_flight:
+            self._stats["shed"] += 1
+            return None
+        self.in_flight += 1
+        self._stats["admitted"] += 1
+        return time.monotonic() + self.deadline_ms / 1000
+
+    def release(self, started: float) -> None:
+        self.in_flight -= 1
+        now = time.monotonic()
+        self._turns.append((now, (now - started) * 1000))
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free: one median turn per queue's worth of backlog."""
+        turn_ms = self._percentile(self._turns, 0.5) or 1000.0
+        backlog = self.in_flight / max(1, self.max_in_flight)
+        return max(1, min(30, math.ceil(turn_ms / 1000 * backlog)))
+
+    # ── Degradation ──────────────────────────────────────────────────────────
+
+    def judgment_tier(self, deadline: Optional[float]) -> Tuple[str, int]:
+        """
+        (tier, budget_ms) for a judgment starting now. The budget is what
+        remains of the deadline, capped by JUDGMENT_LATENCY_BUDGET_MS.
+        """
+        remaining = self.deadline_ms if deadline is None else (deadline - time.monotonic()) * 1000
+        budget = self._budget(remaining)
+        # Load from the other commands in flight (this one holds a slot too)
+        depth = (self.in_flight - 1) / self.max_in_flight if self.max_in_flight > 0 else 0.0
+
+        tier = "offline"
+        if budget > 0:
+            if depth < self.lite_depth and self._fits("full", budget):
+                tier = "full"
+            elif depth < self.offline_depth and self._fits("lite", budget):
+                tier = "lite"
+        self._stats[f"tier_{tier}"] += 1
+        return tier, max(0, int(budget))
+
+    def current_tier(self) -> str:
+        """Tier a command arriving now would get, without counting it."""
+        depth = self.in_flight / self.max_in_flight if self.max_in_flight > 0 else 0.0
+        budget = self._budget(self.deadline_ms)
+        if depth < self.lite_depth and self._fits("full", budget):
+            return "full"
+        if depth < self.offline_depth and self._fits("lite", budget):
+            return "lite"
+        return "offline"
+
+    def observe_llm(self, tier: str, elapsed_ms: float) -> None:
+        """A model call's latency. Timeouts report just over the budget they missed."""
+        samples = self._llm.get(tier)
+        if samples is not None:
+            samples.append((time.monotonic(), elapsed_ms))
+
+    @staticmethod
+    def _budget(remaining_ms: float) -> float:
+        budget = remaining_ms - _COMMIT_RESERVE_MS
+        if settings.JUDGMENT_LATENCY_BUDGET_MS > 0:
+            budget = min(budget, settings.JUDGMENT_LATENCY_BUDGET_MS)
+        return budget
+
+    def _fits(self, tier: str, budget_ms: float) -> bool:
+        p90 = self._percentile(self._llm[tier], 0.9)
+        return p90 is None or p90 <= budget_ms  # no recent history: try it
+
+    def _percentile(self, samples: Deque[Tuple[float, float]], q: float) -> Optional[float]:
+        cutoff = time.monotonic() - self.window
+        while samples and samples[0][0] < cutoff:
+            samples.popleft()
+        if not samples:
+            return None
+        values = sorted(ms for _, ms in samples)
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def metrics(self) -> Dict[str, Any]:
+        def _ms(v: Optional[float]) -> Optional[float]:
+            return round(v, 1) if v is not None else None
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "deadline_ms": self.deadline_ms,
+            "current_tier": self.current_tier(),
+            **self._stats,
+            "turn_p50_ms": _ms(self._percentile(self._turns, 0.5)),
+            "llm_p90_ms": {t: _ms(self._percentile(s, 0.9)) for t, s in self._llm.items()},
+        }
+
+
+admission = AdmissionController(
+    settings.COMMAND_MAX_IN_FLIGHT,
+    settings.COMMAND_DEADLINE_MS,
+    settings.ADMISSION_LITE_DEPTH,
+    settings.ADMISSION_OFFLINE_DEPTH,
+    settings.ADMISSION_LATENCY_WINDOW_SECONDS,
+)
+
+
+async def admit_command(request: Request):
+    """
+    Dependency: takes an in-flight slot (503 + Retry-After if there is
+    none) and sets ``request.state.deadline``. List it after
+    claim_idempotency_key: retries that only join or replay an existing
+    command skip it.
+    """
+    claimed = getattr(request.state, "idempotent_call", None)
+    if claimed is not None and not claimed[2]:
+        yield None
+        return
+    deadline = admission.try_admit()
+    if deadline is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Command queue saturated — retry shortly",
+            headers={"Retry-After": str(admission.retry_after())},
+        )
+    request.state.deadline = deadline
+    started = time.monotonic()
+    try:
+        yield deadline
+    finally:
+        admission.release(started)
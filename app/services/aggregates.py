@@ -0,0 +1,58 @@
+"""
+Per-turn aggregates maintained on the player and war rows.
+
+Updated in the same transaction as the turn, so reading them is a column
+read — no scans of authority_logs / action_logs:
+
+* ``Player.authority_trend`` — EWMA of the per-turn authority delta
+* ``Player.pattern_counts``  — how often each command pattern was used
+* ``WarSession.authority_delta_sum`` / ``judged_turns`` — running totals
+"""
+from typing import Any, Dict
+
+from app.models.player import Player
+from app.models.war import WarSession
+from app.services.war_summary import TREND_ALPHA, trend_label
+
+
+class TurnAggregates:
+
+    @staticmethod
+    def apply(player: Player, war: WarSession, pattern: str, delta: int) -> None:
+        player.authority_trend = round(
+            TREND_ALPHA * delta + (1 - TREND_ALPHA) * (player.authority_trend or 0.0), 3
+        )
+        counts = dict(player.pattern_counts or {})
+        key = (pattern or "unknown").lower()
+        counts[key] = counts.get(key, 0) + 1
+        player.pattern_counts = counts
+
+        war.authority_delta_sum = (war.authority_delta_sum or 0) + delta
+        war.judged_turns = (war.judged_turns or 0) + 1
+
+    @staticmethod
+    def player_trend(player: Player) -> str:
+        return trend_label(player.authority_trend or 0.0)
+
+    @staticmethod
+    def player_stats(player: Player) -> Dict[str, Any]:
+        counts = player.pattern_counts or {}
+        return {
+            "authority_trend": TurnAggregates.player_trend(player),
+            "authority_trend_ewma": player.authority_trend or 0.0,
+            "pattern_counts": counts,
+            "favourite_pattern": max(counts, key=counts.get) if counts else None,
+            "commands_judged": sum(counts.values()),
+        }
+
+    @staticmethod
+    def war_stats(war: WarSession) -> Dict[str, Any]:
+        turns = war.judged_turns or 0
+        total = war.authority_delta_sum or 0
+        return {
+            "war_id": str(war.id),
+            "status": war.status,
+            "judged_turns": turns,
+            "authority_delta_sum": total,
+            "authority_delta_mean": round(total / turns, 2) if turns else 0.0,
+        }
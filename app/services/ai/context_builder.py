@@ -1,6 +1,7 @@
 from typing import List, Dict, Any
 from app.models.war import WarSession
 from app.engine.types import GameState
+from app.engine.state import World
 
 class ContextBuilder:
     """
@@ -9,7 +10,7 @@ class ContextBuilder:
     """
     
     @staticmethod
-    def build_judgment_context(war: WarSession, current_state: GameState, recent_logs: List[str], player_pkg: Dict[str, Any] = None) -> Dict[str, Any]:
+    def build_judgment_context(war: WarSession, current_state: GameState | World, recent_logs: List[str], player_pkg: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Creates the payload to send to Cixus for judgment.
         Now includes Deep Context.
@@ -31,13 +32,15 @@ class ContextBuilder:
             "turn_count": current_state.turn_count,
             "casualties": casualty_report,
             "recent_events": recent_logs,
+            # Rolling, fixed-size account of earlier turns (services/war_summary.py)
+            "history": war.history_summary or "",
             "terrain": terrain_context,
             "player_authority": player_pkg.get("authority", 50) if player_pkg else 50,
             "authority_trend": player_pkg.get("trend", "stable") if player_pkg else "stable"
         }
 
     @staticmethod
-    def _analyze_casualties(state: GameState) -> Dict[str, int]:
+    def _analyze_casualties(state: GameState | World) -> Dict[str, int]:
         # Count dead units
         dead_player = len([u for u in state.player_units if u.status == "DEAD"])
         dead_enemy = len([u for u in state.enemy_units if u.status == "DEAD"])
@@ -0,0 +1,171 @@
+"""
+Fit the local Cixus judgment model from logged Gemini judgments.
+
+    python -m app.services.ai.distill                  # writes LOCAL_JUDGMENT_MODEL_PATH
+    python -m app.services.ai.distill --out model.json --holdout 0.2
+
+Every judged turn leaves an ``AuthorityLog`` row holding the delta, the
+commentary and the context Cixus saw. Newer rows also carry the parsed
+intent and which tier answered, under ``context_snapshot["judged"]``.
+Older rows don't; their intent comes from the ``ActionLog`` row with the
+same war, commentary and delta.
+
+Only LLM judgments are learned from. Rows answered offline (by the tactic
+tables, or by this model) would just teach it to imitate the fallback.
+Legacy rows without a recorded tier are skipped when their commentary is
+a tactic-table line.
+
+The fit is ridge regression by NumPy least squares. The report compares
+holdout MAE against the tactic tables' expected AP, so it is clear
+whether the model beats the fallback it replaces.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.models import player, war, general, sitrep, quota, war_event, job, leaderboard  # noqa: F401 — register mappers
+from app.models.action import ActionLog
+from app.models.authority import AuthorityLog
+from app.services.ai.local_model import FEATURE_NAMES, features
+from app.services.ai.orchestrator import (
+    PATTERN_KEYS, encode_intent, _TACTIC_EFFECTS, _RISK_MULTIPLIERS, _ETHICAL_LEVY,
+)
+
+logger = logging.getLogger("app.distill")
+
+_LLM_TIERS = ("full", "lite")
+_TABLE_LINES = tuple(line for effect in _TACTIC_EFFECTS.values() for line in effect["lines"])
+_BANK_PER_PATTERN = 200
+_RIDGE = 1.0
+
+
+Sample = Tuple[Dict[str, Any], Dict[str, Any], int, str]  # (action_intent, sitrep, delta, commentary)
+
+
+async def load_samples(db) -> List[Sample]:
+    """(intent, sitrep, delta, commentary) for every turn Gemini judged."""
+    legacy_intents: Dict[tuple, List[dict]] = defaultdict(list)
+    for war_id, parsed, evaluation in (await db.execute(
+        select(ActionLog.war_id, ActionLog.parsed_action, ActionLog.cixus_evaluation)
+        .order_by(ActionLog.timestamp)
+    )).all():
+        if parsed and evaluation:
+            key = (war_id, evaluation.get("commentary"), evaluation.get("authority_change"))
+            legacy_intents[key].append(parsed)
+
+    samples: List[Sample] = []
+    rows = await db.execute(
+        select(AuthorityLog.war_id, AuthorityLog.delta, AuthorityLog.reason, AuthorityLog.context_snapshot)
+        .order_by(AuthorityLog.war_id, AuthorityLog.turn_id)
+    )
+    for war_id, delta, reason, context in rows.all():
+        if not context or reason is None:
+            continue
+        judged = context.get("judged")
+        if judged is not None:
+            if judged.get("tier") not in _LLM_TIERS:
+                continue
+            intent = {"intent": judged.get("intent") or {}}
+        else:
+            if reason.startswith(_TABLE_LINES):
+                continue
+            matches = legacy_intents.get((war_id, reason, delta))
+            if not matches:
+                continue
+            intent = matches.pop(0)
+        samples.append((intent, context, int(delta), reason))
+    return samples
+
+
+def _table_expectation(action_intent: Dict[str, Any]) -> float:
+    """Mean AP the tactic tables would award (the baseline being replaced)."""
+    pattern_id, risk_id, ethical_id = encode_intent(action_intent.get("intent") or {})
+    lo, hi = _TACTIC_EFFECTS[PATTERN_KEYS[pattern_id]]["ap"]
+    r_lo, r_hi = list(_RISK_MULTIPLIERS.values())[risk_id] if risk_id < len(_RISK_MULTIPLIERS) else (1.0, 1.2)
+    levy = list(_ETHICAL_LEVY.values())[ethical_id] if ethical_id < len(_ETHICAL_LEVY) else 0
+    return (lo + hi) / 2 * (r_lo + r_hi) / 2 + levy
+
+
+def fit(samples: List[Sample], holdout: float = 0.2, seed: int = 0) -> Dict[str, Any]:
+    """Ridge fit on a shuffled split; returns the artifact dict."""
+    import numpy as np
+
+    order = list(range(len(samples)))
+    random.Random(seed).shuffle(order)
+    n_test = int(len(order) * holdout) if len(order) >= 10 else 0
+    test, train = order[:n_test], order[n_test:]
+
+    X = np.array([features(samples[i][0], samples[i][1]) for i in range(len(samples))], dtype=np.float64)
+    y = np.array([s[2] for s in samples], dtype=np.float64)
+
+    def solve(rows: List[int]) -> "np.ndarray":
+        A, b = X[rows], y[rows]
+        reg = _RIDGE * np.eye(A.shape[1])
+        reg[0, 0] = 0.0  # don't shrink the bias
+        return np.linalg.solve(A.T @ A + reg, A.T @ b)
+
+    mae = baseline = None
+    if test:
+        w = solve(train)
+        mae = float(np.mean(np.abs(np.rint(X[test] @ w) - y[test])))
+        baseline = float(np.mean([abs(_table_expectation(samples[i][0]) - samples[i][2]) for i in test]))
+    weights = solve(order)  # final model uses everything
+
+    counts: Dict[str, int] = defaultdict(int)
+    bank: Dict[str, Dict[str, int]] = defaultdict(dict)
+    for intent, _, delta, commentary in samples:
+        pattern = PATTERN_KEYS[encode_intent(intent.get("intent") or {})[0]]
+        counts[pattern] += 1
+        bank[pattern][commentary] = delta  # dedupe lines, latest delta wins
+    return {
+        "version": 1,
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "samples": len(samples),
+        "features": FEATURE_NAMES,
+        "weights": [round(float(v), 6) for v in weights],
+        "pattern_counts": dict(counts),
+        "bank": {
+            p: [[d, line] for line, d in list(lines.items())[-_BANK_PER_PATTERN:]]
+            for p, lines in bank.items()
+        },
+        "mae": mae,
+        "baseline_mae": baseline,
+        "holdout": len(test),
+    }
+
+
+async def main(out: str, holdout: float) -> None:
+    async with SessionLocal() as db:
+        samples = await load_samples(db)
+    if not samples:
+        logger.warning("[distill] no Gemini-judged turns logged yet — nothing to train on")
+        return
+    artifact = await asyncio.to_thread(fit, samples, holdout)
+    with open(out, "w") as f:
+        json.dump(artifact, f)
+    logger.info(
+        "[distill] %d samples → %s (holdout %d: MAE %s vs tactic tables %s); per pattern %s",
+        artifact["samples"], out, artifact["holdout"], artifact["mae"], artifact["baseline_mae"], artifact["pattern_counts"],
+    )
+
+
+if __name__ == "__main__":
+    from app.core.log_pipeline import setup_logging, shutdown_logging
+    setup_logging(settings.LOG_LEVEL, "text")
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--out", default=settings.LOCAL_JUDGMENT_MODEL_PATH)
+    parser.add_argument("--holdout", type=float, default=0.2)
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.out, args.holdout))
+    finally:
+        shutdown_logging()
@@ -0,0 +1,158 @@
+"""
+Pool of Gemini API keys for Cixus judgments.
+
+With one ``GEMINI_API_KEY``, hitting that key's quota sent every player to
+the offline engine. Now GEMINI_API_KEYS (comma-separated, plus the single
+key if set) are pooled. Each call leases the least-loaded healthy key:
+
+* Load is a key's share of its per-minute budgets:
+  max(requests / GEMINI_KEY_RPM_LIMIT, tokens / GEMINI_KEY_TPM_LIMIT)
+  over the last 60s, with calls still in flight counted as requests.
+* A key at either limit is skipped until its window frees up, so the pool
+  stays under quota instead of discovering it through 429s.
+* A 429 puts the key on cooldown: GEMINI_KEY_COOLDOWN_SECONDS, doubled
+  for each consecutive 429 (capped at 8×). A successful call resets it.
+
+Throughput therefore scales with the number of keys provisioned. When
+every key is limited or cooling down, ``acquire`` returns None and the
+caller answers offline. Keys are never logged; metrics label them by
+position and their last four characters. Counters are per process.
+"""
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+_WINDOW_SECONDS = 60.0
+_MAX_COOLDOWN_FACTOR = 8
+
+
+@dataclass(slots=True)
+class KeyLease:
+    """One key's live state. Handed out by ``acquire``; return it with ``release``."""
+    key: str
+    label: str
+    in_flight: int = 0
+    requests: Deque[float] = field(default_factory=deque)
+    tokens: Deque[Tuple[float, int]] = field(default_factory=deque)
+    token_sum: int = 0
+    cooldown_until: float = 0.0
+    consecutive_429: int = 0
+    totals: Dict[str, int] = field(default_factory=lambda: {"requests": 0, "tokens": 0, "rate_limited": 0})
+
+
+class GeminiKeyPool:
+
+    def __init__(self, keys: List[str], rpm_limit: int, tpm_limit: int, cooldown: float):
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+        self.cooldown = cooldown
+        self._keys: List[KeyLease] = []
+        for key in keys:
+            if key and key not in (k.key for k in self._keys):
+                self._keys.append(KeyLease(key, f"key-{len(self._keys) + 1}…{key[-4:]}"))
+        self._stats = {"leased": 0, "exhausted": 0}
+
+    @property
+    def configured(self) -> bool:
+        return bool(self._keys)
+
+    # ── Leasing ──────────────────────────────────────────────────────────────
+
+    def acquire(self) -> Optional[KeyLease]:
+        """Least-loaded key that is off cooldown and under its limits, or None."""
+        now = time.monotonic()
+        best = self._pick(now)
+        if best is None:
+            self._stats["exhausted"] += 1
+            return None
+        best.in_flight += 1
+        best.requests.append(now)
+        best.totals["requests"] += 1
+        self._stats["leased"] += 1
+        return best
+
+    def release(self, lease: KeyLease, tokens: int = 0, rate_limited: bool = False) -> None:
+        now = time.monotonic()
+        lease.in_flight -= 1
+        if tokens:
+            lease.tokens.append((now, tokens))
+            lease.token_sum += tokens
+            lease.totals["tokens"] += tokens
+        if rate_limited:
+            lease.consecutive_429 += 1
+            lease.totals["rate_limited"] += 1
+            factor = min(_MAX_COOLDOWN_FACTOR, 2 ** (lease.consecutive_429 - 1))
+            lease.cooldown_until = now + self.cooldown * factor
+        else:
+            lease.consecutive_429 = 0
+
+    def peek(self) -> Optional[str]:
+        """The key ``acquire`` would lease right now, without leasing or counting it."""
+        best = self._pick(time.monotonic())
+        return best.key if best else None
+
+    def _pick(self, now: float) -> Optional[KeyLease]:
+        best, best_load = None, None
+        for lease in self._keys:
+            if lease.cooldown_until > now:
+                continue
+            load = self._load(lease, now)
+            if load >= 1.0:
+                continue
+            if best_load is None or load < best_load or (load == best_load and lease.in_flight < best.in_flight):
+                best, best_load = lease, load
+        return best
+
+    def has_capacity(self) -> bool:
+        """Whether ``acquire`` would succeed right now (doesn't lease)."""
+        now = time.monotonic()
+        return any(l.cooldown_until <= now and self._load(l, now) < 1.0 for l in self._keys)
+
+    # ── Rates ────────────────────────────────────────────────────────────────
+
+    def _load(self, lease: KeyLease, now: float) -> float:
+        cutoff = now - _WINDOW_SECONDS
+        while lease.requests and lease.requests[0] < cutoff:
+            lease.requests.popleft()
+        while lease.tokens and lease.tokens[0][0] < cutoff:
+            lease.token_sum -= lease.tokens.popleft()[1]
+        rpm = len(lease.requests) / self.rpm_limit if self.rpm_limit > 0 else 0.0
+        tpm = lease.token_sum / self.tpm_limit if self.tpm_limit > 0 else 0.0
+        return max(rpm, tpm)
+
+    def metrics(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "keys": len(self._keys),
+            "rpm_limit": self.rpm_limit,
+            "tpm_limit": self.tpm_limit,
+            **self._stats,
+            "per_key": [
+                {
+                    "key": lease.label,
+                    "utilization": round(self._load(lease, now), 3),
+                    "requests_last_minute": len(lease.requests),
+                    "tokens_last_minute": lease.token_sum,
+                    "in_flight": lease.in_flight,
+                    "cooldown_seconds": round(max(0.0, lease.cooldown_until - now), 1),
+                    **lease.totals,
+                }
+                for lease in self._keys
+            ],
+        }
+
+
+def _configured_keys() -> List[str]:
+    keys = [k.strip() for k in (settings.GEMINI_API_KEYS or "").split(",")]
+    return [k for k in keys + [settings.GEMINI_API_KEY or ""] if k]
+
+
+key_pool = GeminiKeyPool(
+    _configured_keys(),
+    settings.GEMINI_KEY_RPM_LIMIT,
+    settings.GEMINI_KEY_TPM_LIMIT,
+    settings.GEMINI_KEY_COOLDOWN_SECONDS,
+)
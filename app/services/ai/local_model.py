@@ -0,0 +1,121 @@
+"""
+Local Cixus judgment model, distilled from logged Gemini judgments.
+
+``python -m app.services.ai.distill`` fits it from ``AuthorityLog`` /
+``ActionLog`` and writes a JSON artifact (LOCAL_JUDGMENT_MODEL_PATH). It
+has two parts:
+
+* a ridge regression predicting ``authority_change`` from the intent
+  (pattern / risk / ethical one-hots) and the sitrep (casualties,
+  authority, trend);
+* a bank of real Gemini commentary per pattern, tagged with the delta it
+  came with. The line whose delta is nearest the prediction is picked,
+  with a random choice among the closest few so the voice doesn't loop.
+
+Inference is a ~30-term dot product and a bisect in plain Python, a few
+microseconds, so it can run on the loop. It only answers for patterns it
+saw at least LOCAL_JUDGMENT_MIN_SAMPLES times. Anything else goes to the
+hand-tuned tactic tables.
+"""
+import bisect
+import json
+import logging
+import os
+import random
+from typing import Any, Dict, List, Optional
+
+from app.services.ai.orchestrator import PATTERN_KEYS, RISK_KEYS, ETHICAL_KEYS, encode_intent
+
+logger = logging.getLogger(__name__)
+
+TRENDS = ("rising", "stable", "falling")
+FEATURE_NAMES = (
+    ["bias"]
+    + [f"pattern:{k}" for k in PATTERN_KEYS]
+    + [f"risk:{k}" for k in RISK_KEYS] + ["risk:other"]
+    + [f"ethical:{k}" for k in ETHICAL_KEYS] + ["ethical:other"]
+    + [f"trend:{t}" for t in TRENDS]
+    + ["player_lost", "enemy_lost", "authority"]
+)
+_CASUALTY_CAP = 10.0
+_NEAREST = 3
+
+
+def features(action_intent: Dict[str, Any], sitrep: Dict[str, Any]) -> List[float]:
+    """Feature vector shared by training and inference (order = FEATURE_NAMES)."""
+    pattern_id, risk_id, ethical_id = encode_intent(action_intent.get("intent") or {})
+    x = [0.0] * len(FEATURE_NAMES)
+    x[0] = 1.0
+    base = 1
+    x[base + pattern_id] = 1.0
+    base += len(PATTERN_KEYS)
+    x[base + risk_id] = 1.0
+    base += len(RISK_KEYS) + 1
+    x[base + ethical_id] = 1.0
+    base += len(ETHICAL_KEYS) + 1
+    trend = sitrep.get("authority_trend", "stable")
+    x[base + (TRENDS.index(trend) if trend in TRENDS else 1)] = 1.0
+    base += len(TRENDS)
+    casualties = sitrep.get("casualties") or {}
+    x[base] = min(float(casualties.get("player_lost", 0) or 0), _CASUALTY_CAP)
+    x[base + 1] = min(float(casualties.get("enemy_lost", 0) or 0), _CASUALTY_CAP)
+    x[base + 2] = float(sitrep.get("player_authority", 50) or 0) / 100.0
+    return x
+
+
+class LocalJudgmentModel:
+
+    def __init__(self):
+        self.weights: Optional[List[float]] = None
+        self.covered: frozenset = frozenset()
+        self._bank: Dict[str, tuple] = {}  # pattern -> (sorted deltas, lines)
+        self.meta: Dict[str, Any] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return self.weights is not None
+
+    def load(self, path: str, min_samples: int) -> bool:
+        """Load an artifact written by ``distill``; False (and stay unloaded) if absent or stale."""
+        if not path or not os.path.exists(path):
+            return False
+        with open(path) as f:
+            artifact = json.load(f)
+        if artifact.get("features") != FEATURE_NAMES:
+            logger.warning("[local-judge] %s was trained on a different feature set — ignoring it", path)
+            return False
+        self.weights = [float(w) for w in artifact["weights"]]
+        self._bank = {}
+        for pattern, entries in artifact["bank"].items():
+            entries = sorted(entries)
+            self._bank[pattern] = ([d for d, _ in entries], [t for _, t in entries])
+        self.covered = frozenset(
+            p for p, n in artifact["pattern_counts"].items() if n >= min_samples and p in self._bank
+        )
+        self.meta = {k: artifact.get(k) for k in ("trained_at", "samples", "mae", "baseline_mae")}
+        logger.info("[local-judge] loaded %s: %d samples, covers %s", path, artifact.get("samples", 0), sorted(self.covered))
+        return True
+
+    def judge(self, action_intent: Dict[str, Any], sitrep: Dict[str, Any]) -> Optional[dict]:
+        """A judgment in Gemini's shape, or None when this intent's pattern isn't covered."""
+        if self.weights is None:
+            return None
+        pattern = PATTERN_KEYS[encode_intent(action_intent.get("intent") or {})[0]]
+        if pattern not in self.covered:
+            return None
+        x = features(action_intent, sitrep)
+        ap = int(round(sum(w * v for w, v in zip(self.weights, x))))
+
+        deltas, lines = self._bank[pattern]
+        i = bisect.bisect_left(deltas, ap)
+        lo, hi = max(0, i - _NEAREST), min(len(deltas), i + _NEAREST)
+        candidates = sorted(range(lo, hi), key=lambda j: abs(deltas[j] - ap))[:_NEAREST]
+        return {
+            "commentary": lines[random.choice(candidates)],
+            "authority_change": ap,
+            "morale_impact": "HIGH" if abs(ap) > 8 else "MEDIUM" if abs(ap) > 3 else "LOW",
+            "enemy_reaction": "AGGRESSIVE" if ap > 5 else "DEFENSIVE" if ap < 0 else "UNKNOWN",
+        }
+
+
+local_judge = LocalJudgmentModel()
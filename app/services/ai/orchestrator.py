@@ -1,8 +1,16 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Awaitable, Callable, Optional
+from dataclasses import dataclass
+from functools import lru_cache
+import asyncio
+import json
+import logging
+import re
 import uuid
 import random
 from app.engine.types import GameCommand
 
+logger = logging.getLogger(__name__)
+
 # ── Offline Cixus tactic fallback engine ─────────────────────────────────────
 # Triggered when Gemini is unavailable (no key, quota hit, API error).
 # Returns a judgment dict identical in shape to the Gemini response.
@@ -116,6 +124,34 @@ _ETHICAL_LEVY = {
 }
 
 
+# Stable id vocabularies for the batch API. Unknown risk / ethical values map
+# to the id one past the end, which carries the scalar path's defaults.
+PATTERN_KEYS = tuple(_TACTIC_EFFECTS)
+RISK_KEYS    = tuple(_RISK_MULTIPLIERS)
+ETHICAL_KEYS = tuple(_ETHICAL_LEVY)
+MORALE_LEVELS = ("LOW", "MEDIUM", "HIGH")
+
+
+def _resolve_pattern(pattern: str) -> str:
+    """Find the closest entry in the tactic table for a free-form pattern."""
+    if pattern in _TACTIC_EFFECTS:
+        return pattern
+    for key in _TACTIC_EFFECTS:
+        if key in pattern or pattern in key:
+            return key
+    return "movement"
+
+
+def encode_intent(intent: dict) -> tuple[int, int, int]:
+    """Map an intent dict to (pattern_id, risk_id, ethical_id) for the batch API."""
+    pattern      = (intent.get("primary_pattern") or "movement").lower()
+    risk_profile = (intent.get("risk_profile")    or "calculated").lower()
+    ethical      = (intent.get("ethical_weight")  or "standard").lower()
+    risk_id    = RISK_KEYS.index(risk_profile) if risk_profile in _RISK_MULTIPLIERS else len(RISK_KEYS)
+    ethical_id = ETHICAL_KEYS.index(ethical) if ethical in _ETHICAL_LEVY else len(ETHICAL_KEYS)
+    return PATTERN_KEYS.index(_resolve_pattern(pattern)), risk_id, ethical_id
+
+
 def _tactic_fallback_judgment(
     action_intent: dict,
     reputation: dict | None = None,
@@ -130,14 +166,7 @@ def _tactic_fallback_judgment(
     ethical      = (intent.get("ethical_weight")  or "standard").lower()
 
     # Find closest entry in table
-    effect = _TACTIC_EFFECTS.get(pattern)
-    if not effect:
-        for key in _TACTIC_EFFECTS:
-            if key in pattern or pattern in key:
-                effect = _TACTIC_EFFECTS[key]
-                break
-        else:
-            effect = _TACTIC_EFFECTS["movement"]
+    effect = _TACTIC_EFFECTS[_resolve_pattern(pattern)]
 
     # Base AP (random within pattern range)
     ap_min, ap_max = effect["ap"]
@@ -186,6 +215,48 @@ def _tactic_fallback_judgment(
     }
 
 
+def tactic_fallback_judgment_batch(pattern_ids, risk_ids, ethical_ids, rng=None) -> dict:
+    """
+    Vectorised ``_tactic_fallback_judgment`` for offline balance sweeps and bulk
+    simulation. Ids come from ``encode_intent`` (or index ``PATTERN_KEYS`` etc.).
+
+    Draws follow the scalar path exactly: uniform base AP per pattern, uniform
+    risk multiplier (inverted for negative outcomes), banker's rounding, then
+    the ethical levy. Reputation codas are text-only and not modelled here.
+
+    Returns a dict of NumPy arrays: ``authority_change``, ``line_index`` (into
+    the pattern's commentary lines) and ``morale_impact`` (into MORALE_LEVELS).
+    """
+    import numpy as np
+
+    rng = rng if rng is not None else np.random.default_rng()
+    pattern_ids = np.asarray(pattern_ids)
+    risk_ids    = np.asarray(risk_ids)
+    ethical_ids = np.asarray(ethical_ids)
+    n = pattern_ids.shape[0]
+
+    ap_bounds  = np.array([_TACTIC_EFFECTS[k]["ap"] for k in PATTERN_KEYS], dtype=np.float64)
+    n_lines    = np.array([len(_TACTIC_EFFECTS[k]["lines"]) for k in PATTERN_KEYS])
+    risk_bounds = np.array([_RISK_MULTIPLIERS[k] for k in RISK_KEYS] + [(1.0, 1.2)], dtype=np.float64)
+    levies     = np.array([_ETHICAL_LEVY[k] for k in ETHICAL_KEYS] + [0], dtype=np.int32)
+
+    base_ap = rng.uniform(ap_bounds[pattern_ids, 0], ap_bounds[pattern_ids, 1])
+    multiplier = rng.uniform(risk_bounds[risk_ids, 0], risk_bounds[risk_ids, 1])
+    multiplier = np.where(base_ap < 0, 1 / multiplier, multiplier)
+    ap = np.rint(base_ap * multiplier).astype(np.int32) + levies[ethical_ids]
+
+    line_index = (rng.random(n) * n_lines[pattern_ids]).astype(np.int8)
+
+    magnitude = np.abs(ap)
+    morale = np.where(magnitude > 8, 2, np.where(magnitude > 3, 1, 0)).astype(np.int8)
+
+    return {
+        "authority_change": ap,
+        "line_index": line_index,
+        "morale_impact": morale,
+    }
+
+
 _QUOTA_FALLBACK_LABEL = "[SIGNAL SATURATED]"
 _API_FALLBACK_LABEL   = "[SIGNAL DISTORTED]"
 
@@ -357,6 +428,134 @@ confidence_level (how certain you are in this judgment)
 No extra text. No apologies. No emojis.
 """
 
+# ── Judgment preparation ─────────────────────────────────────────────────────
+# A judgment needs persona + voice + intent + sitrep. All but the sitrep are
+# known straight after parsing, so the voice is picked (and the offline
+# fallback rolled) before the simulation runs. Prompt encoding and token
+# accounting live in prompt_builder.
+
+_PERSONALITY_MODIFIERS = {
+    "Ruthless":   "This commander has earned a reputation for ruthlessness. Be terse, cold, and unsparing. Do not soften blows.",
+    "Merciful":   "This commander is known for mercy. Respond with philosophical depth. Let them feel the weight of compassion without mocking it.",
+    "Aggressive": "This commander charges where others pause. Reward decisive violence. Punish hesitation. Be blunt and direct.",
+    "Defensive":  "This commander builds walls. Acknowledge patience as discipline, but note when it becomes paralysis.",
+    "Cunning":    "This commander operates through deception. Match their subtlety. Acknowledge misdirection as craft.",
+    "Reckless":   "This commander gambles lives. Be curt. Note losses without ceremony.",
+    "Calculated": "This commander is deliberate. Acknowledge precision. Note when deliberation costs tempo.",
+    "Hesitant":   "This commander wavers. Your tone is measured contempt \u2014 not mockery, disappointed precision.",
+    "Decisive":   "This commander decides quickly. Respond in kind: compact, final, authoritative.",
+    "Veteran":    "This commander has seen much. Speak as an equal witness of war, not as a teacher.",
+}
+
+# Which path produced each judgment — llm (full / lite model), budget_fallback,
+# error_fallback, offline (no key), shed (admission control skipped the LLM),
+# keys_exhausted (every pooled key at its limit or cooling down). "local" counts
+# answers from the distilled model, whether taken outright or as the fallback
+_JUDGMENT_STATS = {"llm": 0, "llm_lite": 0, "budget_fallback": 0, "error_fallback": 0, "offline": 0, "shed": 0, "keys_exhausted": 0, "local": 0}
+
+# Configured model per (API key, voice, model name) — built once, not on every turn
+_MODELS: Dict[tuple, Any] = {}
+# Async client per API key. genai.configure() is process-global, so pooled keys
+# each get their own GAPIC client, handed to the model as its async client.
+# That hook is SDK-internal: the SDK is pinned in requirements.txt and
+# tests/test_gemini_client.py fails if a release stops honouring it
+_CLIENTS: Dict[str, Any] = {}
+
+
+@dataclass(slots=True)
+class JudgmentDraft:
+    voice: str | None        # dominant reputation trait driving the system instruction
+    action_intent: dict
+    fallback: dict
+    usage: dict | None = None  # token accounting, set when Gemini answered
+    tier: str = "offline"      # which tier answered: full, lite, local or offline
+    rate_limited: bool = False  # the key answered 429 / quota exhausted
+
+
+@lru_cache(maxsize=None)
+def _persona_prompt(voice: str | None) -> str:
+    """System prompt plus the voice adaptation for the dominant trait (one per trait)."""
+    if voice is None:
+        return CIXUS_SYSTEM_PROMPT
+    return (
+        f"{CIXUS_SYSTEM_PROMPT}\n\n9. Voice Adaptation (Based on Observed Commander Pattern)\n\n"
+        f"{_PERSONALITY_MODIFIERS[voice]}"
+    )
+
+
+def _key_client(api_key: str):
+    """The async GAPIC client for one API key, built on first use."""
+    client = _CLIENTS.get(api_key)
+    if client is None:
+        from google.ai import generativelanguage as glm
+        client = _CLIENTS[api_key] = glm.GenerativeServiceAsyncClient(client_options={"api_key": api_key})
+    return client
+
+
+def _judgment_model(api_key: str, voice: str | None, model_name: str):
+    """Model with the persona + voice as its system instruction, one per (key, voice, model)."""
+    model = _MODELS.get((api_key, voice, model_name))
+    if model is None:
+        import google.generativeai as genai
+        model = genai.GenerativeModel(model_name,
+            system_instruction=_persona_prompt(voice),
+            generation_config={"response_mime_type": "application/json"}
+        )
+        model._async_client = _key_client(api_key)
+        _MODELS[(api_key, voice, model_name)] = model
+    return model
+
+
+class CommentaryStream:
+    """
+    Pulls the ``"commentary"`` string out of a JSON judgment while it is
+    still arriving, so it can be shown as Gemini writes it. ``feed`` takes
+    the next raw chunk and returns the newly decoded commentary text ("" if
+    none yet). An escape sequence split across chunks is held back until
+    it is complete.
+    """
+
+    _KEY = re.compile(r'"commentary"\s*:\s*"')
+
+    def __init__(self):
+        self._buf = ""
+        self._pos: Optional[int] = None  # next undecoded index inside the string value
+        self._done = False
+
+    def feed(self, chunk: str) -> str:
+        if self._done or not chunk:
+            return ""
+        self._buf += chunk
+        if self._pos is None:
+            match = self._KEY.search(self._buf)
+            if not match:
+                return ""
+            self._pos = match.end()
+        buf, i, n = self._buf, self._pos, len(self._buf)
+        while i < n:
+            c = buf[i]
+            if c == "\\":
+                step = 2
+                if i + 1 < n and buf[i + 1] == "u":
+                    # a high surrogate is only decodable together with its pair
+                    step = 12 if buf[i + 2:i + 4].lower() in ("d8", "d9", "da", "db") else 6
+                if i + step > n:
+                    break
+                i += step
+            elif c == '"':
+                self._done = True
+                break
+            else:
+                i += 1
+        raw, self._pos = buf[self._pos:i], i
+        if not raw:
+            return ""
+        try:
+            return json.loads(f'"{raw}"')
+        except ValueError:
+            return raw
+
+
 class AIOrchestrator:
     """
     Handles interactions with LLMs (Gemini).
@@ -430,71 +629,182 @@ class AIOrchestrator:
             friction=friction
         )
 
+    @staticmethod
+    def prepare_judgment(action_intent: dict, reputation: dict = None) -> JudgmentDraft:
+        """
+        Everything about the judgment that is known once the intent is parsed:
+        the voice (and so the system instruction) and the offline fallback.
+        Call before the simulation so only the sitrep is left for later.
+        """
+        voice = None
+        if reputation:
+            trait, val = max(reputation.items(), key=lambda x: x[1], default=(None, 0.0))
+            if trait and val > 0.15 and trait in _PERSONALITY_MODIFIERS:
+                voice = trait
+
+        return JudgmentDraft(voice, action_intent, _tactic_fallback_judgment(action_intent, reputation))
+
+    @staticmethod
+    def warm_judgment(draft: JudgmentDraft, tier: str = "full") -> None:
+        """
+        Call as soon as the draft exists, before simulating. Builds the model
+        ``finish_judgment`` is likely to use and starts its key's gRPC channel
+        connecting in the background. A cold or idle channel then does its
+        connect and TLS handshake while the simulation runs, instead of after
+        it. Nothing is sent to Gemini, so outcomes and quota are unaffected.
+        Transports without a channel to open (REST) are left alone.
+        """
+        from google.ai.generativelanguage_v1beta.services.generative_service.transports import (
+            GenerativeServiceGrpcAsyncIOTransport,
+        )
+        from app.core.config import settings
+        from app.services.ai.key_pool import key_pool
+
+        if tier == "offline" or not key_pool.configured:
+            return
+        api_key = key_pool.peek()
+        if api_key is None:
+            return
+        model_name = settings.JUDGMENT_LITE_MODEL if tier == "lite" else settings.JUDGMENT_MODEL
+        _judgment_model(api_key, draft.voice, model_name)
+        transport = _key_client(api_key).transport
+        if isinstance(transport, GenerativeServiceGrpcAsyncIOTransport):
+            # Non-blocking: asks grpc to connect if IDLE, returns the current state
+            transport.grpc_channel.get_state(try_to_connect=True)
+
+    @staticmethod
+    async def finish_judgment(
+        draft: JudgmentDraft,
+        sitrep: dict,
+        budget_ms: int | None = None,
+        tier: str = "full",
+        on_text: Callable[[str], Awaitable[None]] | None = None,
+    ) -> dict:
+        """
+        Completes a prepared judgment with the sitrep. ``tier`` (from admission
+        control) picks the model: "full", "lite", or "offline" to skip the
+        LLM. Gemini races the latency budget (``JUDGMENT_LATENCY_BUDGET_MS``
+        by default, 0 = wait); if it loses, errors, or there is no key, the
+        distilled local model answers where it is trained, else the
+        pre-computed tactic fallback. LOCAL_JUDGMENT_SHARE of turns go to
+        the local model first. ``draft.tier`` records who answered.
+        With ``on_text`` the response is streamed and the commentary is
+        passed to it piece by piece as it arrives; the returned judgment
+        is still the authoritative one.
+        """
+        import time
+        from app.core.config import settings
+        from app.services.admission import admission
+        from app.services.ai.key_pool import key_pool
+
+        # The distilled model takes its share of turns outright — no LLM round trip
+        if settings.LOCAL_JUDGMENT_SHARE > 0 and random.random() < settings.LOCAL_JUDGMENT_SHARE:
+            local = AIOrchestrator._local_judgment(draft, sitrep)
+            if local is not None:
+                return local
+        if not key_pool.configured:
+            logger.info("[Cixus] No GEMINI_API_KEY — using offline fallback engine.", extra={"event": "judgment.offline"})
+            _JUDGMENT_STATS["offline"] += 1
+            return AIOrchestrator._offline_judgment(draft, sitrep)
+        if tier == "offline":
+            logger.info("[Cixus] Under load — offline fallback without an LLM call.", extra={"event": "judgment.shed"})
+            _JUDGMENT_STATS["shed"] += 1
+            return AIOrchestrator._offline_judgment(draft, sitrep)
+        lease = key_pool.acquire()
+        if lease is None:
+            logger.warning("[Cixus] Every Gemini key is at its limit or cooling down — offline fallback.", extra={"event": "judgment.keys_exhausted"})
+            _JUDGMENT_STATS["keys_exhausted"] += 1
+            return AIOrchestrator._offline_judgment(draft, sitrep)
+
+        budget_ms = settings.JUDGMENT_LATENCY_BUDGET_MS if budget_ms is None else budget_ms
+        model_name = settings.JUDGMENT_LITE_MODEL if tier == "lite" else settings.JUDGMENT_MODEL
+        draft.tier = tier
+        started = time.monotonic()
+        call = asyncio.ensure_future(AIOrchestrator._gemini_judgment(lease.key, model_name, draft, sitrep, on_text))
+        try:
+            if budget_ms > 0:
+                # wait_for cancels the request if it overruns
+                judgment = await asyncio.wait_for(call, budget_ms / 1000)
+            else:
+                judgment = await call
+        except asyncio.TimeoutError:
+            logger.warning("[Cixus] Judgment exceeded %dms budget — offline fallback.", budget_ms, extra={"event": "judgment.budget_fallback"})
+            _JUDGMENT_STATS["budget_fallback"] += 1
+            admission.observe_llm(tier, budget_ms + 1)  # overran: counts as not fitting this budget
+            return AIOrchestrator._offline_judgment(draft, sitrep)
+        finally:
+            key_pool.release(lease, draft.usage["total_tokens"] if draft.usage else 0, draft.rate_limited)
+        if draft.tier == tier:
+            admission.observe_llm(tier, (time.monotonic() - started) * 1000)
+        return judgment
+
+    @staticmethod
+    def _local_judgment(draft: JudgmentDraft, sitrep: dict) -> dict | None:
+        """The distilled local model's answer, if it covers this intent."""
+        from app.services.ai.local_model import local_judge
+
+        judgment = local_judge.judge(draft.action_intent, sitrep)
+        if judgment is not None:
+            _JUDGMENT_STATS["local"] += 1
+            draft.tier = "local"
+        return judgment
+
+    @staticmethod
+    def _offline_judgment(draft: JudgmentDraft, sitrep: dict) -> dict:
+        """Without Gemini: the local model where it is trained, else the tactic tables."""
+        local = AIOrchestrator._local_judgment(draft, sitrep)
+        if local is not None:
+            return local
+        draft.tier = "offline"
+        return draft.fallback
+
     @staticmethod
     async def get_cixus_judgment(action_intent: dict, sitrep: dict, reputation: dict = None) -> dict:
         """
         Evaluates the turn using Gemini. Adapts Cixus's voice to the commander's earned reputation.
         """
-        import os
-        import json
-        import google.generativeai as genai
-        
-        api_key = os.getenv("GEMINI_API_KEY")
-        
-        if not api_key:
-            print("[Cixus] No GEMINI_API_KEY — using offline fallback engine.")
-            return _tactic_fallback_judgment(action_intent, reputation)
+        draft = AIOrchestrator.prepare_judgment(action_intent, reputation)
+        return await AIOrchestrator.finish_judgment(draft, sitrep)
+
+    @staticmethod
+    async def _gemini_judgment(
+        api_key: str, model_name: str, draft: JudgmentDraft, sitrep: dict,
+        on_text: Callable[[str], Awaitable[None]] | None = None,
+    ) -> dict:
+        from app.core.config import settings
+        from app.services.ai.prompt_builder import build_judgment_prompt, record_usage
 
         try:
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-2.0-flash', 
-                generation_config={"response_mime_type": "application/json"}
+            model = _judgment_model(api_key, draft.voice, model_name)
+            prompt = build_judgment_prompt(
+                _persona_prompt(draft.voice), draft.action_intent, sitrep,
+                settings.JUDGMENT_PROMPT_TOKEN_BUDGET,
             )
-
-            # Build personality suffix from dominant reputation trait
-            personality_suffix = ""
-            PERSONALITY_MODIFIERS = {
-                "Ruthless":   "This commander has earned a reputation for ruthlessness. Be terse, cold, and unsparing. Do not soften blows.",
-                "Merciful":   "This commander is known for mercy. Respond with philosophical depth. Let them feel the weight of compassion without mocking it.",
-                "Aggressive": "This commander charges where others pause. Reward decisive violence. Punish hesitation. Be blunt and direct.",
-                "Defensive":  "This commander builds walls. Acknowledge patience as discipline, but note when it becomes paralysis.",
-                "Cunning":    "This commander operates through deception. Match their subtlety. Acknowledge misdirection as craft.",
-                "Reckless":   "This commander gambles lives. Be curt. Note losses without ceremony.",
-                "Calculated": "This commander is deliberate. Acknowledge precision. Note when deliberation costs tempo.",
-                "Hesitant":   "This commander wavers. Your tone is measured contempt \u2014 not mockery, disappointed precision.",
-                "Decisive":   "This commander decides quickly. Respond in kind: compact, final, authoritative.",
-                "Veteran":    "This commander has seen much. Speak as an equal witness of war, not as a teacher.",
-            }
-            if reputation:
-                top = max(reputation.items(), key=lambda x: x[1], default=(None, 0.0))
-                trait, val = top
-                if trait and val > 0.15 and trait in PERSONALITY_MODIFIERS:
-                    personality_suffix = (
-                        f"\n\n9. Voice Adaptation (Based on Observed Commander Pattern)\n\n"
-                        f"{PERSONALITY_MODIFIERS[trait]}"
-                    )
-
-            prompt = f"""
-            {CIXUS_SYSTEM_PROMPT}{personality_suffix}
-
-            INPUT DATA:
-            PLAYER INTENT: {json.dumps(action_intent)}
-            SITUATION REPORT: {json.dumps(sitrep)}
-            """
             
-            response = await model.generate_content_async(prompt)
-            text = response.text
+            if on_text is None:
+                response = await model.generate_content_async(prompt.contents)
+                text = response.text
+            else:
+                response = await model.generate_content_async(prompt.contents, stream=True)
+                commentary, parts = CommentaryStream(), []
+                async for chunk in response:
+                    parts.append(chunk.text)
+                    piece = commentary.feed(parts[-1])
+                    if piece:
+                        await on_text(piece)
+                text = "".join(parts)
+            draft.usage = record_usage(prompt, getattr(response, "usage_metadata", None))
             
             # Robust JSON extraction
-            import re
             json_match = re.search(r"\{.*\}", text, re.DOTALL)
             if json_match:
                 text = json_match.group(0)
                 
+            _JUDGMENT_STATS["llm_lite" if draft.tier == "lite" else "llm"] += 1
             try:
                 return json.loads(text)
             except json.JSONDecodeError:
-                print(f"JSON Parse Error. Raw: {text}")
+                logger.warning("[Cixus] JSON parse error. Raw: %.500s", text)
                 return {
                      "commentary": f"Signal corrupted. Raw: {text[:20]}...",
                      "authority_change": 0,
@@ -513,12 +823,25 @@ class AIOrchestrator:
                 or "exceeded" in err_str
             )
 
+            _JUDGMENT_STATS["error_fallback"] += 1
             if is_quota:
-                print(f"[Cixus] Quota/rate-limit hit — offline fallback: {e}")
-                return _tactic_fallback_judgment(action_intent, reputation)
+                draft.rate_limited = True
+                logger.warning("[Cixus] Quota/rate-limit hit — offline fallback: %s", e, extra={"event": "judgment.quota_fallback"})
+                return AIOrchestrator._offline_judgment(draft, sitrep)
+
+            logger.error("[Cixus] API error — offline fallback: %s", e)
+            return AIOrchestrator._offline_judgment(draft, sitrep)
+
+    @staticmethod
+    def token_metrics() -> Dict[str, Any]:
+        from app.services.ai.prompt_builder import token_report
+        return token_report()
+
+    @staticmethod
+    def judgment_metrics() -> Dict[str, Any]:
+        from app.services.ai.local_model import local_judge
 
-            print(f"[Cixus] API error — offline fallback: {e}")
-            return _tactic_fallback_judgment(action_intent, reputation)
+        return {**_JUDGMENT_STATS, "local_model": {**local_judge.meta, "covers": sorted(local_judge.covered)} if local_judge.loaded else None}
 
 
     @staticmethod
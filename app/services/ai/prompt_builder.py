@@ -0,0 +1,216 @@
+"""
+Compact judgment prompts and per-call token accounting.
+
+The static part of every judgment is the Cixus persona plus the voice
+adaptation. It goes to Gemini as the model's ``system_instruction``, on a
+model built once per voice, rather than being pasted into every request
+body. The per-turn part is a schema-minimal JSON encoding of intent and
+sitrep:
+* no whitespace
+* only the intent fields Cixus reasons about
+* no empty or default values
+* no ``war_id``
+
+It is held under ``JUDGMENT_PROMPT_TOKEN_BUDGET`` by dropping the oldest
+``recent_events``.
+
+Token counts are estimated at CHARS_PER_TOKEN. This is enough for the
+budget and the savings report. When Gemini returns ``usage_metadata`` its
+real counts are recorded instead.
+
+The savings report compares against the legacy single-string prompt. That
+prompt is only rendered when the report is read: each call queues its
+inputs (the last LEGACY_PENDING_MAX of them) and ``token_report`` measures
+whatever is queued, so judgments never pay for it.
+"""
+import json
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict
+
+CHARS_PER_TOKEN = 4
+LEGACY_PENDING_MAX = 256
+
+# Running totals behind GET /api/v1/metrics/tokens
+_TOKEN_STATS = {
+    "calls": 0,
+    "prompt_tokens": 0,
+    "output_tokens": 0,
+    "estimated_tokens": 0,
+    "events_dropped": 0,
+    # legacy comparison, over the calls measured so far
+    "legacy_measured_calls": 0,
+    "legacy_estimated_tokens": 0,
+    "legacy_compact_tokens": 0,  # estimated_tokens of those same calls
+}
+
+# (system_instruction, action_intent, sitrep, estimated_tokens) awaiting measurement
+_legacy_pending: deque = deque(maxlen=LEGACY_PENDING_MAX)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def _compact(obj: Any) -> Any:
+    """Drop None / empty containers / empty strings; round floats."""
+    if isinstance(obj, dict):
+        out = {}
+        for k, v in obj.items():
+            v = _compact(v)
+            if v is None or v == "" or v == [] or v == {}:
+                continue
+            out[k] = v
+        return out
+    if isinstance(obj, list):
+        return [_compact(v) for v in obj]
+    if isinstance(obj, float):
+        return round(obj, 2)
+    return obj
+
+
+def compact_intent(action_intent: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of a GameCommand dump that bear on judgment."""
+    intent = action_intent.get("intent") or {}
+    friction = action_intent.get("friction") or {}
+    out = {
+        "pattern": intent.get("primary_pattern"),
+        "risk": intent.get("risk_profile"),
+        "ethic": intent.get("ethical_weight"),
+        "complexity": intent.get("coordination_complexity"),
+        "meta": action_intent.get("meta_intent"),
+        "target": action_intent.get("target_enemy_id"),
+    }
+    # Friction only when it actually bit
+    if friction.get("latency_ticks"):
+        out["latency"] = friction["latency_ticks"]
+    if friction.get("corruption") not in (None, "none"):
+        out["corruption"] = friction["corruption"]
+    if friction.get("refusal_chance"):
+        out["refusal"] = friction["refusal_chance"]
+    if friction.get("message"):
+        out["friction_msg"] = friction["message"]
+    return _compact(out)
+
+
+def compact_sitrep(sitrep: Dict[str, Any]) -> Dict[str, Any]:
+    return _compact({k: v for k, v in sitrep.items() if k != "war_id"})
+
+
+def legacy_prompt(system: str, action_intent: Dict[str, Any], sitrep: Dict[str, Any]) -> str:
+    """The single-string prompt judgments used to send — rendered only by ``token_report``."""
+    return f"""
+            {system}
+
+            INPUT DATA:
+            PLAYER INTENT: {json.dumps(action_intent)}
+            SITUATION REPORT: {json.dumps(sitrep)}
+            """
+
+
+@dataclass(slots=True)
+class JudgmentPrompt:
+    system_instruction: str
+    contents: str
+    estimated_tokens: int         # system instruction + contents
+    action_intent: Dict[str, Any]  # raw inputs, kept for the legacy comparison
+    sitrep: Dict[str, Any]
+    events_dropped: int = 0
+
+
+def build_judgment_prompt(
+    system_instruction: str,
+    action_intent: Dict[str, Any],
+    sitrep: Dict[str, Any],
+    budget_tokens: int = 0,
+) -> JudgmentPrompt:
+    """
+    Encode one judgment request. ``budget_tokens`` caps the per-turn contents
+    (0 = no cap); the newest events are kept and the count of omitted ones
+    is reported to Cixus as ``events_omitted``.
+    """
+    intent_json = _dumps(compact_intent(action_intent))
+    situation = compact_sitrep(sitrep)
+    events = situation.pop("recent_events", [])
+
+    def render(kept: list, omitted: int) -> str:
+        body = dict(situation)
+        if kept:
+            body["recent_events"] = kept
+        if omitted:
+            body["events_omitted"] = omitted
+        return f"INTENT:{intent_json}\nSITREP:{_dumps(body)}"
+
+    contents = render(events, 0)
+    dropped = 0
+    if budget_tokens and events and estimate_tokens(contents) > budget_tokens:
+        # Fill newest-first from what is left after the fixed fields
+        # (plus room for the events_omitted marker)
+        room = budget_tokens * CHARS_PER_TOKEN - len(render([], len(events)))
+        kept: list = []
+        for event in reversed(events):
+            cost = len(_dumps(event)) + 1
+            if cost > room:
+                break
+            kept.append(event)
+            room -= cost
+        kept.reverse()
+        dropped = len(events) - len(kept)
+        contents = render(kept, dropped)
+
+    return JudgmentPrompt(
+        system_instruction,
+        contents,
+        estimate_tokens(system_instruction) + estimate_tokens(contents),
+        action_intent,
+        sitrep,
+        dropped,
+    )
+
+
+def record_usage(prompt: JudgmentPrompt, usage_metadata: Any = None) -> Dict[str, int]:
+    """
+    Tokens for one Gemini call — real counts from ``usage_metadata`` when the
+    response carries it, otherwise the estimate. Adds to the running report
+    and queues the call for the legacy comparison.
+    """
+    prompt_tokens = getattr(usage_metadata, "prompt_token_count", None) or prompt.estimated_tokens
+    output_tokens = getattr(usage_metadata, "candidates_token_count", None) or 0
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": prompt_tokens + output_tokens,
+        "estimated_tokens": prompt.estimated_tokens,
+        "events_dropped": prompt.events_dropped,
+    }
+    _TOKEN_STATS["calls"] += 1
+    for key in ("prompt_tokens", "output_tokens", "estimated_tokens", "events_dropped"):
+        _TOKEN_STATS[key] += usage[key]
+    _legacy_pending.append((prompt.system_instruction, prompt.action_intent, prompt.sitrep, prompt.estimated_tokens))
+    return usage
+
+
+def token_report() -> Dict[str, Any]:
+    """
+    Totals plus estimated tokens saved per command versus the legacy prompt.
+    Savings cover the measured calls; calls that fell off a full queue
+    between reads are left out of the comparison, not guessed at.
+    """
+    while _legacy_pending:
+        system, action_intent, sitrep, estimated = _legacy_pending.popleft()
+        _TOKEN_STATS["legacy_measured_calls"] += 1
+        _TOKEN_STATS["legacy_estimated_tokens"] += estimate_tokens(legacy_prompt(system, action_intent, sitrep))
+        _TOKEN_STATS["legacy_compact_tokens"] += estimated
+
+    measured = _TOKEN_STATS["legacy_measured_calls"]
+    saved = _TOKEN_STATS["legacy_estimated_tokens"] - _TOKEN_STATS["legacy_compact_tokens"]
+    return {
+        **_TOKEN_STATS,
+        "saved_tokens": saved,
+        "saved_per_command": round(saved / measured, 1) if measured else 0.0,
+        "saved_ratio": round(saved / _TOKEN_STATS["legacy_estimated_tokens"], 3) if measured else 0.0,
+    }
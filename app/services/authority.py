@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update, exists, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.player import Player
+from app.models.war import WarSession
+from app.services.identity import identity_cache
+
+# ── Idle decay policy ─────────────────────────────────────────────────────────
+# -5 AP per idle minute after a 2-minute grace period, never below 20.
+DECAY_GRACE = timedelta(minutes=2)
+DECAY_PER_MINUTE = 5
+DECAY_FLOOR = 20
+MAX_AUTHORITY = 100
+
+
+def _aware(dt: datetime | None) -> datetime | None:
+    """SQLite returns naive datetimes — attach UTC so arithmetic works."""
+    if dt is not None and dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def _decay(points: int, as_of: datetime | None, last_command_at: datetime | None, now: datetime) -> tuple[int, datetime | None]:
+    """
+    Core decay step. Returns (points_at_now, new_as_of).
+
+    Only whole points are consumed; ``new_as_of`` advances by exactly the idle
+    time those points account for, so repeated materialisation never drifts.
+    """
+    last_command_at = _aware(last_command_at)
+    as_of = _aware(as_of)
+    if last_command_at is None:
+        return points, as_of
+
+    decay_start = last_command_at + DECAY_GRACE
+    if as_of is not None and as_of > decay_start:
+        decay_start = as_of
+    if now <= decay_start:
+        return points, as_of
+
+    floor = min(points, DECAY_FLOOR)
+    idle_minutes = (now - decay_start).total_seconds() / 60
+    lost = int(idle_minutes * DECAY_PER_MINUTE)
+    if points - lost <= floor:
+        return floor, now
+    return points - lost, decay_start + timedelta(minutes=lost / DECAY_PER_MINUTE)
+
+
+class AuthorityLedger:
+    """
+    Authority points stored together with the instant they were valid (``as_of``).
+
+    Reads apply idle decay lazily in O(1); writes (commands, the background
+    sweep) materialise the decayed value first so every path sees the same number.
+    Authority belongs to the player, so the idle clock is the player's last
+    command in any war (``Player.last_command_at``), not any one war's.
+    """
+
+    @staticmethod
+    def current(player: Player, now: datetime | None = None) -> int:
+        """Decayed authority at ``now`` without touching the row."""
+        now = now or datetime.now(timezone.utc)
+        base = player.authority_points if player.authority_points is not None else MAX_AUTHORITY
+        points, _ = _decay(base, player.authority_as_of, player.last_command_at, now)
+        return points
+
+    @staticmethod
+    def materialize(player: Player, now: datetime | None = None) -> int:
+        """Write the decayed value back onto the player and return it."""
+        now = now or datetime.now(timezone.utc)
+        base = player.authority_points if player.authority_points is not None else MAX_AUTHORITY
+        points, as_of = _decay(base, player.authority_as_of, player.last_command_at, now)
+        player.authority_points = points
+        player.authority_as_of = as_of or now
+        return points
+
+    @staticmethod
+    def apply_delta(player: Player, delta: int, now: datetime | None = None) -> int:
+        """
+        Apply a judgment delta to already-materialised authority.
+        The command itself resets the idle clock, so ``as_of`` moves to ``now``.
+        """
+        now = now or datetime.now(timezone.utc)
+        current = player.authority_points if player.authority_points is not None else MAX_AUTHORITY
+        player.authority_points = max(0, min(MAX_AUTHORITY, current + delta))
+        player.authority_as_of = now
+        player.last_command_at = now
+        return player.authority_points
+
+    @staticmethod
+    async def sweep(db: AsyncSession, now: datetime | None = None, batch_size: int = 5000) -> int:
+        """
+        Materialise decay for every player with an active war in batched UPDATEs.
+        Returns the number of players whose authority changed.
+
+        Each UPDATE is guarded on the ``authority_as_of`` it was computed from.
+        A command that commits in between (``apply_delta`` moves ``as_of``)
+        wins; that player is simply picked up again by the next sweep.
+        """
+        now = now or datetime.now(timezone.utc)
+        has_active_war = exists().where(WarSession.player_id == Player.id, WarSession.status == "ACTIVE")
+        stmt = (
+            select(Player.id, Player.authority_points, Player.authority_as_of, Player.last_command_at)
+            .where(Player.last_command_at.is_not(None))
+            .where(has_active_war)
+        )
+        rows = (await db.execute(stmt)).all()
+
+        guarded = (
+            update(Player.__table__)
+            .where(Player.__table__.c.id == bindparam("b_id"))
+            .where(Player.__table__.c.authority_as_of.is_not_distinct_from(bindparam("b_old_as_of")))
+            .values(authority_points=bindparam("b_points"), authority_as_of=bindparam("b_as_of"))
+        )
+        changed_ids, changed = [], 0
+        for start in range(0, len(rows), batch_size):
+            updates = []
+            for player_id, points, as_of, lca in rows[start:start + batch_size]:
+                base = points if points is not None else MAX_AUTHORITY
+                new_points, new_as_of = _decay(base, as_of, lca, now)
+                if new_points != base:
+                    updates.append({"b_id": player_id, "b_old_as_of": as_of, "b_points": new_points, "b_as_of": new_as_of})
+            if updates:
+                result = await db.execute(guarded, updates)
+                changed += max(result.rowcount, 0)
+                changed_ids.extend(u["b_id"] for u in updates)
+        await db.commit()
+        identity_cache.invalidate_many(changed_ids)
+        return changed
@@ -1,6 +1,9 @@
 from app.engine.types import CommandFriction
 import random
 
+# Integer codes used by the batch API for CommandFriction.corruption
+CORRUPTION_CODES = ("none", "scrambled", "inverted")
+
 class AuthorityFrictionService:
     """
     Determines how much "Friction" (Clausewitzian) applies to a command
@@ -39,3 +42,55 @@ class AuthorityFrictionService:
         friction.corruption = "inverted"
         
         return friction
+
+    @staticmethod
+    def calculate_friction_batch(authority, rng=None) -> dict:
+        """
+        Array-in/array-out variant of ``calculate_friction`` for balance sweeps
+        and bulk simulation. Same bands and probabilities as the scalar path
+        (including its 49-AP gap into the critical band).
+
+        Also rolls the refusal check that ``SimulationEngine.validate_and_clamp``
+        performs, so callers get the final refusal flag per command.
+
+        Returns a dict of NumPy arrays: ``latency_ticks``, ``refusal_chance``,
+        ``refused`` and ``corruption`` (indices into ``CORRUPTION_CODES``).
+        """
+        import numpy as np
+
+        rng = rng if rng is not None else np.random.default_rng()
+        authority = np.asarray(authority)
+        n = authority.shape[0]
+
+        high = authority >= 80
+        moderate = (authority >= 50) & (authority < 80)
+        low = (authority >= 20) & (authority < 49)
+        critical = ~(high | moderate | low)
+
+        latency = np.zeros(n, dtype=np.int16)
+        refusal_chance = np.zeros(n, dtype=np.float64)
+        corruption = np.zeros(n, dtype=np.int8)
+
+        # Moderate — 20% chance of a single relay tick
+        latency[moderate & (rng.random(n) < 0.2)] = 1
+
+        # Low — 1-3 ticks, 10% refusal, 30% scrambled
+        low_latency = rng.choice(np.array([1, 2, 3], dtype=np.int16), size=n)
+        latency[low] = low_latency[low]
+        refusal_chance[low] = 0.1
+        corruption[low & (rng.random(n) < 0.3)] = 1
+
+        # Critical — command collapse
+        crit_latency = rng.choice(np.array([3, 5, 8], dtype=np.int16), size=n)
+        latency[critical] = crit_latency[critical]
+        refusal_chance[critical] = 0.4
+        corruption[critical] = 2
+
+        refused = rng.random(n) < refusal_chance
+
+        return {
+            "latency_ticks": latency,
+            "refusal_chance": refusal_chance,
+            "refused": refused,
+            "corruption": corruption,
+        }
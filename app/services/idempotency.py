@@ -0,0 +1,115 @@
+"""
+Idempotency-Key support for ``POST /war/{war_id}/command``.
+
+Clients retry the command on timeouts while the first attempt is still
+waiting on Gemini. A retry that carries the same ``Idempotency-Key``:
+
+* while the original is in flight — joins its future instead of running a
+  second turn, LLM call and quota increment;
+* after it finished — replays the stored response for
+  ``IDEMPOTENCY_TTL_SECONDS``.
+
+Failed attempts are forgotten (joiners see the same error), so the client
+can retry with the same key. Keys are scoped per war. The store is
+per-process: behind several API processes, route a war's commands to one
+process or accept that a cross-process retry runs again.
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a different command."""
+
+
+@dataclass(slots=True)
+class IdempotentCall:
+    future: asyncio.Future
+    fingerprint: Optional[str] = None
+    expires: float = float("inf")  # set once the result is stored
+
+
+class IdempotencyStore:
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._calls: "OrderedDict[str, IdempotentCall]" = OrderedDict()
+        self._stats = {"owners": 0, "joined": 0, "replayed": 0, "conflicts": 0, "failed": 0}
+
+    @staticmethod
+    def scope(war_id: Any, key: Optional[str]) -> Optional[str]:
+        key = (key or "").strip()
+        return f"{war_id}:{key[:200]}" if key else None
+
+    @staticmethod
+    def fingerprint(*parts: str) -> str:
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def claim(self, key: str, fingerprint: str) -> tuple[IdempotentCall, bool]:
+        """
+        Synchronously (no await, so no interleaving) return the call for
+        ``key`` and whether the caller owns it. Only the owner executes;
+        everyone else should ``wait``. The owner's ``fingerprint`` is set
+        here, so a duplicate is checked against it before anything else runs;
+        a different command under the same key raises IdempotencyConflict.
+        """
+        call = self._calls.get(key)
+        if call is not None and call.expires < time.monotonic():
+            del self._calls[key]
+            call = None
+        if call is not None:
+            if call.fingerprint != fingerprint:
+                self._stats["conflicts"] += 1
+                raise IdempotencyConflict()
+            return call, False
+        call = IdempotentCall(asyncio.get_running_loop().create_future(), fingerprint)
+        self._calls[key] = call
+        self._stats["owners"] += 1
+        self._evict()
+        return call, True
+
+    async def wait(self, call: IdempotentCall) -> Dict[str, Any]:
+        self._stats["replayed" if call.future.done() else "joined"] += 1
+        # shield: a joiner giving up must not cancel the owner's result
+        return await asyncio.shield(call.future)
+
+    def resolve(self, key: str, call: IdempotentCall, result: Dict[str, Any]) -> None:
+        call.expires = time.monotonic() + self.ttl
+        if not call.future.done():
+            call.future.set_result(result)
+
+    def fail(self, key: str, call: IdempotentCall, exc: BaseException) -> None:
+        """Forget ``key`` so a later retry runs again; current joiners get ``exc``."""
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        self._stats["failed"] += 1
+        if not call.future.done():
+            if isinstance(exc, asyncio.CancelledError):
+                call.future.cancel()
+            else:
+                call.future.set_exception(exc)
+                call.future.exception()  # mark retrieved — nobody may be waiting
+
+    def _evict(self) -> None:
+        # Oldest first; never drop a call that is still in flight
+        while len(self._calls) > self.maxsize:
+            key, call = next(iter(self._calls.items()))
+            if not call.future.done():
+                break
+            del self._calls[key]
+
+    def metrics(self) -> Dict[str, Any]:
+        inflight = sum(1 for c in self._calls.values() if not c.future.done())
+        return {"size": len(self._calls), "inflight": inflight, "ttl_seconds": self.ttl, **self._stats}
+
+
+command_calls = IdempotencyStore(settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_CACHE_MAXSIZE)
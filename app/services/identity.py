@@ -0,0 +1,157 @@
+"""
+In-process cache of player identities for ``/players/identify``.
+
+Session start used to be a PK read, then an IP read, then a commit of
+``last_seen_ip`` on every page load. Now lookups by player id or by
+registered IP are served from here for ``IDENTITY_CACHE_TTL_SECONDS``.
+Seen-tracking writes only when the IP changed or ``last_seen_at`` is older
+than ``IDENTITY_SEEN_WRITE_MINUTES``. The cached record is updated before
+the write, so a burst of loads from one player coalesces into one UPDATE.
+
+Entries are dropped whenever the response fields change: the command
+commit, the progression job and the authority sweep. The TTL bounds
+staleness across multiple API processes, since each process has its own
+cache.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+from uuid import UUID
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.player import Player
+
+
+@dataclass(slots=True)
+class CachedIdentity:
+    """The columns ``identify`` reads and writes — not a live ORM object."""
+    id: UUID
+    username: str
+    ip_address: Optional[str]
+    last_seen_ip: Optional[str]
+    last_seen_at: Optional[datetime]
+    authority_level: int
+    authority_points: int
+    reputation: Dict[str, Any]
+    leadership_profile: Dict[str, Any]
+    expires: float = 0.0
+
+    @classmethod
+    def from_player(cls, player: Player) -> "CachedIdentity":
+        return cls(
+            player.id, player.username, player.ip_address, player.last_seen_ip, player.last_seen_at,
+            player.authority_level, player.authority_points,
+            dict(player.reputation or {}), dict(player.leadership_profile or {}),
+        )
+
+
+class IdentityCache:
+
+    def __init__(self, ttl: float, maxsize: int, seen_interval: timedelta):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.seen_interval = seen_interval
+        self._by_id: "OrderedDict[UUID, CachedIdentity]" = OrderedDict()
+        self._by_ip: Dict[str, UUID] = {}
+        self._stats = {"hits": 0, "misses": 0, "seen_writes": 0, "seen_skipped": 0}
+
+    # ── Lookup ───────────────────────────────────────────────────────────────
+
+    def get(self, player_id: UUID) -> Optional[CachedIdentity]:
+        entry = self._by_id.get(player_id)
+        if entry is None or entry.expires < time.monotonic():
+            if entry is not None:
+                self.invalidate(player_id)
+            self._stats["misses"] += 1
+            return None
+        self._by_id.move_to_end(player_id)
+        self._stats["hits"] += 1
+        return entry
+
+    def get_by_ip(self, ip: str) -> Optional[CachedIdentity]:
+        player_id = self._by_ip.get(ip)
+        if player_id is None:
+            self._stats["misses"] += 1
+            return None
+        return self.get(player_id)
+
+    def put(self, player: Player) -> CachedIdentity:
+        self.invalidate(player.id)
+        entry = CachedIdentity.from_player(player)
+        entry.expires = time.monotonic() + self.ttl
+        self._by_id[entry.id] = entry
+        if entry.ip_address:
+            self._by_ip[entry.ip_address] = entry.id
+        while len(self._by_id) > self.maxsize:
+            _, evicted = self._by_id.popitem(last=False)
+            if evicted.ip_address and self._by_ip.get(evicted.ip_address) == evicted.id:
+                del self._by_ip[evicted.ip_address]
+        return entry
+
+    # ── Invalidation ─────────────────────────────────────────────────────────
+
+    def invalidate(self, player_id: UUID) -> None:
+        entry = self._by_id.pop(player_id, None)
+        if entry is not None and entry.ip_address and self._by_ip.get(entry.ip_address) == player_id:
+            del self._by_ip[entry.ip_address]
+
+    def invalidate_many(self, player_ids: Iterable[UUID]) -> None:
+        for player_id in player_ids:
+            self.invalidate(player_id)
+
+    def clear(self) -> None:
+        self._by_id.clear()
+        self._by_ip.clear()
+
+    # ── Seen tracking ────────────────────────────────────────────────────────
+
+    async def touch(self, db: AsyncSession, entry: CachedIdentity, ip: str, now: Optional[datetime] = None) -> bool:
+        """
+        Record that ``entry`` was seen from ``ip``. Writes (and commits) only if
+        the IP changed, the player has no registered IP yet, or the last write
+        is older than the throttle interval. Returns whether it wrote.
+        """
+        now = now or datetime.now(timezone.utc)
+        known = ip and ip != "unknown"
+        last = entry.last_seen_at
+        if last is not None and last.tzinfo is None:
+            last = last.replace(tzinfo=timezone.utc)
+        stale = last is None or now - last >= self.seen_interval
+        if not stale and (not known or (entry.last_seen_ip == ip and entry.ip_address)):
+            self._stats["seen_skipped"] += 1
+            return False
+
+        values: Dict[str, Any] = {"last_seen_at": now}
+        if known:
+            values["last_seen_ip"] = ip
+            if not entry.ip_address:
+                # First time we have an IP for this player — store it
+                values["ip_address"] = ip
+        # Update the cached record first so concurrent loads skip their write
+        entry.last_seen_at = now
+        entry.last_seen_ip = values.get("last_seen_ip", entry.last_seen_ip)
+        if "ip_address" in values:
+            entry.ip_address = ip
+            self._by_ip[ip] = entry.id
+        try:
+            await db.execute(update(Player).where(Player.id == entry.id).values(**values))
+            await db.commit()
+        except Exception:
+            self.invalidate(entry.id)
+            raise
+        self._stats["seen_writes"] += 1
+        return True
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"size": len(self._by_id), "ip_keys": len(self._by_ip), "ttl_seconds": self.ttl, **self._stats}
+
+
+identity_cache = IdentityCache(
+    settings.IDENTITY_CACHE_TTL_SECONDS,
+    settings.IDENTITY_CACHE_MAXSIZE,
+    timedelta(minutes=settings.IDENTITY_SEEN_WRITE_MINUTES),
+)
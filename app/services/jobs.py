@@ -0,0 +1,303 @@
+"""
+Deferred per-turn work, taken off the request path.
+
+Usage from a request handler::
+
+    job_queue.stage(db, "turn_logs", {...})   # before commit
+    await db.commit()                          # authoritative state first
+    await job_queue.publish(db)                # hand staged jobs to the queue
+
+Two backends, selected by ``JOB_QUEUE_BACKEND``:
+
+* ``memory``   — asyncio queue drained by a worker task in the API process.
+                 Jobs are batched across wars, retried on failure and drained
+                 on shutdown; a hard crash loses whatever is still queued.
+* ``database`` — staged jobs become ``job_queue`` rows in the same transaction
+                 as the turn (outbox), consumed by ``python -m app.worker``.
+                 Survives crashes; stale claims are re-delivered.
+
+Both are at-least-once. A batch's effects and its acknowledgement commit in
+one transaction, so a job is only re-run if that transaction did not land.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List
+from sqlalchemy import select, update, delete, func, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.models.job import JobRecord
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[AsyncSession, List[Dict[str, Any]]], Awaitable[None]]
+_HANDLERS: Dict[str, JobHandler] = {}
+
+_STAGED_KEY = "staged_jobs"
+
+
+def job_handler(kind: str):
+    """Register ``fn(session, payloads)`` as the batch handler for ``kind``."""
+    def decorator(fn: JobHandler) -> JobHandler:
+        _HANDLERS[kind] = fn
+        return fn
+    return decorator
+
+
+@dataclass(slots=True)
+class Job:
+    kind: str
+    payload: Dict[str, Any]
+    attempts: int = 0
+
+
+async def run_batch(session: AsyncSession, jobs: List[Job]) -> None:
+    """Call each kind's handler once with all of that kind's payloads."""
+    by_kind: Dict[str, List[Dict[str, Any]]] = {}
+    for job in jobs:
+        by_kind.setdefault(job.kind, []).append(job.payload)
+    for kind, payloads in by_kind.items():
+        await _HANDLERS[kind](session, payloads)
+
+
+class InProcessJobQueue:
+
+    def __init__(self, maxsize: int, batch_size: int, flush_interval: float, max_attempts: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self._queue: asyncio.Queue[Job] = asyncio.Queue(maxsize=maxsize)
+        self._retry: List[Job] = []
+        self._inflight = 0
+        self._worker: asyncio.Task | None = None
+        self._accepting = True
+        self._stats = {
+            "enqueued": 0, "processed": 0, "batches": 0, "retried": 0, "dead_lettered": 0,
+            "blocked_enqueues": 0, "blocked_seconds": 0.0, "high_water": 0, "last_batch_size": 0,
+        }
+
+    # ── Producer side ────────────────────────────────────────────────────────
+
+    def stage(self, db: AsyncSession, kind: str, payload: Dict[str, Any]) -> None:
+        db.info.setdefault(_STAGED_KEY, []).append(Job(kind, payload))
+
+    def discard(self, db: AsyncSession) -> None:
+        """Drop staged jobs after a rollback."""
+        db.info.pop(_STAGED_KEY, None)
+
+    async def publish(self, db: AsyncSession) -> None:
+        for job in db.info.pop(_STAGED_KEY, ()):
+            await self._put(job)
+
+    async def _put(self, job: Job) -> None:
+        if not self._accepting:
+            # Shutting down — don't strand late jobs in a queue nobody drains
+            await self._process([job])
+            return
+        if self._queue.full():
+            self._stats["blocked_enqueues"] += 1
+            t0 = time.perf_counter()
+            await self._queue.put(job)
+            self._stats["blocked_seconds"] += time.perf_counter() - t0
+        else:
+            self._queue.put_nowait(job)
+        self._stats["enqueued"] += 1
+        self._stats["high_water"] = max(self._stats["high_water"], self._queue.qsize())
+
+    # ── Consumer side ────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            if self._retry:
+                await asyncio.sleep(self.flush_interval)
+                batch, self._retry = self._retry, []
+                self._inflight = len(batch)
+            else:
+                batch = [await self._queue.get()]
+                # Counted as in flight while it waits, so drain() doesn't cancel it off the queue
+                self._inflight = 1
+                # Give concurrent commands a moment to add to this batch
+                if self._queue.qsize() < self.batch_size:
+                    await asyncio.sleep(self.flush_interval)
+            try:
+                while len(batch) < self.batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                self._inflight = len(batch)
+                await self._process(batch)
+            finally:
+                self._inflight = 0
+
+    async def _process(self, batch: List[Job]) -> None:
+        try:
+            async with SessionLocal() as session:
+                await run_batch(session, batch)
+                await session.commit()
+            self._stats["processed"] += len(batch)
+            self._stats["batches"] += 1
+            self._stats["last_batch_size"] = len(batch)
+        except Exception as e:
+            if len(batch) > 1:
+                # Isolate the poison job so the rest of the batch still lands
+                for job in batch:
+                    await self._process([job])
+                return
+            job = batch[0]
+            job.attempts += 1
+            if job.attempts < self.max_attempts:
+                self._stats["retried"] += 1
+                self._retry.append(job)
+                logger.warning("[jobs] %s failed (attempt %d), will retry: %s", job.kind, job.attempts, e)
+            else:
+                self._stats["dead_lettered"] += 1
+                logger.error("[jobs] %s dropped after %d attempts: %s payload=%r", job.kind, job.attempts, e, job.payload)
+
+    async def drain(self, timeout: float) -> None:
+        """Stop accepting, finish queued and retrying work, then stop the worker."""
+        self._accepting = False
+        deadline = time.monotonic() + timeout
+        while (not self._queue.empty() or self._retry or self._inflight) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        left = self._queue.qsize() + len(self._retry)
+        if left:
+            logger.error("[jobs] drain timed out with %d jobs still queued", left)
+
+    async def metrics(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "depth": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "retry_pending": len(self._retry),
+            "inflight": self._inflight,
+            **self._stats,
+        }
+
+
+class DatabaseJobQueue:
+
+    def __init__(self, batch_size: int, max_attempts: int, visibility_timeout: float = 60.0):
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.visibility_timeout = visibility_timeout
+        self._stats = {"processed": 0, "batches": 0, "retried": 0, "dead_lettered": 0, "last_batch_size": 0}
+
+    # ── Producer side (API process) ──────────────────────────────────────────
+
+    def stage(self, db: AsyncSession, kind: str, payload: Dict[str, Any]) -> None:
+        db.add(JobRecord(kind=kind, payload=payload))
+
+    def discard(self, db: AsyncSession) -> None:
+        pass  # rows roll back with the turn
+
+    async def publish(self, db: AsyncSession) -> None:
+        pass  # committed with the turn; the worker polls
+
+    def start(self) -> None:
+        pass
+
+    async def drain(self, timeout: float) -> None:
+        pass
+
+    # ── Consumer side (python -m app.worker) ─────────────────────────────────
+
+    async def _claim(self, session: AsyncSession) -> List[JobRecord]:
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=self.visibility_timeout)
+        claimable = or_(
+            and_(JobRecord.status == "PENDING", JobRecord.available_at <= now),
+            and_(JobRecord.status == "CLAIMED", JobRecord.claimed_at < stale),
+        )
+        ids = (await session.execute(
+            select(JobRecord.id).where(claimable)
+            .order_by(JobRecord.created_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )).scalars().all()
+        if not ids:
+            return []
+        await session.execute(
+            update(JobRecord).where(JobRecord.id.in_(ids), claimable)
+            .values(status="CLAIMED", claimed_at=now)
+        )
+        await session.commit()
+        return list((await session.execute(select(JobRecord).where(JobRecord.id.in_(ids)))).scalars())
+
+    async def _process(self, records: List[JobRecord]) -> None:
+        try:
+            async with SessionLocal() as session:
+                await run_batch(session, [Job(r.kind, r.payload, r.attempts) for r in records])
+                await session.execute(delete(JobRecord).where(JobRecord.id.in_([r.id for r in records])))
+                await session.commit()
+            self._stats["processed"] += len(records)
+            self._stats["batches"] += 1
+            self._stats["last_batch_size"] = len(records)
+        except Exception as e:
+            if len(records) > 1:
+                for record in records:
+                    await self._process([record])
+                return
+            record = records[0]
+            attempts = record.attempts + 1
+            failed = attempts >= self.max_attempts
+            self._stats["dead_lettered" if failed else "retried"] += 1
+            async with SessionLocal() as session:
+                await session.execute(
+                    update(JobRecord).where(JobRecord.id == record.id).values(
+                        status="FAILED" if failed else "PENDING",
+                        attempts=attempts,
+                        last_error=str(e)[:500],
+                        available_at=datetime.now(timezone.utc) + timedelta(seconds=2 ** attempts),
+                    )
+                )
+                await session.commit()
+            logger.warning("[jobs] %s failed (attempt %d%s): %s", record.kind, attempts, ", giving up" if failed else "", e)
+
+    async def work(self, stop: asyncio.Event, poll_interval: float = 0.5) -> None:
+        """Claim and process batches until ``stop`` is set."""
+        while not stop.is_set():
+            async with SessionLocal() as session:
+                records = await self._claim(session)
+            if records:
+                await self._process(records)
+                continue
+            try:
+                await asyncio.wait_for(stop.wait(), poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def metrics(self) -> Dict[str, Any]:
+        async with SessionLocal() as session:
+            counts = dict((await session.execute(
+                select(JobRecord.status, func.count()).group_by(JobRecord.status)
+            )).all())
+        return {
+            "backend": "database",
+            "depth": counts.get("PENDING", 0),
+            "claimed": counts.get("CLAIMED", 0),
+            "failed": counts.get("FAILED", 0),
+            **self._stats,
+        }
+
+
+if settings.JOB_QUEUE_BACKEND == "database":
+    job_queue = DatabaseJobQueue(settings.JOB_BATCH_SIZE, settings.JOB_MAX_ATTEMPTS)
+else:
+    job_queue = InProcessJobQueue(
+        settings.JOB_QUEUE_MAXSIZE,
+        settings.JOB_BATCH_SIZE,
+        settings.JOB_FLUSH_INTERVAL_MS / 1000,
+        settings.JOB_MAX_ATTEMPTS,
+    )
@@ -0,0 +1,366 @@
+"""
+Leaderboards over the materialised ``player_standings`` table.
+
+Three boards:
+* ``total_ap``: cumulative AP earned, highest first. Kept current by the
+  player_progress job, so it ranks every player who has played a turn.
+* ``win_rate``: wins / wars ended, highest first. Only players with at
+  least WIN_RATE_MIN_WARS finished wars are ranked.
+* ``fastest_victory``: fewest turns to kill the Warlord, lowest first.
+
+Each process keeps the standings in memory, with one sorted key list per
+board:
+* rank lookup is a bisect, O(log n);
+* a page is a slice;
+* a finished war re-inserts one key per board: an O(log n) search plus an
+  O(n) list shift (see ``RankIndex``).
+
+The first load builds the index from the whole table. After that, every
+LEADERBOARD_INDEX_TTL_SECONDS it folds in only the rows whose ``version``
+is past the last one seen, which picks up wars ended in other processes
+and AP applied by the job queue. Versions come from ``StandingsClock``,
+which each writer bumps just before committing and which stays locked
+until it does. They therefore become visible in order, and a long
+transaction can't commit a row behind the high-water mark the way an
+``updated_at`` timestamp could. Top pages are served
+from a short TTL cache.
+"""
+import asyncio
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from uuid import UUID
+from sqlalchemy import select, insert, update, func, exists, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.leaderboard import PlayerStanding, StandingsClock
+from app.models.player import Player
+from app.models.war import WarSession
+
+BOARDS = ("total_ap", "win_rate", "fastest_victory")
+WIN_RATE_MIN_WARS = 3
+
+_COLUMNS = (
+    PlayerStanding.player_id, PlayerStanding.username, PlayerStanding.total_ap,
+    PlayerStanding.wars_ended, PlayerStanding.wins, PlayerStanding.win_rate,
+    PlayerStanding.fastest_victory_turns,
+)
+
+
+@dataclass(slots=True)
+class Standing:
+    player_id: str
+    username: str
+    total_ap: int
+    wars_ended: int
+    wins: int
+    win_rate: float
+    fastest_victory_turns: Optional[int]
+
+    @classmethod
+    def from_row(cls, row: Any) -> "Standing":
+        return cls(
+            str(row.player_id), row.username, row.total_ap or 0, row.wars_ended or 0,
+            row.wins or 0, row.win_rate or 0.0, row.fastest_victory_turns,
+        )
+
+    @classmethod
+    def from_tuple(cls, t: tuple) -> "Standing":
+        """From a _COLUMNS row — positional, for bulk loads."""
+        pid, name, ap, wars, wins, rate, fastest = t
+        return cls(str(pid), name, ap or 0, wars or 0, wins or 0, rate or 0.0, fastest)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# Sort key per board; None = not ranked on that board. The trailing
+# player_id makes keys unique; everything before it is the score, so
+# bisecting on key[:-1] gives ties the same (competition) rank.
+_BOARD_KEYS: Dict[str, Callable[[Standing], Optional[tuple]]] = {
+    "total_ap": lambda s: (-s.total_ap, s.player_id),
+    "win_rate": lambda s: (-s.win_rate, -s.wins, s.player_id) if s.wars_ended >= WIN_RATE_MIN_WARS else None,
+    "fastest_victory": lambda s: (s.fastest_victory_turns, s.player_id) if s.fastest_victory_turns else None,
+}
+
+
+class RankIndex:
+    """
+    Sorted keys for one board plus each player's current key.
+
+    Writes are not O(log n): ``upsert`` bisects, but deleting and inserting
+    in a Python list shifts the tail, O(n) memmove of pointers. That is an
+    accepted trade-off. It costs about 30 us per upsert at 100k players and
+    about 0.4 ms at 1M. Reads stay plain bisects and slices, with no tree to
+    walk. Upserts never run inside a database transaction. ``apply``
+    follows the commit of a war end, and rows the progress job changed are
+    folded in by ``ensure_loaded``, which rebuilds with one sort instead
+    once a refresh carries more than max(1000, 5%) of the table.
+    """
+
+    __slots__ = ("_keys", "_key_of")
+
+    def __init__(self, keys: List[tuple] | None = None):
+        self._keys: List[tuple] = sorted(keys or ())
+        self._key_of: Dict[str, tuple] = {k[-1]: k for k in self._keys}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def upsert(self, player_id: str, key: Optional[tuple]) -> None:
+        old = self._key_of.pop(player_id, None)
+        if old is not None:
+            del self._keys[bisect_left(self._keys, old)]
+        if key is not None:
+            insort(self._keys, key)
+            self._key_of[player_id] = key
+
+    def rank(self, player_id: str) -> Optional[int]:
+        key = self._key_of.get(player_id)
+        if key is None:
+            return None
+        return bisect_left(self._keys, key[:-1]) + 1
+
+    def page(self, offset: int, limit: int) -> List[str]:
+        return [k[-1] for k in self._keys[offset:offset + limit]]
+
+
+class Leaderboard:
+
+    def __init__(self, index_ttl: float, top_ttl: float, top_n: int):
+        self.index_ttl = index_ttl
+        self.top_ttl = top_ttl
+        self.top_n = top_n
+        self._standings: Dict[str, Standing] = {}
+        self._indexes: Dict[str, RankIndex] = {board: RankIndex() for board in BOARDS}
+        self._loaded_at = float("-inf")
+        self._high_water: Optional[int] = None  # newest standings version folded into the index
+        self._load_lock = asyncio.Lock()
+        self._top_cache: Dict[tuple, tuple[float, Dict[str, Any]]] = {}
+
+    # ── Index maintenance ────────────────────────────────────────────────────
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """
+        Build the index on first use; afterwards, every index_ttl, fold in
+        only the rows changed since (other processes' war ends).
+        """
+        if time.monotonic() - self._loaded_at < self.index_ttl:
+            return
+        async with self._load_lock:
+            if time.monotonic() - self._loaded_at < self.index_ttl:
+                return
+            high_water = await db.scalar(select(func.max(PlayerStanding.version)))
+            changed = None
+            if self._high_water is not None and high_water is not None and high_water > self._high_water:
+                changed = (await db.execute(
+                    select(*_COLUMNS).where(PlayerStanding.version > self._high_water)
+                )).tuples().all()
+            if self._high_water is None or (changed and len(changed) > max(1000, len(self._standings) // 20)):
+                # First load, or so much moved (a backfill) that one sort beats n insorts
+                rows = (await db.execute(select(*_COLUMNS))).tuples().all()
+                # Sorting a few hundred thousand keys is CPU work — keep it off the loop
+                self._standings, self._indexes = await asyncio.to_thread(self._build, rows)
+                self._top_cache.clear()
+            elif changed:
+                for row in changed:
+                    self.apply(Standing.from_tuple(row))
+            self._high_water = high_water if high_water is not None else self._high_water
+            self._loaded_at = time.monotonic()
+
+    @staticmethod
+    def _build(rows: List[tuple]) -> tuple[Dict[str, Standing], Dict[str, RankIndex]]:
+        standings = {s.player_id: s for s in map(Standing.from_tuple, rows)}
+        indexes = {}
+        for board, key_fn in _BOARD_KEYS.items():
+            keys = [k for k in map(key_fn, standings.values()) if k is not None]
+            indexes[board] = RankIndex(keys)
+        return standings, indexes
+
+    @staticmethod
+    async def next_version(db: AsyncSession) -> int:
+        """
+        Take the next standings version (caller commits). Call it last before
+        the commit: the clock row stays locked until then.
+        """
+        version = await db.scalar(
+            update(StandingsClock).where(StandingsClock.id == 1)
+            .values(version=StandingsClock.version + 1)
+            .returning(StandingsClock.version)
+        )
+        if version is None:
+            db.add(StandingsClock(id=1, version=1))
+            await db.flush()
+            version = 1
+        return version
+
+    async def record_war_end(self, db: AsyncSession, war: WarSession, player: Player, won: bool) -> Standing:
+        """
+        Fold one finished war into the player's standing row (caller commits).
+        Pass the result to ``apply`` once the commit has succeeded.
+        """
+        row = await db.get(PlayerStanding, player.id)
+        if row is None:
+            # total_ap is otherwise owned by the progress job (refresh_total_ap)
+            row = PlayerStanding(player_id=player.id, wars_ended=0, wins=0, total_ap=player.total_ap_earned or 0)
+            db.add(row)
+        row.username = player.username
+        row.wars_ended = (row.wars_ended or 0) + 1
+        row.wins = (row.wins or 0) + (1 if won else 0)
+        row.win_rate = round(row.wins / row.wars_ended, 4)
+        if won and war.turn_count and (row.fastest_victory_turns is None or war.turn_count < row.fastest_victory_turns):
+            row.fastest_victory_turns = war.turn_count
+        row.version = await self.next_version(db)
+        return Standing.from_row(row)
+
+    @staticmethod
+    async def refresh_total_ap(db: AsyncSession, players: Iterable[Player]) -> None:
+        """
+        Copy each player's total_ap_earned onto their standing row (caller
+        commits), creating the row for players with no finished war yet.
+        """
+        players = list(players)
+        rows = {
+            row.player_id: row for row in (await db.execute(
+                select(PlayerStanding).where(PlayerStanding.player_id.in_([p.id for p in players]))
+            )).scalars()
+        }
+        version = await Leaderboard.next_version(db)
+        for player in players:
+            row = rows.get(player.id)
+            if row is None:
+                db.add(PlayerStanding(
+                    player_id=player.id, username=player.username, total_ap=player.total_ap_earned or 0,
+                    wars_ended=0, wins=0, win_rate=0.0, version=version,
+                ))
+            else:
+                row.username = player.username
+                row.total_ap = player.total_ap_earned or 0
+                row.version = version
+
+    def apply(self, standing: Standing) -> None:
+        """Move one player's keys in every board index. O(log n) search + one O(n) list shift per board."""
+        self._standings[standing.player_id] = standing
+        for board, key_fn in _BOARD_KEYS.items():
+            self._indexes[board].upsert(standing.player_id, key_fn(standing))
+        self._top_cache.clear()
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    async def page(self, db: AsyncSession, board: str, offset: int = 0, limit: int = 20) -> Dict[str, Any]:
+        cache_key = (board, offset, limit)
+        hot = offset + limit <= self.top_n
+        if hot:
+            cached = self._top_cache.get(cache_key)
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+
+        await self.ensure_loaded(db)
+        index = self._indexes[board]
+        entries = []
+        for player_id in index.page(offset, limit):
+            entries.append({"rank": index.rank(player_id), **self._standings[player_id].to_dict()})
+        payload = {"board": board, "total": len(index), "offset": offset, "limit": limit, "entries": entries}
+        if hot:
+            self._top_cache[cache_key] = (time.monotonic() + self.top_ttl, payload)
+        return payload
+
+    async def rank(self, db: AsyncSession, board: str, player_id: UUID) -> Optional[Dict[str, Any]]:
+        await self.ensure_loaded(db)
+        pid = str(player_id)
+        rank = self._indexes[board].rank(pid)
+        if rank is None:
+            return None
+        return {"board": board, "rank": rank, "total": len(self._indexes[board]), **self._standings[pid].to_dict()}
+
+    # ── One-off backfill ─────────────────────────────────────────────────────
+
+    @staticmethod
+    async def backfill_if_empty(db: AsyncSession, chunk: int = 5000) -> int:
+        """
+        Build standings from already-ended wars the first time the table is
+        empty (deploying this onto an existing database). Outcomes come from
+        the final snapshot, exactly like /war/history. Returns rows written.
+        """
+        if await db.scalar(select(func.count()).select_from(PlayerStanding)):
+            return 0
+        acc: Dict[UUID, Dict[str, Any]] = {}
+        result = await db.stream(
+            select(WarSession.player_id, WarSession.turn_count, WarSession.current_state_snapshot)
+            .where(WarSession.status == "ENDED")
+            .execution_options(yield_per=chunk)
+        )
+        async for player_id, turns, snapshot in result:
+            a = acc.setdefault(player_id, {"wars_ended": 0, "wins": 0, "fastest_victory_turns": None})
+            a["wars_ended"] += 1
+            warlord = next(
+                (u for u in (snapshot or {}).get("enemy_units", [])
+                 if "BOSS" in (u.get("tags") or []) or u.get("type") == "WARLORD"),
+                None,
+            )
+            if warlord is not None and (warlord.get("health") or 0) <= 0:
+                a["wins"] += 1
+                if turns and (a["fastest_victory_turns"] is None or turns < a["fastest_victory_turns"]):
+                    a["fastest_victory_turns"] = turns
+        if not acc:
+            return 0
+
+        players = {}
+        ids = list(acc)
+        for start in range(0, len(ids), chunk):
+            rows = await db.execute(
+                select(Player.id, Player.username, Player.total_ap_earned).where(Player.id.in_(ids[start:start + chunk]))
+            )
+            players.update({pid: (name, ap) for pid, name, ap in rows})
+        version = await Leaderboard.next_version(db)
+        rows = [
+            {
+                "player_id": pid, "username": players[pid][0], "total_ap": players[pid][1] or 0,
+                "win_rate": round(a["wins"] / a["wars_ended"], 4), "version": version, **a,
+            }
+            for pid, a in acc.items() if pid in players
+        ]
+        for start in range(0, len(rows), chunk):
+            await db.execute(insert(PlayerStanding), rows[start:start + chunk])
+        await db.commit()
+        return len(rows)
+
+
+    @staticmethod
+    async def seed_total_ap(db: AsyncSession) -> int:
+        """
+        Give every player with AP but no standing row one, so the total_ap
+        board includes players who never finished a war. One INSERT ... SELECT;
+        after this, the progress job keeps the rows current. Returns rows written.
+        """
+        if not await db.scalar(
+            select(Player.id)
+            .where(Player.total_ap_earned > 0)
+            .where(~exists().where(PlayerStanding.player_id == Player.id))
+            .limit(1)
+        ):
+            return 0  # don't take the clock lock for nothing
+        version = await Leaderboard.next_version(db)
+        missing = (
+            select(
+                Player.id, Player.username, func.coalesce(Player.total_ap_earned, 0),
+                literal(0), literal(0), literal(0.0), literal(version),
+            )
+            .where(Player.total_ap_earned > 0)
+            .where(~exists().where(PlayerStanding.player_id == Player.id))
+        )
+        result = await db.execute(
+            insert(PlayerStanding).from_select(
+                ["player_id", "username", "total_ap", "wars_ended", "wins", "win_rate", "version"], missing
+            )
+        )
+        await db.commit()
+        return max(result.rowcount, 0)
+
+leaderboard = Leaderboard(
+    settings.LEADERBOARD_INDEX_TTL_SECONDS,
+    settings.LEADERBOARD_TOP_TTL_SECONDS,
+    settings.LEADERBOARD_TOP_N,
+)
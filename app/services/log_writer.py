@@ -0,0 +1,69 @@
+"""
+Bulk writer for per-turn history rows (SitRep, Authority, Action logs).
+
+The "turn_logs" job hands over every turn collected in a queue batch, from
+all wars at once. Each table then gets one executemany INSERT over plain
+dicts instead of an ORM unit-of-work flush per object. Primary keys are
+generated client-side, so no RETURNING round trip is needed, and
+``created_at`` / ``timestamp`` come from the server defaults.
+
+Durability follows the job queue backend. ``memory`` trades the last flush
+interval of history on a hard crash for throughput. ``database`` writes
+the payloads in the turn's own transaction (outbox) and this writer drains
+them.
+"""
+import uuid
+from typing import Any, Dict, Iterable, List
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.action import ActionLog
+from app.models.authority import AuthorityLog
+from app.models.sitrep import SitRepLog
+
+
+class TurnLogWriter:
+
+    @staticmethod
+    def rows(payloads: Iterable[Dict[str, Any]]) -> tuple[List[dict], List[dict], List[dict]]:
+        """Split "turn_logs" payloads into per-table row dicts."""
+        sitreps, authority, actions = [], [], []
+        for p in payloads:
+            war_id = uuid.UUID(p["war_id"]) if isinstance(p["war_id"], str) else p["war_id"]
+            delta_state = p["state_delta"]
+            sitreps.append({
+                "id": uuid.uuid4(),
+                "war_id": war_id,
+                "turn_id": p["turn_id"],
+                "text_content": p["sitrep"],
+                "structured_data": {"events": p["events"], "delta": delta_state},
+                "visual_context": delta_state,
+            })
+            authority.append({
+                "id": uuid.uuid4(),
+                "war_id": war_id,
+                "turn_id": p["turn_id"],
+                "delta": p["delta"],
+                "reason": p["reason"],
+                "context_snapshot": p["judgment_context"],
+            })
+            actions.append({
+                "id": uuid.uuid4(),
+                "war_id": war_id,
+                "player_command_raw": p["command"],
+                "parsed_action": p["parsed_action"],
+                "outcome": "SUCCESS",
+                "state_delta": delta_state,
+                "cixus_evaluation": p["judgment"],
+            })
+        return sitreps, authority, actions
+
+    @staticmethod
+    async def write(db: AsyncSession, payloads: Iterable[Dict[str, Any]]) -> int:
+        """Insert all rows for ``payloads``; caller commits. Returns rows written."""
+        written = 0
+        for model, rows in zip((SitRepLog, AuthorityLog, ActionLog), TurnLogWriter.rows(payloads)):
+            if rows:
+                await db.execute(insert(model), rows)
+                written += len(rows)
+        return written
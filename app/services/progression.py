@@ -0,0 +1,68 @@
+"""
+Player progression rules applied after each judged command: cumulative AP,
+authority level thresholds and reputation traits.
+
+Pure functions over plain values so the same rules can run in the request
+(to report the outcome) and in the deferred job that persists it.
+"""
+from functools import lru_cache
+from typing import Dict, Tuple
+
+LEVEL_THRESHOLDS = {2: 200, 3: 600, 4: 1200, 5: 2500}
+
+
+def progression_after(level: int | None, total_ap_earned: int | None, delta: int) -> tuple[int, int, bool]:
+    """Returns (authority_level, total_ap_earned, leveled_up) after ``delta``."""
+    new_level = level or 1
+    total = total_ap_earned or 0
+    leveled_up = False
+    if delta > 0:
+        total += delta
+        for lvl, threshold in sorted(LEVEL_THRESHOLDS.items()):
+            if total >= threshold and new_level < lvl:
+                new_level = lvl
+                leveled_up = True
+    return new_level, total, leveled_up
+
+
+# Reputation signal tables — scanned once per distinct pattern, not per command
+_ETHICAL_TRAITS = {"brutal": ("Ruthless", 0.05), "merciful": ("Merciful", 0.04)}
+_RISK_TRAITS = {"high": ("Reckless", 0.03), "low": ("Calculated", 0.03)}
+_PATTERN_TRAITS = (
+    (("attack", "assault", "flank", "charge"), "Aggressive", 0.03),
+    (("defend", "fortif", "hold", "retreat"), "Defensive", 0.03),
+    (("ambush", "feint", "diversion", "encircle"), "Cunning", 0.04),
+)
+
+
+@lru_cache(maxsize=1024)
+def pattern_traits(pattern: str) -> Tuple[Tuple[str, float], ...]:
+    """Trait increments a command pattern earns (keyword match, memoised)."""
+    pattern = (pattern or "").lower()
+    return tuple(
+        (trait, amount) for words, trait, amount in _PATTERN_TRAITS
+        if any(w in pattern for w in words)
+    )
+
+
+def reputation_after(reputation: Dict[str, float] | None, pattern: str, risk: str, ethical: str, delta: int) -> Dict[str, float]:
+    """Reputation traits after one command with the given intent and judgment."""
+    rep = dict(reputation or {})
+
+    def _inc(trait, amount):
+        rep[trait] = round(min(1.0, rep.get(trait, 0.0) + amount), 3)
+
+    # Ethical stance, risk appetite, command pattern
+    if ethical in _ETHICAL_TRAITS: _inc(*_ETHICAL_TRAITS[ethical])
+    if risk in _RISK_TRAITS:       _inc(*_RISK_TRAITS[risk])
+    for trait, amount in pattern_traits(pattern):
+        _inc(trait, amount)
+
+    # Authority outcome
+    if delta > 0:  _inc("Decisive",  0.03)
+    elif delta < 0: _inc("Hesitant",  0.03)
+
+    # General battlefield experience (every command)
+    _inc("Veteran", 0.01)
+
+    return rep
@@ -0,0 +1,85 @@
+"""
+Job handlers for the per-turn work ``submit_command`` defers past its commit.
+
+Payloads are plain JSON (ids as strings) so both queue backends can carry
+them. Handlers receive every payload of their kind in the batch and write
+them through the single session the queue commits.
+"""
+from typing import Any, Dict, List
+from uuid import UUID
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.job import AppliedProgress
+from app.models.player import Player
+from app.models.quota import UsageQuota
+from app.services.identity import identity_cache
+from app.services.jobs import job_handler
+from app.services.leaderboard import Leaderboard
+from app.services.log_writer import TurnLogWriter
+from app.services.progression import progression_after, reputation_after
+
+
+@job_handler("turn_logs")
+async def write_turn_logs(db: AsyncSession, payloads: List[Dict[str, Any]]) -> None:
+    """SitRep, authority and action history rows — one bulk INSERT per table."""
+    await TurnLogWriter.write(db, payloads)
+
+
+@job_handler("player_progress")
+async def apply_player_progress(db: AsyncSession, payloads: List[Dict[str, Any]]) -> None:
+    """
+    Level, cumulative AP and reputation. Applied to the player row as it is
+    *now*, in submission order, so two wars' turns in one batch both count.
+    Each (war_id, turn_id) is applied once; re-deliveries are skipped.
+    """
+    turns = {(UUID(p["war_id"]), p["turn_id"]) for p in payloads if "war_id" in p}
+    applied = set()
+    if turns:
+        applied = set((await db.execute(
+            select(AppliedProgress.war_id, AppliedProgress.turn_id)
+            .where(AppliedProgress.war_id.in_({war_id for war_id, _ in turns}))
+            .where(AppliedProgress.turn_id.in_({turn_id for _, turn_id in turns}))
+        )).all())
+    fresh = []
+    for p in payloads:
+        if "war_id" in p:  # jobs queued before turns were keyed carry no war_id
+            key = (UUID(p["war_id"]), p["turn_id"])
+            if key in applied:
+                continue
+            applied.add(key)
+            db.add(AppliedProgress(war_id=key[0], turn_id=key[1]))
+        fresh.append(p)
+    payloads = fresh
+
+    ids = {UUID(p["player_id"]) for p in payloads}
+    players = {
+        p.id: p for p in (await db.execute(select(Player).where(Player.id.in_(ids)))).scalars()
+    }
+    for p in payloads:
+        player = players.get(UUID(p["player_id"]))
+        if player is None:
+            continue
+        delta = p["delta"]
+        player.authority_level, player.total_ap_earned, _ = progression_after(
+            player.authority_level, player.total_ap_earned, delta
+        )
+        player.reputation = reputation_after(player.reputation, p["pattern"], p["risk"], p["ethical"], delta)
+    if payloads:
+        await Leaderboard.refresh_total_ap(db, players.values())
+    identity_cache.invalidate_many(players)
+
+
+@job_handler("llm_usage")
+async def add_llm_usage(db: AsyncSession, payloads: List[Dict[str, Any]]) -> None:
+    """Gemini tokens per judgment, summed per quota row into one UPDATE each."""
+    totals: Dict[UUID, int] = {}
+    for p in payloads:
+        quota_id = UUID(p["quota_id"])
+        totals[quota_id] = totals.get(quota_id, 0) + p["tokens"]
+    for quota_id, tokens in totals.items():
+        await db.execute(
+            update(UsageQuota)
+            .where(UsageQuota.id == quota_id)
+            .values(llm_tokens_used=func.coalesce(UsageQuota.llm_tokens_used, 0) + tokens)
+        )
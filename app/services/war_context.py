@@ -0,0 +1,71 @@
+"""
+One-query loader for the war endpoints.
+
+Every war endpoint used to start with ``db.get(WarSession)`` and then
+``db.get(Player)``, which is two round trips before any work. ``load``
+fetches the war, its player and (for commands) the enemy general in one
+outer-joined SELECT.
+
+Each view names the columns its endpoint actually reads. Everything else
+is left unloaded with ``raiseload``, so a handler that starts touching a
+new column fails loudly in development instead of quietly adding a lazy
+load per request.
+"""
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+from app.models.general import General
+from app.models.player import Player
+from app.models.war import WarSession
+
+
+@dataclass(slots=True)
+class WarContext:
+    war: WarSession
+    player: Optional[Player]
+    general: Optional[General] = None
+
+
+# view -> (war columns, player columns, join the general?); None = every column
+_VIEWS = {
+    # POST /command mutates most of both rows
+    "command": (None, None, True),
+    # GET /state: snapshot + decay inputs + what a war end writes to the leaderboard
+    "state": (
+        (WarSession.player_id, WarSession.status, WarSession.turn_count,
+         WarSession.current_state_snapshot, WarSession.ended_at),
+        (Player.username, Player.authority_points, Player.authority_as_of, Player.last_command_at,
+         Player.total_ap_earned),
+        False,
+    ),
+}
+
+
+class WarContextRepository:
+
+    @staticmethod
+    async def load(db: AsyncSession, war_id: UUID, view: str = "command") -> Optional[WarContext]:
+        """The war plus its player (None if missing), or None if there is no such war."""
+        war_cols, player_cols, with_general = _VIEWS[view]
+        entities = (WarSession, Player, General) if with_general else (WarSession, Player)
+        stmt = (
+            select(*entities)
+            .outerjoin(Player, Player.id == WarSession.player_id)
+            .where(WarSession.id == war_id)
+        )
+        if with_general:
+            stmt = stmt.outerjoin(General, General.war_id == WarSession.id)
+        if war_cols is not None:
+            stmt = stmt.options(load_only(*war_cols, raiseload=True))
+        if player_cols is not None:
+            stmt = stmt.options(load_only(*player_cols, raiseload=True))
+
+        row = (await db.execute(stmt.limit(1))).first()
+        if row is None:
+            return None
+        return WarContext(*row)
@@ -0,0 +1,102 @@
+import random
+from typing import Any, Dict, List
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.engine.state import World, Instruction, TurnOutcome
+from app.engine.simulation import SimulationEngine
+from app.models.war_event import WarEvent, WarSnapshot
+
+
+class WarEventStore:
+    """
+    Append-only war history: one WarEvent per engine call plus a WarSnapshot
+    every ``WAR_SNAPSHOT_INTERVAL`` turns. ``WarSession.current_state_snapshot``
+    stays as the read model for polling; this is the source of truth for replay.
+    """
+
+    @staticmethod
+    def new_rng() -> tuple[int, random.Random]:
+        """Fresh seed + generator for one engine call; the seed is what gets logged."""
+        seed = random.getrandbits(63)
+        return seed, random.Random(seed)
+
+    @staticmethod
+    def record_start(db: AsyncSession, war_id: UUID, snapshot: Dict[str, Any]) -> None:
+        """Turn-0 snapshot written alongside the new war."""
+        db.add(WarSnapshot(war_id=war_id, turn_id=snapshot.get("turn_count", 0), state=snapshot))
+
+    @staticmethod
+    def record_turn(
+        db: AsyncSession,
+        war_id: UUID,
+        instructions: List[Instruction],
+        n_ticks: int,
+        player_authority: int,
+        rng_seed: int,
+        outcome: TurnOutcome,
+        snapshot: Dict[str, Any],
+        **outputs: Any,
+    ) -> WarEvent:
+        """
+        Append the event for one ``SimulationEngine.advance`` call. ``outputs``
+        carries non-engine results worth keeping (friction, judgment, delta).
+        ``snapshot`` is the post-turn ``World.to_snapshot()`` already built for
+        the read model; it is stored only on snapshot turns.
+        """
+        event = WarEvent(
+            war_id=war_id,
+            turn_id=outcome.turn_id,
+            payload={
+                "instructions": [i.to_dict() for i in instructions],
+                "n_ticks": n_ticks,
+                "player_authority": player_authority,
+                "rng_seed": rng_seed,
+                "events": outcome.events,
+                "game_over": outcome.game_over,
+                **outputs,
+            },
+        )
+        db.add(event)
+        if outcome.turn_id % settings.WAR_SNAPSHOT_INTERVAL == 0 or outcome.game_over:
+            db.add(WarSnapshot(war_id=war_id, turn_id=outcome.turn_id, state=snapshot))
+        return event
+
+
+class WarReplay:
+    """Rebuilds any turn's battlefield from the nearest snapshot + events."""
+
+    @staticmethod
+    def apply(world: World, payload: Dict[str, Any]) -> TurnOutcome:
+        """Re-run one recorded engine call on ``world`` (mutated in place)."""
+        return SimulationEngine.advance(
+            world,
+            payload.get("n_ticks", 1),
+            [Instruction.from_dict(d) for d in payload.get("instructions", ())],
+            player_authority=payload.get("player_authority", 70),
+            rng=random.Random(payload["rng_seed"]),
+        )
+
+    @staticmethod
+    async def state_at(db: AsyncSession, war_id: UUID, turn: int) -> World | None:
+        """World as it stood after ``turn``; None if no snapshot precedes it."""
+        snap = (await db.execute(
+            select(WarSnapshot.turn_id, WarSnapshot.state)
+            .where(WarSnapshot.war_id == war_id, WarSnapshot.turn_id <= turn)
+            .order_by(WarSnapshot.turn_id.desc())
+            .limit(1)
+        )).first()
+        if snap is None:
+            return None
+
+        payloads = (await db.execute(
+            select(WarEvent.payload)
+            .where(WarEvent.war_id == war_id, WarEvent.turn_id > snap.turn_id, WarEvent.turn_id <= turn)
+            .order_by(WarEvent.turn_id)
+        )).scalars().all()
+
+        world = World.from_snapshot(snap.state)
+        for payload in payloads:
+            WarReplay.apply(world, payload)
+        return world
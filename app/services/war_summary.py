@@ -0,0 +1,93 @@
+"""
+Rolling per-war summary for Cixus.
+
+Each judged turn is folded into a fixed-size state kept on the war:
+* counts
+* authority totals and an EWMA trend
+* casualties
+* the last NOTABLE_KEEP notable events
+
+The state is ``WarSession.last_judgment_context`` and its rendering is
+``WarSession.history_summary``. Folding is O(1) per turn and the rendering
+has a bounded length, so turn 500 costs the same to prompt as turn 5 and
+never reads the log tables.
+"""
+from typing import Any, Dict, List
+
+NOTABLE_KEEP = 5
+# Smoothing for the per-turn authority delta; ~the last 1/alpha turns dominate
+TREND_ALPHA = 0.3
+# |EWMA| below this reads as "stable"
+TREND_THRESHOLD = 1.5
+# A judgment swing this large is itself worth remembering
+NOTABLE_DELTA = 8
+
+_NOTABLE_MARKERS = ("ELIMINATED", "DESTROYED", "LOST", "SACRIFICE", "Signal intercept")
+
+
+def trend_label(ewma: float) -> str:
+    if ewma >= TREND_THRESHOLD:
+        return "rising"
+    if ewma <= -TREND_THRESHOLD:
+        return "falling"
+    return "stable"
+
+
+class WarSummarizer:
+
+    @staticmethod
+    def empty() -> Dict[str, Any]:
+        return {
+            "turns": 0,
+            "ap_net": 0,
+            "ap_gained": 0,
+            "ap_lost": 0,
+            "ap_ewma": 0.0,
+            "trend": "stable",
+            "player_lost": 0,
+            "enemy_lost": 0,
+            "notable": [],
+        }
+
+    @staticmethod
+    def fold(
+        summary: Dict[str, Any] | None,
+        turn_id: int,
+        events: List[str],
+        delta: int,
+        casualties: Dict[str, int] | None = None,
+    ) -> Dict[str, Any]:
+        """Return a new summary with one judged turn folded in."""
+        s = {**WarSummarizer.empty(), **(summary or {})}
+        s["turns"] += 1
+        s["ap_net"] += delta
+        if delta > 0:
+            s["ap_gained"] += delta
+        elif delta < 0:
+            s["ap_lost"] -= delta
+        s["ap_ewma"] = round(TREND_ALPHA * delta + (1 - TREND_ALPHA) * s["ap_ewma"], 3)
+        s["trend"] = trend_label(s["ap_ewma"])
+        if casualties:
+            s["player_lost"] = casualties.get("player_lost", s["player_lost"])
+            s["enemy_lost"] = casualties.get("enemy_lost", s["enemy_lost"])
+
+        notable = list(s["notable"])
+        notable.extend(f"T{turn_id}: {e.rstrip('.')}" for e in events if any(m in e for m in _NOTABLE_MARKERS))
+        if abs(delta) >= NOTABLE_DELTA:
+            notable.append(f"T{turn_id}: Cixus {delta:+d} AP")
+        s["notable"] = notable[-NOTABLE_KEEP:]
+        return s
+
+    @staticmethod
+    def render(summary: Dict[str, Any] | None) -> str:
+        """One bounded paragraph for the judgment prompt / history_summary."""
+        if not summary or not summary.get("turns"):
+            return ""
+        text = (
+            f"{summary['turns']} turns judged. Authority {summary['ap_net']:+d} "
+            f"(+{summary['ap_gained']}/-{summary['ap_lost']}), trend {summary['trend']}. "
+            f"Losses: {summary['player_lost']} ours, {summary['enemy_lost']} theirs."
+        )
+        if summary.get("notable"):
+            text += " Notable: " + "; ".join(summary["notable"]) + "."
+        return text
@@ -0,0 +1,47 @@
+"""
+Standalone consumer for the database-backed job queue.
+
+    JOB_QUEUE_BACKEND=database python -m app.worker
+
+Run alongside the API (see Procfile). With the default in-memory backend the
+API process drains its own queue and this worker exits at once — scale the
+Procfile's ``worker`` process to 0 unless JOB_QUEUE_BACKEND=database.
+"""
+import asyncio
+import logging
+import signal
+
+from app.core.config import settings
+from app.core.log_pipeline import setup_logging, shutdown_logging
+from app.db.base import engine, Base
+from app.models import player, war, action, authority, general, sitrep, quota, war_event, job  # noqa: F401 — register mappers
+from app.services.jobs import job_queue, DatabaseJobQueue
+from app.services import turn_jobs  # noqa: F401 — registers handlers
+
+logger = logging.getLogger("app.worker")
+
+
+async def main() -> None:
+    if not isinstance(job_queue, DatabaseJobQueue):
+        logger.info("[Worker] JOB_QUEUE_BACKEND=%r — nothing to consume, exiting", settings.JOB_QUEUE_BACKEND)
+        return
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info("[Worker] Consuming job_queue")
+    await job_queue.work(stop)
+    logger.info("[Worker] Stopped")
+
+
+if __name__ == "__main__":
+    setup_logging(settings.LOG_LEVEL, settings.LOG_FORMAT, settings.LOG_SAMPLE_RATES)
+    try:
+        asyncio.run(main())
+    finally:
+        shutdown_logging()
@@ -0,0 +1,71 @@
+"""
+Benchmark: AuthorityLedger.sweep throughput over N active wars.
+
+Builds a throwaway SQLite database with one player + one idle ACTIVE war per
+row, then times a single batched sweep that materialises decay for all of them.
+
+    python benchmarks/bench_authority_sweep.py            # 100k wars
+    python benchmarks/bench_authority_sweep.py 20000
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.db.base import Base
+# Import every model so relationship() targets resolve
+from app.models.player import Player
+from app.models.war import WarSession
+from app.models import action, authority, general, quota, sitrep  # noqa: F401
+from app.services.authority import AuthorityLedger
+
+
+async def run(n_wars: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench_sweep.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    now = datetime.now(timezone.utc)
+    players, wars = [], []
+    for i in range(n_wars):
+        pid = uuid.uuid4()
+        players.append({"id": pid, "username": f"bench-{i}", "authority_points": 100})
+        wars.append({
+            "id": uuid.uuid4(),
+            "player_id": pid,
+            "status": "ACTIVE",
+            "current_state_snapshot": {},
+            "last_command_at": now - timedelta(minutes=3 + i % 30),
+        })
+    async with engine.begin() as conn:
+        for start in range(0, n_wars, 10000):
+            await conn.execute(insert(Player), players[start:start + 10000])
+            await conn.execute(insert(WarSession), wars[start:start + 10000])
+
+    Session = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with Session() as db:
+        t0 = time.perf_counter()
+        changed = await AuthorityLedger.sweep(db, now=now)
+        elapsed = time.perf_counter() - t0
+
+    async with Session() as db:
+        t0 = time.perf_counter()
+        unchanged = await AuthorityLedger.sweep(db, now=now)
+        idle_elapsed = time.perf_counter() - t0
+
+    await engine.dispose()
+    print(f"wars={n_wars}  changed={changed}  sweep={elapsed:.2f}s  ({n_wars / elapsed:,.0f} wars/s)")
+    print(f"re-sweep at same instant: changed={unchanged}  {idle_elapsed:.2f}s  (no-op writes skipped)")
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
@@ -0,0 +1,123 @@
+"""
+Benchmark: leaderboard index over N materialised standings.
+
+Seeds ``player_standings`` in a throwaway SQLite database, then times the
+index build, rank lookups, deep pages, in-process war-end updates and the
+periodic refresh that folds in rows changed by other processes.
+Ranks are checked against a brute-force sort.
+
+    python benchmarks/bench_leaderboard.py            # 300k players
+    python benchmarks/bench_leaderboard.py 50000
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.db.base import Base
+# Import every model so relationship() targets resolve
+from app.models.player import Player
+from app.models.leaderboard import PlayerStanding
+from app.models import war, action, authority, general, quota, sitrep, war_event, job  # noqa: F401
+from app.services.leaderboard import Leaderboard, Standing, WIN_RATE_MIN_WARS
+
+
+async def run(n: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench_leaderboard.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    rng = random.Random(7)
+    seeded_at = datetime(2026, 1, 1)
+    rows = []
+    for i in range(n):
+        wars = rng.randint(1, 40)
+        wins = rng.randint(0, wars)
+        rows.append({
+            "player_id": uuid.uuid4(), "username": f"bench-{i}",
+            "total_ap": rng.randint(0, 50_000), "wars_ended": wars, "wins": wins,
+            "win_rate": round(wins / wars, 4),
+            "fastest_victory_turns": rng.randint(3, 200) if wins else None,
+            "updated_at": seeded_at - timedelta(seconds=rng.randint(0, 86_400)),
+        })
+    async with engine.begin() as conn:
+        for start in range(0, n, 10000):
+            chunk = rows[start:start + 10000]
+            await conn.execute(insert(Player), [{"id": r["player_id"], "username": r["username"]} for r in chunk])
+            await conn.execute(insert(PlayerStanding), chunk)
+
+    Session = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    board = Leaderboard(index_ttl=3600, top_ttl=10, top_n=100)
+    async with Session() as db:
+        t0 = time.perf_counter()
+        await board.ensure_loaded(db)
+        build = time.perf_counter() - t0
+
+        ids = [r["player_id"] for r in rng.sample(rows, 10_000)]
+        t0 = time.perf_counter()
+        for pid in ids:
+            await board.rank(db, "total_ap", pid)
+        per_rank = (time.perf_counter() - t0) / len(ids)
+
+        t0 = time.perf_counter()
+        await board.page(db, "win_rate", offset=n // 2, limit=50)
+        deep_page = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for _ in range(1000):
+            await board.page(db, "total_ap", 0, 20)
+        top_page = (time.perf_counter() - t0) / 1000
+
+    # Periodic refresh: 1000 standings changed elsewhere since the last load
+    changed = rng.sample(rows, 1000)
+    async with Session() as db:
+        for r in changed:
+            r["total_ap"] += 1
+            await db.execute(update(PlayerStanding).where(PlayerStanding.player_id == r["player_id"]).values(total_ap=r["total_ap"]))
+        await db.commit()
+        board._loaded_at = float("-inf")
+        t0 = time.perf_counter()
+        await board.ensure_loaded(db)
+        refresh = time.perf_counter() - t0
+
+    # Incremental war-end updates (what get_state does after the commit)
+    t0 = time.perf_counter()
+    for r in rng.sample(rows, 5000):
+        r["total_ap"] += rng.randint(1, 50)
+        r["wars_ended"] += 1
+        board.apply(Standing(str(r["player_id"]), r["username"], r["total_ap"], r["wars_ended"],
+                             r["wins"], round(r["wins"] / r["wars_ended"], 4), r["fastest_victory_turns"]))
+    per_update = (time.perf_counter() - t0) / 5000
+
+    # Correctness: competition rank on total_ap vs a full sort
+    ordered = sorted((r["total_ap"] for r in rows), reverse=True)
+    async with Session() as db:
+        for r in rng.sample(rows, 200):
+            expected = ordered.index(r["total_ap"]) + 1
+            got = (await board.rank(db, "total_ap", r["player_id"]))["rank"]
+            assert got == expected, (got, expected)
+    ranked_wr = sum(1 for r in rows if r["wars_ended"] >= WIN_RATE_MIN_WARS)
+    await engine.dispose()
+
+    print(f"players={n}  win_rate board={ranked_wr}")
+    print(f"  index build        {build:8.2f}s")
+    print(f"  rank lookup        {per_rank * 1e6:8.1f}µs")
+    print(f"  page @ n/2 (50)    {deep_page * 1e3:8.2f}ms")
+    print(f"  top page (cached)  {top_page * 1e6:8.1f}µs")
+    print(f"  war-end update     {per_update * 1e6:8.1f}µs  (3 boards)")
+    print(f"  refresh (1k dirty) {refresh * 1e3:8.2f}ms")
+    print("  ranks match brute force")
+
+
+if __name__ == "__main__":
+    asyncio.run(run(int(sys.argv[1]) if len(sys.argv) > 1 else 300_000))
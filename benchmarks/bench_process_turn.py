@@ -0,0 +1,87 @@
+"""
+Benchmark: time and allocations per simulated turn at 10 / 100 / 10,000 units.
+
+Compares three paths over the same battlefield, with one move order per
+player unit:
+
+  pydantic   SimulationEngine.process_turn(GameState) -> TurnResult
+  lean+io    World.from_snapshot -> SimulationEngine.step -> World.to_snapshot
+             (what submit_command does)
+  lean step  SimulationEngine.step on an already-decoded World
+
+    python benchmarks/bench_process_turn.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.engine.types import GameState
+from app.engine.state import World, Instruction, next_instruction_id
+from app.engine.simulation import SimulationEngine
+
+
+def make_snapshot(n_units: int) -> dict:
+    half = max(1, n_units // 2)
+
+    def unit(uid, utype, x, z, tags=()):
+        return {
+            "unit_id": uid, "type": utype, "health": 1e9,
+            "position": {"x": x, "z": z}, "status": "ACTIVE", "tags": list(tags),
+        }
+
+    players = [unit("unit_commander", "COMMANDER", 50.0, 90.0, ["COMMANDER"])]
+    players += [unit(f"sqd_{i}", "INFANTRY", (i * 7) % 100, 60 + (i * 3) % 40) for i in range(half - 1)]
+    enemies = [unit("enemy_warlord", "WARLORD", 50.0, 10.0, ["BOSS"])]
+    enemies += [unit(f"drone_{i}", "DRONE", (i * 11) % 100, (i * 5) % 40) for i in range(n_units - half - 1)]
+    return GameState(turn_count=0, player_units=players, enemy_units=enemies, general_status="ALIVE").model_dump()
+
+
+def orders(snapshot: dict) -> list[Instruction]:
+    return [
+        Instruction(next_instruction_id(), u["unit_id"], "ASSAULT", {"target_pos": {"x": 50.0, "z": 50.0}, "speed": 1.0})
+        for u in snapshot["player_units"]
+    ]
+
+
+def measure(label: str, fn, repeats: int):
+    fn()  # warm-up
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    per_turn = (time.perf_counter() - t0) / repeats
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    fn()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+
+    print(f"  {label:<10} {per_turn * 1e3:10.3f} ms/turn   peak {peak / 1024:10.1f} KiB   +{blocks:>8} blocks")
+
+
+def run():
+    for n_units in (10, 100, 10_000):
+        snapshot = make_snapshot(n_units)
+        instructions = orders(snapshot)
+        state = GameState.model_validate(snapshot)
+        world = World.from_snapshot(snapshot)
+        repeats = 200 if n_units < 10_000 else 5
+
+        def lean_io():
+            decoded = World.from_snapshot(snapshot)
+            SimulationEngine.step(decoded, instructions)
+            return decoded.to_snapshot()
+
+        print(f"{n_units} units")
+        measure("pydantic", lambda: SimulationEngine.process_turn(state, instructions), repeats)
+        measure("lean+io", lean_io, repeats)
+        measure("lean step", lambda: SimulationEngine.step(world, instructions), repeats)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,92 @@
+"""
+Benchmark: event-sourced replay throughput.
+
+1. Pure engine: re-apply N recorded turns to a decoded World (turns/s).
+2. DB-backed: WarReplay.state_at for random turns of one long war stored in
+   a throwaway SQLite file, with snapshots every WAR_SNAPSHOT_INTERVAL turns.
+
+    python benchmarks/bench_replay.py            # 1000 turns, 100 units
+    python benchmarks/bench_replay.py 5000 1000
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.core.config import settings
+from app.db.base import Base
+# Import every model so relationship() targets resolve
+from app.models import action, authority, general, player, quota, sitrep, war  # noqa: F401
+from app.models.war_event import WarEvent, WarSnapshot
+from app.engine.state import World, Instruction, next_instruction_id
+from app.engine.simulation import SimulationEngine
+from app.services.war_store import WarEventStore, WarReplay
+from bench_process_turn import make_snapshot
+
+
+def record_war(n_turns: int, n_units: int):
+    """Play a war forward, returning the initial snapshot and one payload per turn."""
+    initial = make_snapshot(n_units)
+    world = World.from_snapshot(initial)
+    payloads, snapshots = [], [(0, initial)]
+    for _ in range(n_turns):
+        orders = [Instruction(next_instruction_id(), "sqd_0", random.choice(["ASSAULT", "AMBUSH", "PHALANX_DEFENSE"]),
+                              {"target_pos": {"x": 50.0, "z": 50.0}, "speed": 1.0})]
+        seed, rng = WarEventStore.new_rng()
+        outcome = SimulationEngine.advance(world, 1, orders, player_authority=80, rng=rng)
+        payloads.append((outcome.turn_id, {
+            "instructions": [i.to_dict() for i in orders],
+            "n_ticks": 1, "player_authority": 80, "rng_seed": seed,
+            "events": outcome.events, "game_over": outcome.game_over,
+        }))
+        if outcome.turn_id % settings.WAR_SNAPSHOT_INTERVAL == 0:
+            snapshots.append((outcome.turn_id, world.to_snapshot()))
+    return initial, payloads, snapshots, world.to_snapshot()
+
+
+async def run(n_turns: int, n_units: int):
+    initial, payloads, snapshots, final = record_war(n_turns, n_units)
+
+    # 1. Pure replay from turn 0
+    t0 = time.perf_counter()
+    world = World.from_snapshot(initial)
+    for _, payload in payloads:
+        WarReplay.apply(world, payload)
+    elapsed = time.perf_counter() - t0
+    assert world.to_snapshot() == final, "replay diverged from the recorded war"
+    print(f"pure replay: {n_turns} turns x {n_units} units in {elapsed:.3f}s  ({n_turns / elapsed:,.0f} turns/s)  [matches recorded state]")
+
+    # 2. DB-backed state_at
+    path = os.path.join(tempfile.mkdtemp(), "bench_replay.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    war_id = uuid.uuid4()
+    async with Session() as db:
+        db.add_all(WarSnapshot(war_id=war_id, turn_id=t, state=s) for t, s in snapshots)
+        db.add_all(WarEvent(war_id=war_id, turn_id=t, payload=p) for t, p in payloads)
+        await db.commit()
+
+    turns = [random.randint(1, n_turns) for _ in range(200)]
+    async with Session() as db:
+        t0 = time.perf_counter()
+        for turn in turns:
+            await WarReplay.state_at(db, war_id, turn)
+        elapsed = time.perf_counter() - t0
+    await engine.dispose()
+    print(f"state_at (snapshot every {settings.WAR_SNAPSHOT_INTERVAL}): "
+          f"{len(turns)} random turns in {elapsed:.3f}s  ({elapsed / len(turns) * 1e3:.2f} ms/lookup)")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    asyncio.run(run(args[0] if args else 1000, args[1] if len(args) > 1 else 100))
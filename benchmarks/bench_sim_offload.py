@@ -0,0 +1,92 @@
+"""
+Benchmark: latency of other endpoints while heavy turns are simulated.
+
+Runs a handful of large multi-tick turns through ``TurnExecutor`` twice:
+once with the pool disabled (everything inline on the event loop) and once
+with a pre-warmed process pool. Meanwhile a probe client hits ``GET /``
+through the full ASGI stack every few ms. Reports the probe's latency
+percentiles and the heavy turns' own time.
+
+Probe latency is measured from when the request was *due*, not when it
+was sent. An inline heavy turn delays the send as well as the reply, and
+timing from the send would hide exactly that stall.
+
+    python benchmarks/bench_sim_offload.py                # 10k units, 5 ticks
+    python benchmarks/bench_sim_offload.py 20000 3
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+from app.main import app
+from app.engine.executor import TurnExecutor
+from app.engine.state import World
+from bench_process_turn import make_snapshot, orders
+
+TURNS = 5
+PROBE_EVERY = 0.005
+
+
+async def run_mode(label: str, executor: TurnExecutor, snapshot: dict, n_ticks: int) -> None:
+    await executor.start()
+    latencies: list[float] = []
+    done = asyncio.Event()
+
+    async def probe():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            due = time.perf_counter()
+            while True:
+                await client.get("/")
+                now = time.perf_counter()
+                # Every probe that fell due while we were stuck waited until now
+                while due <= now:
+                    latencies.append((now - due) * 1000)
+                    due += PROBE_EVERY
+                if done.is_set():
+                    break
+                await asyncio.sleep(due - now)
+
+    async def heavy():
+        await asyncio.sleep(0.05)  # let the probe settle
+        t0 = time.perf_counter()
+        for seed in range(TURNS):
+            world = World.from_snapshot(snapshot)
+            await executor.advance(world, snapshot, n_ticks, orders(snapshot), 70, seed)
+            await asyncio.sleep(0)  # separate requests in real life
+        done.set()
+        return (time.perf_counter() - t0) / TURNS * 1000
+
+    _, per_turn = await asyncio.gather(probe(), heavy())
+    await executor.shutdown()
+
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+    print(f"  {label:<7} heavy turn {per_turn:8.1f} ms   probe n={len(latencies):4d}  "
+          f"p50 {statistics.median(latencies):7.2f} ms  p99 {p(0.99):7.2f} ms  max {latencies[-1]:7.2f} ms")
+
+
+async def main(n_units: int, n_ticks: int) -> None:
+    snapshot = make_snapshot(n_units)
+    # Same seed, same answer on either side
+    a = await TurnExecutor(0, 0, 60).advance(World.from_snapshot(snapshot), snapshot, n_ticks, [], 70, 42)
+    pool = TurnExecutor(1, 0, 60)
+    await pool.start()
+    b = await pool.advance(World.from_snapshot(snapshot), snapshot, n_ticks, [], 70, 42)
+    await pool.shutdown()
+    assert a.world.to_snapshot() == b.world.to_snapshot() and a.events == b.events
+
+    print(f"{n_units} units × {n_ticks} ticks, {TURNS} turns (results identical inline vs pool)")
+    await run_mode("inline", TurnExecutor(0, 0, 60), snapshot, n_ticks)
+    await run_mode("pool", TurnExecutor(2, 0, 60), snapshot, n_ticks)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    asyncio.run(main(args[0] if args else 10_000, args[1] if len(args) > 1 else 5))
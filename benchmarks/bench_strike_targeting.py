@@ -0,0 +1,79 @@
+"""
+Benchmark: strike targeting against an all-pairs reach check.
+
+Infantry hold the south line (z 70-100), hostiles the north (z 0-20): every
+pair is inside the longest strike range but outside infantry reach, so each
+candidate hostile fails the reach check. That is the worst case for a scan
+over every player, and it is the common case on a static front.
+
+  all-pairs  any() over every living player per candidate hostile
+  grid       _strike_target (one grid per strike range, any_within)
+
+Both must pick the same target on every layout, including a mixed force.
+
+    python benchmarks/bench_strike_targeting.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.engine.state import Unit
+from app.engine.spatial import BattlefieldIndex, SpatialGrid
+from app.engine.simulation import DEFAULT_STRIKE_RANGE, STRIKE_RANGE, _centroid, _strike_target
+
+
+def all_pairs_target(index, players, enemies):
+    shooters = [(u.x, u.z, STRIKE_RANGE.get(u.type, DEFAULT_STRIKE_RANGE) ** 2) for u in players]
+
+    def in_reach(enemy):
+        return any((enemy.x - x) ** 2 + (enemy.z - z) ** 2 <= r2 for x, z, r2 in shooters)
+
+    boss = next((u for u in enemies if u.is_boss), None)
+    if boss and in_reach(boss):
+        return boss
+    ax, az = _centroid(players)
+    return index.enemies.nearest(ax, az, where=in_reach)
+
+
+def make_front(n: int, rng: random.Random, player_types=("INFANTRY",)):
+    def unit(uid, utype, z_lo, z_hi):
+        return Unit(uid, utype, 100.0, rng.uniform(0, 100), rng.uniform(z_lo, z_hi), "ACTIVE")
+
+    players = [unit(f"p{i}", rng.choice(player_types), 70, 100) for i in range(n)]
+    enemies = [unit(f"e{i}", "DRONE", 0, 20) for i in range(n)]
+    index = BattlefieldIndex(SpatialGrid(), SpatialGrid())
+    for u in players:
+        index.players.insert(u)
+    for u in enemies:
+        index.enemies.insert(u)
+    return index, players, enemies
+
+
+def timed(fn, repeats: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - t0) / repeats
+
+
+def run():
+    rng = random.Random(29)
+    for types in (("INFANTRY",), ("INFANTRY", "TANK", "MECH")):
+        for _ in range(20):
+            args = make_front(200, rng, types)
+            assert _strike_target(*args) is all_pairs_target(*args)
+    print("targets match the all-pairs reference")
+
+    for n in (100, 1_000, 5_000):
+        args = make_front(n, rng)
+        repeats = 20 if n < 5_000 else 2
+        brute = timed(lambda: all_pairs_target(*args), repeats)
+        grid = timed(lambda: _strike_target(*args), repeats)
+        print(f"{n:>6} vs {n:<6}  all-pairs {brute * 1e3:10.2f} ms   grid {grid * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,132 @@
+"""
+Benchmark: turn-log write throughput, per-request transactions vs batched.
+
+Writes N turns' worth of SitRep / Authority / Action rows (3 rows per turn)
+into a throwaway SQLite database three ways:
+
+  per-request   each turn: own session, three ORM adds, own commit
+                (the pre-job-queue pattern, C turns in flight at once)
+  batched-orm   JOB_BATCH_SIZE turns per transaction, ORM adds
+  batched-bulk  JOB_BATCH_SIZE turns per transaction, TurnLogWriter
+                (one executemany INSERT per table) — what the job queue runs
+
+    python benchmarks/bench_turn_logs.py            # 5000 turns, 32 in flight
+    python benchmarks/bench_turn_logs.py 20000 64
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.core.config import settings
+from app.db.base import Base
+# Import every model so relationship() targets resolve
+from app.models.player import Player
+from app.models.war import WarSession
+from app.models.action import ActionLog
+from app.models.authority import AuthorityLog
+from app.models.sitrep import SitRepLog
+from app.models import general, quota, war_event, job  # noqa: F401
+from app.services.log_writer import TurnLogWriter
+
+
+def make_payloads(n: int, war_ids: list[str]) -> list[dict]:
+    return [{
+        "war_id": war_ids[i % len(war_ids)],
+        "turn_id": i,
+        "sitrep": "Events: Strike on WARLORD: -83 HP (remaining: 717).",
+        "events": ["Strike on WARLORD: -83 HP (remaining: 717)", "Enemy pressure on INFANTRY: -16 HP"],
+        "state_delta": {"moved": ["sqd_0", "sqd_1"], "damaged": ["boss_warlord"]},
+        "delta": 3,
+        "reason": "Decisive. Acceptable.",
+        "judgment_context": {"turn_count": i, "casualties": {"player_lost": 0, "enemy_lost": 0}},
+        "command": "attack the left flank",
+        "parsed_action": {"intent": {"primary_pattern": "flank_left"}},
+        "judgment": {"authority_change": 3, "commentary": "Decisive. Acceptable."},
+    } for i in range(n)]
+
+
+async def fresh_db(tag: str, n_wars: int):
+    path = os.path.join(tempfile.mkdtemp(), f"bench_logs_{tag}.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    pid = uuid.uuid4()
+    war_ids = [uuid.uuid4() for _ in range(n_wars)]
+    async with engine.begin() as conn:
+        await conn.execute(insert(Player), [{"id": pid, "username": "bench"}])
+        await conn.execute(insert(WarSession), [
+            {"id": w, "player_id": pid, "status": "ACTIVE", "current_state_snapshot": {}} for w in war_ids
+        ])
+    return engine, [str(w) for w in war_ids]
+
+
+def orm_rows(p: dict) -> list:
+    war_id = uuid.UUID(p["war_id"])
+    return [
+        SitRepLog(war_id=war_id, turn_id=p["turn_id"], text_content=p["sitrep"],
+                  structured_data={"events": p["events"], "delta": p["state_delta"]},
+                  visual_context=p["state_delta"]),
+        AuthorityLog(war_id=war_id, turn_id=p["turn_id"], delta=p["delta"], reason=p["reason"],
+                     context_snapshot=p["judgment_context"]),
+        ActionLog(war_id=war_id, player_command_raw=p["command"], parsed_action=p["parsed_action"],
+                  outcome="SUCCESS", state_delta=p["state_delta"], cixus_evaluation=p["judgment"]),
+    ]
+
+
+async def per_request(Session, payloads, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(p):
+        async with sem, Session() as db:
+            db.add_all(orm_rows(p))
+            await db.commit()
+
+    await asyncio.gather(*(one(p) for p in payloads))
+
+
+async def batched_orm(Session, payloads, batch):
+    for start in range(0, len(payloads), batch):
+        async with Session() as db:
+            for p in payloads[start:start + batch]:
+                db.add_all(orm_rows(p))
+            await db.commit()
+
+
+async def batched_bulk(Session, payloads, batch):
+    for start in range(0, len(payloads), batch):
+        async with Session() as db:
+            await TurnLogWriter.write(db, payloads[start:start + batch])
+            await db.commit()
+
+
+async def run(n_turns: int, concurrency: int):
+    batch = settings.JOB_BATCH_SIZE
+    print(f"turns={n_turns}  rows={3 * n_turns}  in-flight={concurrency}  batch={batch}")
+    modes = [
+        ("per-request", lambda S, p: per_request(S, p, concurrency)),
+        ("batched-orm", lambda S, p: batched_orm(S, p, batch)),
+        ("batched-bulk", lambda S, p: batched_bulk(S, p, batch)),
+    ]
+    for name, fn in modes:
+        engine, war_ids = await fresh_db(name, 50)
+        Session = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+        payloads = make_payloads(n_turns, war_ids)
+        t0 = time.perf_counter()
+        await fn(Session, payloads)
+        elapsed = time.perf_counter() - t0
+        await engine.dispose()
+        print(f"  {name:<13} {elapsed:7.2f}s  {3 * n_turns / elapsed:>10,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    c = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    asyncio.run(run(n, c))
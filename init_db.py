@@ -6,6 +6,9 @@ from app.models.war import WarSession
 from app.models.action import ActionLog
 from app.models.general import General
 from app.models.authority import AuthorityLog
+from app.models.war_event import WarEvent, WarSnapshot
+from app.models.job import JobRecord
+from app.models.leaderboard import PlayerStanding
 
 async def init_models():
     async with engine.begin() as conn:
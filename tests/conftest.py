@@ -0,0 +1,11 @@
+"""
+Point the app at a throwaway SQLite file before anything imports its
+settings, and keep the tests offline (no Gemini keys, inline simulation).
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='cixus-tests-')}/cixus.db"
+os.environ["SIM_POOL_WORKERS"] = "0"
+for key in ("GEMINI_API_KEY", "GEMINI_API_KEYS"):
+    os.environ.pop(key, None)
@@ -0,0 +1,85 @@
+"""
+The batch friction / fallback-judgment APIs must draw from the same bands
+as the scalar paths they vectorise. Both sides are seeded, so the
+frequencies compared here are fixed; the tolerance only absorbs the
+sampling noise between two different generators.
+"""
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from app.services.ai.orchestrator import (
+    ETHICAL_KEYS, MORALE_LEVELS, PATTERN_KEYS, RISK_KEYS,
+    _tactic_fallback_judgment, tactic_fallback_judgment_batch,
+)
+from app.services.friction import CORRUPTION_CODES, AuthorityFrictionService
+
+N = 20_000
+
+
+def _frequencies(values) -> dict:
+    counts = Counter(values)
+    return {k: v / len(values) for k, v in counts.items()}
+
+
+def _assert_close(scalar: dict, batch: dict, n: int):
+    tolerance = 4 * (0.5 / n) ** 0.5  # four standard errors of a frequency difference, worst case p = 0.5
+    for band in scalar.keys() | batch.keys():
+        assert abs(scalar.get(band, 0.0) - batch.get(band, 0.0)) < tolerance, (band, scalar, batch)
+
+
+# 49 sits in the scalar path's gap into the critical band; the batch API keeps it
+@pytest.mark.parametrize("authority", [95, 65, 35, 49, 10])
+def test_friction_batch_matches_scalar_bands(authority):
+    random.seed(27)
+    scalar = []
+    for _ in range(N):
+        f = AuthorityFrictionService.calculate_friction(authority)
+        refused = f.refusal_chance > 0 and random.random() < f.refusal_chance  # validate_and_clamp's roll
+        scalar.append((f.latency_ticks, f.corruption, refused))
+
+    out = AuthorityFrictionService.calculate_friction_batch(np.full(N, authority), rng=np.random.default_rng(27))
+    batch = list(zip(
+        out["latency_ticks"].tolist(),
+        [CORRUPTION_CODES[c] for c in out["corruption"]],
+        out["refused"].tolist(),
+    ))
+
+    for field in range(3):
+        _assert_close(_frequencies([s[field] for s in scalar]), _frequencies([b[field] for b in batch]), N)
+
+
+def test_fallback_judgment_batch_matches_scalar_bands():
+    ids = np.random.default_rng(0)
+    pattern_ids = ids.integers(0, len(PATTERN_KEYS), N)
+    risk_ids = ids.integers(0, len(RISK_KEYS) + 1, N)        # + the unknown-risk default
+    ethical_ids = ids.integers(0, len(ETHICAL_KEYS) + 1, N)
+
+    random.seed(27)
+    scalar = []
+    for p, r, e in zip(pattern_ids, risk_ids, ethical_ids):
+        intent = {
+            "primary_pattern": PATTERN_KEYS[p],
+            "risk_profile": RISK_KEYS[r] if r < len(RISK_KEYS) else "unlisted",
+            "ethical_weight": ETHICAL_KEYS[e] if e < len(ETHICAL_KEYS) else "unlisted",
+        }
+        judgment = _tactic_fallback_judgment({"intent": intent})
+        scalar.append((PATTERN_KEYS[p], judgment["morale_impact"], np.sign(judgment["authority_change"])))
+
+    out = tactic_fallback_judgment_batch(pattern_ids, risk_ids, ethical_ids, rng=np.random.default_rng(27))
+    batch = list(zip(
+        [PATTERN_KEYS[p] for p in pattern_ids],
+        [MORALE_LEVELS[m] for m in out["morale_impact"]],
+        np.sign(out["authority_change"]),
+    ))
+
+    _assert_close(_frequencies([s[1] for s in scalar]), _frequencies([b[1] for b in batch]), N)
+    for pattern in PATTERN_KEYS:
+        scalar_bands = [(s[1], s[2]) for s in scalar if s[0] == pattern]
+        _assert_close(
+            _frequencies(scalar_bands),
+            _frequencies([(b[1], b[2]) for b in batch if b[0] == pattern]),
+            len(scalar_bands),
+        )
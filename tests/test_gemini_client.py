@@ -0,0 +1,54 @@
+"""
+Judgment models get a per-key client by replacing the SDK's internal
+``GenerativeModel._async_client``. These tests fail if an SDK release
+stops honouring it, instead of every judgment silently going out on
+whichever key was configured globally.
+"""
+import asyncio
+
+from google.ai import generativelanguage as glm
+
+from app.services.ai.orchestrator import _judgment_model
+
+
+async def _stub(client, method: str, response):
+    """Replace one RPC on ``client`` and return the list of requests it receives."""
+    calls = []
+
+    async def rpc(request, **kwargs):
+        calls.append(request)
+        return response
+
+    setattr(client, method, rpc)
+    return calls
+
+
+def test_each_key_gets_its_own_client():
+    async def build():
+        first = _judgment_model("test-key-a", None, "gemini-2.0-flash")
+        again = _judgment_model("test-key-a", None, "gemini-2.0-flash")
+        other = _judgment_model("test-key-b", "Aggressive", "gemini-2.0-flash")
+        return first, again, other
+
+    first, again, other = asyncio.run(build())
+    assert first is again
+    assert first._async_client is not other._async_client
+    assert first._async_client.transport._credentials.token == "test-key-a"
+    assert other._async_client.transport._credentials.token == "test-key-b"
+
+
+def test_generate_and_count_go_through_the_key_client():
+    async def call():
+        model = _judgment_model("test-key-c", None, "gemini-2.0-flash")
+        generated = await _stub(
+            model._async_client, "generate_content",
+            glm.GenerateContentResponse(candidates=[{"content": {"parts": [{"text": '{"authority_change": 1}'}]}}]),
+        )
+        counted = await _stub(model._async_client, "count_tokens", glm.CountTokensResponse(total_tokens=3))
+        response = await model.generate_content_async("INTENT:{}")
+        tokens = await model.count_tokens_async("INTENT:{}")
+        return generated, counted, response, tokens
+
+    generated, counted, response, tokens = asyncio.run(call())
+    assert len(generated) == 1 and response.text == '{"authority_change": 1}'
+    assert len(counted) == 1 and tokens.total_tokens == 3
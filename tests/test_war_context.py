@@ -0,0 +1,79 @@
+"""
+WarContextRepository.load must fetch the war, its player and (for commands)
+the general in a single SELECT per view.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.models import player, war, action, authority, general, sitrep, quota, war_event, job, leaderboard  # noqa: F401 — register mappers
+from app.models.general import General
+from app.models.player import Player
+from app.models.war import WarSession
+from app.services.war_context import WarContextRepository
+
+
+async def _load_counting(view: str, probe=None):
+    """
+    Seed one war in a fresh in-memory database, then load it and count the
+    SELECTs. ``probe(ctx)`` runs while the session is still open.
+    """
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with sessions() as db:
+        commander = Player(username="TEST-CMDR", authority_points=80)
+        db.add(commander)
+        await db.flush()
+        battle = WarSession(player_id=commander.id, current_state_snapshot={"turn_count": 3}, turn_count=3)
+        db.add(battle)
+        await db.flush()
+        db.add(General(war_id=battle.id, name="Warlord", traits=["Aggressive"]))
+        await db.commit()
+        war_id = battle.id
+
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    try:
+        async with sessions() as db:
+            ctx = await WarContextRepository.load(db, war_id, view)
+            selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+            if probe is not None:
+                probe(ctx)
+            return ctx, selects, len(statements)
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.parametrize("view", ["command", "state"])
+def test_load_is_one_select(view):
+    ctx, selects, total = asyncio.run(_load_counting(view))
+    assert ctx is not None and ctx.player is not None
+    assert ctx.player.authority_points == 80
+    assert len(selects) == 1, selects
+    assert total == 1
+
+
+def test_command_view_joins_the_general():
+    ctx, selects, _ = asyncio.run(_load_counting("command"))
+    assert ctx.general is not None and ctx.general.name == "Warlord"
+    assert "generals" in selects[0]
+
+
+def test_state_view_raises_on_unlisted_columns():
+    def probe(ctx):
+        assert ctx.war.current_state_snapshot == {"turn_count": 3}
+        with pytest.raises(InvalidRequestError):
+            ctx.war.history_summary  # not in the state view: must not lazy-load
+
+    asyncio.run(_load_counting("state", probe))
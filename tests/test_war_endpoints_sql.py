@@ -0,0 +1,75 @@
+"""
+The hot war endpoints read the war, its player and the general in one
+statement per request, measured through the app by the request-scoped
+query profiler.
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from app.db.base import query_profiler
+from app.main import app
+
+
+def _war_reads(scope) -> int:
+    """SELECTs in one request that touch the war / player / general rows."""
+    return sum(
+        n for template, n in scope.templates.items()
+        if template.startswith("SELECT") and any(t in template for t in ("war_sessions", "players", "generals"))
+    )
+
+
+async def _play(scopes: list) -> dict:
+    """One war through the app (the job queue is bound to a single event loop, so one run serves every test)."""
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            player_id = (await client.post("/api/v1/players/identify", json={})).json()["id"]
+            war_id = (await client.post("/api/v1/war/start", json={"player_id": player_id})).json()["war_id"]
+            seen = {}
+
+            first = await client.get(f"/api/v1/war/{war_id}/state")
+            assert first.status_code == 200
+            seen["state"] = scopes[-1]
+
+            unchanged = await client.get(f"/api/v1/war/{war_id}/state", headers={"If-None-Match": first.headers["etag"]})
+            assert unchanged.status_code == 304
+            seen["state_not_modified"] = scopes[-1]
+
+            command = await client.post(f"/api/v1/war/{war_id}/command", json={"type": "text", "content": "attack the left flank"})
+            assert command.status_code == 200
+            seen["command"] = scopes[-1]
+
+            changed = await client.get(f"/api/v1/war/{war_id}/state", headers={"If-None-Match": first.headers["etag"]})
+            assert changed.status_code == 200
+            seen["state_modified"] = scopes[-1]
+            return seen
+
+
+@pytest.fixture(scope="module")
+def profiled():
+    """Each request's RequestQueries, keyed by what the request was."""
+    scopes = []
+    end = query_profiler.end
+
+    def capture(scope, token):
+        scopes.append(scope)
+        end(scope, token)
+
+    query_profiler.end = capture
+    try:
+        return asyncio.run(_play(scopes))
+    finally:
+        del query_profiler.end
+
+
+def test_command_reads_war_once(profiled):
+    scope = profiled["command"]
+    assert _war_reads(scope) == 1, dict(scope.templates)
+
+
+@pytest.mark.parametrize("request_kind", ["state", "state_not_modified", "state_modified"])
+def test_state_is_one_statement(profiled, request_kind):
+    scope = profiled[request_kind]
+    assert scope.statements == 1, dict(scope.templates)